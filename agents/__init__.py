@@ -1,2 +1,6 @@
 import os
 from .ceiagent import CEIAgent
+from .plancache import PlanCache
+from .plannerbackends import PlannerBackend, SLSQPBackend, TrustConstrBackend, AugmentedLagrangianBackend, GaussNewtonBackend, QuasiNewtonSQPBackend, WarmStart
+from .planningpool import PlanningPool
+from .planningproblem import PlanningProblem
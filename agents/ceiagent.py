@@ -16,17 +16,53 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
 """
-import copy
+import pickle
+import time
 import warnings
 
 import autograd
 import autograd.numpy as np
-from autograd.scipy import stats
-from scipy import optimize
+from scipy import linalg, optimize, special
 
 from controllableobjects import ControllableObject
 from trackobjects.trackside import TrackSide
 from .agent import Agent
+from .normaldistribution import normal_interval_probability, normal_pdf
+from .plannerbackends import GaussNewtonBackend, SLSQPBackend, WarmStart, _get_constraint_jacobian, _solve_elastic_quadratic_program, \
+    _solve_quadratic_program_on_active_set
+from .planningproblem import PlanningProblem
+from .posteriorschedule import PosteriorSchedule
+from .rolloutmemo import RolloutMemo
+
+
+class _DeadlineMonitor:
+    """ An optimizer callback that keeps track of the best feasible iterate and stops the optimization when the wall-clock deadline has passed. """
+
+    def __init__(self, deadline, optimizer_arguments):
+        self.deadline = deadline
+        self.deadline_exceeded = False
+        self.best_x = None
+        self.best_cost = np.inf
+
+        self._cost_function = optimizer_arguments['fun']
+        self._cost_arguments = optimizer_arguments['args']
+        self._constraint = optimizer_arguments['constraints']
+        self._consider(optimizer_arguments['x0'])
+
+    def __call__(self, intermediate_result):
+        self._consider(intermediate_result.x)
+
+        if time.perf_counter() > self.deadline:
+            self.deadline_exceeded = True
+            raise StopIteration
+
+    def _consider(self, x):
+        if np.all(self._constraint['fun'](x, *self._constraint['args']) >= 0.):
+            cost = self._cost_function(x, *self._cost_arguments)
+
+            if cost < self.best_cost:
+                self.best_x = np.array(x, dtype=float)
+                self.best_cost = cost
 
 
 class CEIAgent(Agent):
@@ -34,8 +70,14 @@ class CEIAgent(Agent):
     An agent used in a Communication-Enabled Interaction model
     """
 
+    # the posterior schedules only depend on the configuration of the belief, so they are shared between all agents
+    _posterior_schedules = {}
+
     def __init__(self, controllable_object: ControllableObject, track_side: TrackSide, dt, sim_master, track, risk_bounds, saturation_time, vehicle_width,
-                 vehicle_length, preferred_velocity, time_horizon, belief_frequency, theta):
+                 vehicle_length, preferred_velocity, time_horizon, belief_frequency, theta, use_analytic_risk_jacobian=False,
+                 use_autograd_cost_jacobian=False, plan_cache=None, planner_backend=None, record_planning_problems=False, number_of_plan_knots=None,
+                 planning_deadline=None, use_vector_risk_constraint=False, use_motion_primitives=False, number_of_parallel_starts=None,
+                 use_unconstrained_fast_path=False, max_sensitivity_step=None, minimum_time_horizon=None, use_posterior_schedule=False):
         self.controllable_object = controllable_object
         self.track_side = track_side
         self.dt = dt
@@ -49,6 +91,59 @@ class CEIAgent(Agent):
         self.preferred_velocity = preferred_velocity
         self.time_horizon = time_horizon
         self.belief_frequency = belief_frequency
+        self.plan_cache = plan_cache
+        self.planner_backend = planner_backend if planner_backend is not None else SLSQPBackend()
+
+        # the risk constraint is either a single inequality on the maximum collision probability over all belief points, or one inequality per point.
+        # One inequality per point is only supported by the Gauss-Newton backend, whose linearized sub-problems work best with it. SLSQP does worse
+        # with it: on the 75 planning problems recorded in scenarios A-D, it fails 6 times (0 times with the maximum), the mean cost is 662 instead of
+        # 599 and the scalar constraint is violated by up to 0.18.
+        self.use_vector_risk_constraint = use_vector_risk_constraint
+
+        if use_vector_risk_constraint and not isinstance(self.planner_backend, GaussNewtonBackend):
+            raise ValueError('The vector risk constraint can only be used with the Gauss-Newton backend, not with %s' % self.planner_backend.name)
+
+        # optionally, every plan update has a wall-clock budget [s] (e.g. for real-time simulations). When the budget runs out, the best feasible plan
+        # found so far is used, or the current plan is continued if no feasible plan was found. The number of plan updates that ran out of time is counted.
+        self.planning_deadline = planning_deadline
+        self.planning_deadline_overruns = 0
+
+        # optionally, when the plan is updated because the risk dropped below the lower bound, the agent first minimizes the cost without the risk
+        # constraint. If that plan satisfies the constraint, it is the solution of the constrained problem as well and the constrained optimization is skipped.
+        self.use_unconstrained_fast_path = use_unconstrained_fast_path
+
+        # optionally, a plan update first tries a single linearized correction of the current plan for the change in the belief and the initial state since
+        # the last update. The correction is used when it satisfies the risk constraint and changes no action by more than this value, otherwise (or
+        # when None) the planning problem is solved completely.
+        self.max_sensitivity_step = max_sensitivity_step
+
+        # optionally, the agent plans over a shorter horizon (with fewer belief points) while it can not collide with the other vehicle within the full
+        # time horizon, e.g. when the other vehicle is too far ahead to reach. The horizon grows back to the full time horizon as soon as a collision is
+        # possible again.
+        self.minimum_time_horizon = minimum_time_horizon
+        self.current_time_horizon = time_horizon
+
+        if minimum_time_horizon is not None and not 0. < minimum_time_horizon <= time_horizon:
+            raise ValueError('The minimum time horizon should be between 0 and the time horizon (%.2f s)' % time_horizon)
+
+        # optionally, the belief update uses precomputed standard deviations and gains for the belief points that follow the posterior schedule (see
+        # PosteriorSchedule). The results equal the full posterior up to rounding errors, but the simulation can be sensitive to these.
+        self.use_posterior_schedule = use_posterior_schedule
+
+        # optionally, when the optimization fails, the agent solves the problem again from this number of initial conditions at once, using the planning
+        # pool of the sim master. Without a planning pool, the problem is solved again from the best initial condition only.
+        self.number_of_parallel_starts = number_of_parallel_starts
+
+        # the solver statistics of the plan update on the last tick (None if the plan was not updated), these are stored by the sim master
+        self.plan_update_telemetry = None
+
+        # the state of the planner backend after the last successful solve, backends that support it continue from this state on the next plan update
+        self._planner_warm_start = WarmStart()
+        self._time_of_planner_warm_start = 0.
+
+        # when recording is enabled, a snapshot of every planning problem is stored (e.g. for benchmarking planner backends)
+        self.record_planning_problems = record_planning_problems
+        self.recorded_planning_problems = []
 
         # the action plan consists of the action (acceleration) to take at the coming time steps. The position plan is the set of positions along the track
         # where the ego vehicle will end up when taking these actions.
@@ -57,24 +152,63 @@ class CEIAgent(Agent):
         self.position_plan = np.array([0.0] * int((1000 / dt) * time_horizon))
         self.action_bounds = optimize.Bounds([-1.] * len(self.action_plan), [1.] * len(self.action_plan))
 
-        # the belief consists of sets of a mean and standard deviation for a distribution over positions at every time step.
-        self.belief = []
-        self.belief_time_stamps = []
+        # optionally, the planner optimizes the values of the action plan at a small number of knots instead of the full action plan. The action plan is a
+        # piecewise-linear interpolation between the knots, so the number of decision variables does not depend on the simulation time step.
+        self.number_of_plan_knots = number_of_plan_knots
+        if number_of_plan_knots is not None:
+            self.plan_basis = self._get_piecewise_linear_basis(len(self.action_plan), number_of_plan_knots)
+            self._plan_basis_pseudo_inverse = np.linalg.pinv(self.plan_basis)
+            self.knot_bounds = optimize.Bounds([-1.] * number_of_plan_knots, [1.] * number_of_plan_knots)
+
+            if minimum_time_horizon is not None:
+                # the basis for the shortest plan has to be valid as well
+                self._get_piecewise_linear_basis(int((1000 / dt) * minimum_time_horizon), number_of_plan_knots)
+        else:
+            self.plan_basis = None
+
+        # the belief consists of a mean and standard deviation (the columns) for a distribution over positions at every belief time step (the rows). The
+        # time stamps of the belief points are stored in a circular buffer, the first belief point belongs to the time stamp at the start index.
+        self.belief = np.zeros((int(belief_frequency * time_horizon) + 1, 2))
+        self._belief_time_stamp_buffer = np.zeros(0)
+        self._belief_time_stamp_start_index = 0
         self.belief_point_contributing_to_risk = []
-        for belief_index in range(int(belief_frequency * time_horizon) + 1):
-            self.belief.append([0., 0.])
+
+        # the index in the plan of every belief point, for the time at which it was computed
+        self._plan_index_map = np.zeros(0, dtype=int)
+        self._plan_index_map_time = None
 
         self._time_of_last_update = 0.0
         self.did_plan_update_on_last_tick = 0
         self.perceived_risk = 0.
 
+        # belief points that have a lower collision probability than this for every possible plan are ignored in the risk constraint
+        self.negligible_collision_probability = 1e-12
+
         # the sigma of the likelihood function is fixed and assumed based on the bound of comfortable acceleration (Hoberock 1977)
         self.max_comfortable_acceleration = 1.
 
         # The observed communication is the current velocity of the other vehicle
         self.observed_communication = 0.0
 
-        self.cost_jacobian = autograd.jacobian(self._cost_function)
+        # the adjoint implementation is much faster, the autograd implementation is kept as a reference
+        if use_autograd_cost_jacobian:
+            self.cost_jacobian = autograd.jacobian(self._cost_function)
+        else:
+            self.cost_jacobian = self._cost_function_jacobian
+
+        # without the analytic Jacobian, SLSQP estimates the gradient of the risk constraint with finite differences. The analytic Jacobian is faster,
+        # but the collision probability is discontinuous where the collision bounds start, so both can lead SLSQP to different local optima.
+        self.use_analytic_risk_jacobian = use_analytic_risk_jacobian
+
+        # the trajectories of the most recently evaluated plans are shared between the cost, the constraint and their Jacobians
+        self._rollout_memo = RolloutMemo()
+
+        # a library of motion primitives that can be used to find an initial condition when the optimization fails
+        self.use_motion_primitives = use_motion_primitives
+        self._motion_primitive_library = self._get_motion_primitive_library(len(self.action_plan))
+
+        # the track is fixed during a run, so its contribution to the plan cache key only needs to be computed once
+        self._track_fingerprint = None
         self._is_initialized = False
 
     def reset(self):
@@ -83,21 +217,49 @@ class CEIAgent(Agent):
         self.position_plan = np.array([0.0] * int((1000 / self.dt) * self.time_horizon))
         self.action_bounds = optimize.Bounds([-1.] * len(self.action_plan), [1.] * len(self.action_plan))
 
-        # the belief consists of sets of a mean and standard deviation for a distribution over positions at every time step.
-        self.belief = []
+        # the belief consists of a mean and standard deviation (the columns) for a distribution over positions at every belief time step (the rows).
+        self.belief = np.zeros((int(self.belief_frequency * self.time_horizon) + 1, 2))
         self.belief_time_stamps = []
         self.belief_point_contributing_to_risk = []
-        for belief_index in range(int(self.belief_frequency * self.time_horizon) + 1):
-            self.belief.append([0., 0.])
 
         self._time_of_last_update = 0.0
         self.did_plan_update_on_last_tick = 0
         self.perceived_risk = 0.
+        self.planning_deadline_overruns = 0
+        self.plan_update_telemetry = None
+        self._planner_warm_start = WarmStart()
+        self._time_of_planner_warm_start = 0.
 
         # The observed communication is the current velocity of the other vehicle
         self.observed_communication = 0.0
+        if self.current_time_horizon != self.time_horizon:
+            self._resize_plan_structures(len(self.action_plan))
+            self.current_time_horizon = self.time_horizon
+
         self._is_initialized = False
 
+    @property
+    def belief_time_stamps(self):
+        """ The time stamps of the belief points (in seconds), in the order of the belief points. """
+        return np.roll(self._belief_time_stamp_buffer, -self._belief_time_stamp_start_index)
+
+    @belief_time_stamps.setter
+    def belief_time_stamps(self, time_stamps):
+        self._belief_time_stamp_buffer = np.array(time_stamps, dtype=float)
+        self._belief_time_stamp_start_index = 0
+        self._plan_index_map_time = None
+
+    def _get_belief_time_stamp(self, belief_index):
+        buffer = self._belief_time_stamp_buffer
+        return buffer[(self._belief_time_stamp_start_index + belief_index) % len(buffer)]
+
+    def _advance_belief_time_stamps(self):
+        # the time stamp of the first belief point is replaced by the time stamp of the new last point
+        new_time_stamp = self._get_belief_time_stamp(-1) + 1 / self.belief_frequency
+        self._belief_time_stamp_buffer[self._belief_time_stamp_start_index] = new_time_stamp
+        self._belief_time_stamp_start_index = (self._belief_time_stamp_start_index + 1) % len(self._belief_time_stamp_buffer)
+        self._plan_index_map_time = None
+
     def _observe_communication(self):
         _, other_velocity = self.sim_master.get_current_state(self.track_side.other)
 
@@ -133,9 +295,10 @@ class CEIAgent(Agent):
             mean = ((upper_position_bound - lower_position_bound) / 2.) + lower_position_bound
             sd = (upper_position_bound - mean) / 3
 
-            self.belief[belief_index][0] = mean
-            self.belief[belief_index][1] = sd
-            self.belief_time_stamps.append((1 / self.belief_frequency) * (belief_index + 1))
+            self.belief[belief_index, 0] = mean
+            self.belief[belief_index, 1] = sd
+
+        self.belief_time_stamps = (1 / self.belief_frequency) * np.arange(1, len(self.belief) + 1)
 
     def _update_belief(self, generate_new_point):
         other_position, other_velocity = self.sim_master.get_current_state(self.track_side.other)
@@ -144,215 +307,953 @@ class CEIAgent(Agent):
         if other_position is None or other_velocity is None:
             # no other vehicle exists, no only update the time stamps if needed
             if generate_new_point:
-                self.belief_time_stamps = self.belief_time_stamps[1:] + [self.belief_time_stamps[-1] + time_step]
+                self._advance_belief_time_stamps()
             return
 
-        new_belief = []
-        samples = np.array(self.observed_communication)
-
         first_index_to_consider = 1 if generate_new_point else 0
 
-        for belief_point_index in range(first_index_to_consider, len(self.belief)):
-            prior_mu, prior_sigma = self.belief[belief_point_index]
-            prior_mu -= other_position
+        times = self.belief_time_stamps[first_index_to_consider:] - (self.sim_master.t / 1000.)
+        prior_mu = self.belief[first_index_to_consider:, 0] - other_position
+        prior_sigma = self.belief[first_index_to_consider:, 1]
 
-            time = self.belief_time_stamps[belief_point_index] - (self.sim_master.t / 1000.)
-            likelihood_sigma = (self.max_comfortable_acceleration * time) / 6
+        if self.use_posterior_schedule:
+            posterior_mu, posterior_sigma = self._calculate_scheduled_posterior(prior_mu, prior_sigma, times)
+        else:
+            posterior_mu, posterior_sigma = self._calculate_posterior(prior_mu, prior_sigma, (self.max_comfortable_acceleration * times) / 6,
+                                                                      np.array(self.observed_communication), times)
 
-            posterior_mu, posterior_sigma = self._calculate_posterior(prior_mu, prior_sigma, likelihood_sigma, samples, time)
-            posterior_mu += other_position
+        if generate_new_point:
+            self.belief[:-1, 0] = posterior_mu + other_position
+            self.belief[:-1, 1] = posterior_sigma
+            self.belief[-1] = self._get_new_belief_point(other_position, other_velocity, time_step * len(self.belief))
+            self._advance_belief_time_stamps()
+        else:
+            self.belief[:, 0] = posterior_mu + other_position
+            self.belief[:, 1] = posterior_sigma
+
+    def _calculate_scheduled_posterior(self, prior_mu, prior_sigma, times):
+        posterior_mu, posterior_sigma, follows_schedule = self._get_posterior_schedule().get_posterior(prior_mu, prior_sigma, times,
+                                                                                                        self.observed_communication)
+
+        if not follows_schedule.all():
+            # e.g. the belief points of the initial belief, these are calculated with the full posterior
+            off_schedule = ~follows_schedule
+            posterior_mu[off_schedule], posterior_sigma[off_schedule] = self._calculate_posterior(prior_mu[off_schedule], prior_sigma[off_schedule],
+                                                                                                  (self.max_comfortable_acceleration *
+                                                                                                   times[off_schedule]) / 6,
+                                                                                                  np.array(self.observed_communication),
+                                                                                                  times[off_schedule])
 
-            new_belief += [[posterior_mu, posterior_sigma]]
+        return posterior_mu, posterior_sigma
 
-        if generate_new_point:
-            # calculate bounds on end point
-            time_until_last_point = time_step * len(self.belief)
-            max_acceleration = self.controllable_object.max_acceleration
-            min_velocity = other_velocity - (max_acceleration * time_until_last_point) / 2
-            max_velocity = other_velocity + (max_acceleration * time_until_last_point) / 2
+    def _get_posterior_schedule(self):
+        configuration = (self.dt, self.belief_frequency, len(self.belief), self.max_comfortable_acceleration, self.controllable_object.max_acceleration)
 
-            if min_velocity < 0.:
-                min_velocity = 0.
+        if configuration not in CEIAgent._posterior_schedules:
+            CEIAgent._posterior_schedules[configuration] = PosteriorSchedule(*configuration, posterior_function=self._calculate_posterior)
 
-            lower_position_bound = other_position + min_velocity * time_until_last_point
-            upper_position_bound = other_position + max_velocity * time_until_last_point
+        return CEIAgent._posterior_schedules[configuration]
 
-            last_mu = lower_position_bound + (upper_position_bound - lower_position_bound) / 2
-            last_sigma = (upper_position_bound - last_mu) / 3
+    def _get_new_belief_point(self, other_position, other_velocity, time_until_point):
+        """
+        Returns the mean and standard deviation of a new belief point, based on the bounds on the position of the other vehicle at the time of the point.
+        """
+        lower_position_bound, upper_position_bound = self._get_other_position_bounds(other_position, other_velocity, time_until_point)
 
-            new_belief += [[last_mu, last_sigma]]
+        mu = lower_position_bound + (upper_position_bound - lower_position_bound) / 2
+        sigma = (upper_position_bound - mu) / 3
 
-            self.belief = new_belief
-            self.belief_time_stamps = self.belief_time_stamps[1:] + [self.belief_time_stamps[-1] + time_step]
-        else:
-            self.belief = new_belief
+        return [mu, sigma]
+
+    def _get_other_position_bounds(self, other_position, other_velocity, time_until_point):
+        max_acceleration = self.controllable_object.max_acceleration
+        min_velocity = other_velocity - (max_acceleration * time_until_point) / 2
+        max_velocity = other_velocity + (max_acceleration * time_until_point) / 2
+
+        if np.ndim(min_velocity):
+            min_velocity = np.maximum(min_velocity, 0.)
+        elif min_velocity < 0.:
+            min_velocity = 0.
+
+        return other_position + min_velocity * time_until_point, other_position + max_velocity * time_until_point
 
     @staticmethod
     def _calculate_posterior(prior_mu, prior_sigma, likelihood_sigma, samples: np.ndarray, time_step):
-        samples = np.array([samples])
+        """
+        Calculates the posterior for all belief points at once. The priors, the likelihood sigmas and the time steps are arrays with one element per
+        belief point (or scalars), the samples are the observations that are shared by all belief points.
+        """
+        samples = np.atleast_1d(samples)
 
         n = len(samples)
 
         posterior_sigma = (likelihood_sigma ** 2 * prior_sigma ** 2) / (likelihood_sigma ** 2 + prior_sigma ** 2 * (n / (time_step ** 2)))
-        posterior_mu = (prior_mu * likelihood_sigma ** 2 + sum(samples * prior_sigma ** 2 / time_step)) / (
+        posterior_mu = (prior_mu * likelihood_sigma ** 2 + np.sum(samples) * prior_sigma ** 2 / time_step) / (
                 likelihood_sigma ** 2 + prior_sigma ** 2 * (n / (time_step ** 2)))
 
-        posterior_sigma = max(posterior_sigma, 1e-3)
+        posterior_sigma = np.maximum(posterior_sigma, 1e-3)
         return posterior_mu, posterior_sigma
 
     def _evaluate_risk(self):
+        if self._is_collision_probability_zero(self.belief, self.position_plan):
+            self.belief_point_contributing_to_risk = [False] * (len(self.belief) - 1)
+            return 0.
+
         max_risk, risk_per_point = self._get_collision_probability(self.belief, self.position_plan)
         self.belief_point_contributing_to_risk = [bool(p) for p in risk_per_point]
         return max_risk
 
-    def _get_collision_probability(self, belief, position_plan):
-        probabilities_over_plan = []
+    def _get_collision_probability(self, belief, position_plan, belief_indices=None):
+        """
+        :param belief_indices: the indices of the belief points to consider, all other points are assumed to have a collision probability of 0. None
+            means all points are considered.
+        """
+        if belief_indices is None:
+            belief_indices = np.arange(len(belief) - 1)
+        else:
+            belief_indices = np.asarray(belief_indices, dtype=int)
+
+        probabilities_over_plan = np.zeros(len(belief) - 1)
+
+        if len(belief_indices):
+            plan_indices = self._get_plan_indices(belief_indices, self.sim_master.t / 1000.)
+            lower_bounds, upper_bounds, collision_possible = self.track.get_collision_bounds_approximation_batch(position_plan[plan_indices])
+
+            # a bound of exactly 0.0 is also treated as no collision possible
+            collision_possible &= (lower_bounds != 0.) & (upper_bounds != 0.)
+
+            if np.any(collision_possible):
+                belief_points = np.asarray(belief, dtype=float)[belief_indices[collision_possible]]
+                probabilities_over_plan[belief_indices[collision_possible]] = self._get_normal_probability(belief_points[:, 0], belief_points[:, 1],
+                                                                                                           lower_bounds[collision_possible],
+                                                                                                           upper_bounds[collision_possible])
+
+        return np.amax(probabilities_over_plan), probabilities_over_plan
+
+    def _is_collision_probability_zero(self, belief, position_plan):
+        """
+        A cheap interval test that is used to skip the evaluation of the collision probability per belief point. The collision bounds of every point in
+        the plan lie within the bounds for the range of positions in the plan. When no collision is possible in this range, or when the normal CDF of every
+        belief point evaluates to exactly the same value at both ends of the range, the collision probability of every belief point is exactly zero. So
+        skipping the evaluation does not change the risk or the belief points that contribute to it.
+        """
+        lower_bound, upper_bound = self.track.get_collision_bounds_approximation_range(np.min(position_plan), np.max(position_plan))
+
+        if lower_bound is None or upper_bound is None:
+            return True
+
+        belief_points = np.asarray(belief[:-1], dtype=float)
+        mu, sigma = belief_points[:, 0], belief_points[:, 1]
+
+        if not np.all(sigma > 0.):
+            return False
+
+        return bool(np.all(special.ndtr((upper_bound - mu) / sigma) == special.ndtr((lower_bound - mu) / sigma)))
+
+    def _get_collision_probability_for_batch(self, belief, position_plans, belief_indices=None):
+        """
+        Vectorized version of _get_collision_probability for a batch of position plans with shape (K, N), returns the maximum collision probability for
+        every plan.
+        """
+        if belief_indices is None:
+            belief_indices = range(len(belief) - 1)
+
+        max_probabilities = np.zeros(position_plans.shape[0])
         current_time = self.sim_master.t / 1000.
 
-        for belief_index, belief_point in enumerate(belief[0:-1]):
-            time_from_now = self.belief_time_stamps[belief_index] - current_time
+        for belief_index in belief_indices:
+            belief_point = belief[belief_index]
+            plan_index = self._get_plan_index(belief_index, current_time)
+
+            # a bound of exactly 0.0 is also treated as no collision possible (like in _get_collision_probability)
+            lower_bounds, upper_bounds, collision_possible = self.track.get_collision_bounds_approximation_batch(position_plans[:, plan_index])
+            collision_possible &= (lower_bounds != 0.) & (upper_bounds != 0.)
+
+            if np.any(collision_possible):
+                probabilities = self._get_normal_probability(belief_point[0], belief_point[1], lower_bounds[collision_possible],
+                                                             upper_bounds[collision_possible])
+                max_probabilities[collision_possible] = np.maximum(max_probabilities[collision_possible], probabilities)
+
+        return max_probabilities
+
+    def _get_plan_index(self, belief_index, current_time):
+        return int(self._get_plan_index_map(current_time)[belief_index])
+
+    def _get_plan_indices(self, belief_indices, current_time):
+        """ Vectorized version of _get_plan_index for an array of belief indices. """
+        return self._get_plan_index_map(current_time)[belief_indices]
+
+    def _get_plan_index_map(self, current_time):
+        """
+        Returns the index in the plan that corresponds to every belief point. The map only changes when the time advances or the belief time stamps change,
+        so it is computed once and reused by all evaluations of the risk constraint within a plan update.
+        """
+        if self._plan_index_map_time != current_time:
+            times_from_now = self.belief_time_stamps - current_time
+
+            assert np.all(np.abs(np.round(times_from_now / (self.dt / 1000)) - times_from_now / (self.dt / 1000)) < 10e-10)
+
+            self._plan_index_map = (times_from_now / (self.dt / 1000)).astype(int) - 1
+            self._plan_index_map_time = current_time
+
+        return self._plan_index_map
+
+    def _get_risk_relevant_belief_indices(self):
+        """
+        Returns the indices of the belief points that can contribute to the collision probability of any plan within the action bounds. The positions in
+        the plan increase monotonically with the actions, so every plan stays between the plans with the minimal and maximal actions. Belief points for
+        which the collision probability is negligible for all positions between these extremes can be skipped when evaluating the risk constraint. This
+        includes all points for which the ego vehicle can not reach the collision area.
+        """
+        extreme_positions = []
+        for extreme_plan in [self.action_bounds.lb, self.action_bounds.ub]:
+            positions, _ = self.controllable_object.calculate_trajectory_1d(self.dt / 1000.,
+                                                                            self.controllable_object.traveled_distance,
+                                                                            self.controllable_object.velocity,
+                                                                            np.asarray(extreme_plan, dtype=float) * self.controllable_object.max_acceleration,
+                                                                            self.controllable_object.resistance_coefficient,
+                                                                            self.controllable_object.constant_resistance)
+            extreme_positions.append(positions)
 
-            assert abs(round(time_from_now / (self.dt / 1000)) - time_from_now / (self.dt / 1000)) < 10e-10
+        current_time = self.sim_master.t / 1000.
+        belief_indices = []
 
-            plan_index = int(time_from_now / (self.dt / 1000)) - 1
+        for belief_index in range(len(self.belief) - 1):
+            plan_index = self._get_plan_index(belief_index, current_time)
 
-            position_plan_point = position_plan[plan_index]
-            lower_bound, upper_bound = self.track.get_collision_bounds_approximation(position_plan_point)
+            lower_bound, upper_bound = self.track.get_collision_bounds_approximation_range(extreme_positions[0][plan_index],
+                                                                                          extreme_positions[1][plan_index])
 
             if lower_bound and upper_bound:
-                collision_probability = self._get_normal_probability(belief_point[0], belief_point[1], lower_bound, upper_bound)
-                probabilities_over_plan += [collision_probability]
-            else:
-                probabilities_over_plan += [0.]
+                mu, sigma = self.belief[belief_index]
+                max_collision_probability = normal_interval_probability(mu, sigma, lower_bound, upper_bound)
 
-        return np.amax(probabilities_over_plan), probabilities_over_plan
+                if max_collision_probability > self.negligible_collision_probability:
+                    belief_indices.append(belief_index)
 
-    def _plan_constraint(self, plan, initial_position, initial_velocity, resistance_coefficient, constant_resistance):
-        position_plan = []
+        return belief_indices
 
-        position = initial_position
-        velocity = initial_velocity
+    def _get_collision_probability_derivative(self, belief_point, position_plan_point):
+        """
+        Returns the derivative of the collision probability for a single belief point with respect to the position of the ego vehicle at the corresponding
+        point in the plan.
+        """
+        lower_bound, upper_bound = self.track.get_collision_bounds_approximation(position_plan_point)
 
-        for index, acceleration_command in enumerate(plan):
-            acceleration = acceleration_command * self.controllable_object.max_acceleration
-            position, velocity = self.controllable_object.calculate_time_step_1d(self.dt / 1000., position, velocity, acceleration, resistance_coefficient,
-                                                                                 constant_resistance)
-            position_plan += [position]
+        if not (lower_bound and upper_bound):
+            return 0.
 
-        collision_probability, _ = self._get_collision_probability(self.belief, position_plan)
+        d_lower_bound, d_upper_bound = self.track.get_collision_bounds_approximation_derivative(position_plan_point)
+        mu, sigma = belief_point
+
+        return normal_pdf(upper_bound, mu, sigma) * d_upper_bound - normal_pdf(lower_bound, mu, sigma) * d_lower_bound
+
+    def _plan_constraint(self, plan, initial_position, initial_velocity, resistance_coefficient, constant_resistance, belief_indices=None):
+        if belief_indices is not None and not belief_indices:
+            # no plan within the action bounds can lead to a collision risk
+            return (self.risk_bounds[0] + self.risk_bounds[1]) / 2
+
+        position_plan, _ = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance, initial_position)
+
+        collision_probability, _ = self._get_collision_probability(self.belief, position_plan, belief_indices)
 
         return ((self.risk_bounds[0] + self.risk_bounds[1]) / 2) - collision_probability
 
+    def _get_plan_index_of_highest_risk(self, plan, initial_position, initial_velocity, resistance_coefficient, constant_resistance, belief_indices=None):
+        """ Returns the index in the plan of the belief point with the highest collision probability, or None when the collision probability is 0. """
+        if belief_indices is not None and not belief_indices:
+            return None
+
+        position_plan, _ = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance, initial_position)
+        collision_probability, probabilities_over_plan = self._get_collision_probability(self.belief, position_plan, belief_indices)
+
+        if collision_probability == 0.:
+            return None
+
+        return self._get_plan_index(int(np.argmax(probabilities_over_plan)), self.sim_master.t / 1000.)
+
+    def _plan_constraint_jacobian(self, plan, initial_position, initial_velocity, resistance_coefficient, constant_resistance, belief_indices=None):
+        """
+        The exact gradient of _plan_constraint with respect to the plan. The constraint only depends on the belief point with the highest collision
+        probability, so the gradient is the derivative of that probability with respect to the corresponding position in the plan, propagated back through
+        the vehicle dynamics with calculate_trajectory_gradient_1d.
+        """
+        if belief_indices is not None and not belief_indices:
+            return np.zeros(len(plan))
+
+        position_plan, velocities = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance, initial_position)
+
+        collision_probability, probabilities_over_plan = self._get_collision_probability(self.belief, position_plan, belief_indices)
+
+        if collision_probability == 0.:
+            return np.zeros(len(plan))
+
+        belief_index = int(np.argmax(probabilities_over_plan))
+        plan_index = self._get_plan_index(belief_index, self.sim_master.t / 1000.)
+
+        position_weights = np.zeros(len(plan))
+        position_weights[plan_index] = -self._get_collision_probability_derivative(self.belief[belief_index], position_plan[plan_index])
+
+        gradient = self.controllable_object.calculate_trajectory_gradient_1d(self.dt / 1000., initial_velocity, velocities, resistance_coefficient,
+                                                                             position_weights=position_weights)
+        return gradient * self.controllable_object.max_acceleration
+
+    def _plan_constraints(self, plan, initial_position, initial_velocity, resistance_coefficient, constant_resistance, belief_indices=None):
+        """
+        The risk constraint with one inequality per belief point (instead of a single inequality on the maximum over all points), every belief point in
+        belief_indices should have a collision probability below the middle of the risk bounds. Unlike the maximum, every separate constraint is smooth.
+        """
+        if belief_indices is None:
+            belief_indices = range(len(self.belief) - 1)
+
+        position_plan, _ = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance, initial_position)
+
+        _, probabilities_over_plan = self._get_collision_probability(self.belief, position_plan, belief_indices)
+
+        return ((self.risk_bounds[0] + self.risk_bounds[1]) / 2) - probabilities_over_plan[np.asarray(belief_indices, dtype=int)]
+
+    def _plan_constraints_jacobian(self, plan, initial_position, initial_velocity, resistance_coefficient, constant_resistance, belief_indices=None):
+        """
+        The Jacobian of _plan_constraints, every row is obtained with a reverse sweep through the vehicle dynamics like in _plan_constraint_jacobian.
+        """
+        if belief_indices is None:
+            belief_indices = range(len(self.belief) - 1)
+
+        position_plan, velocities = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance, initial_position)
+
+        jacobian = np.zeros((len(belief_indices), len(plan)))
+        current_time = self.sim_master.t / 1000.
+
+        for row, belief_index in enumerate(belief_indices):
+            plan_index = self._get_plan_index(belief_index, current_time)
+            derivative = self._get_collision_probability_derivative(self.belief[belief_index], position_plan[plan_index])
+
+            if derivative:
+                position_weights = np.zeros(len(plan))
+                position_weights[plan_index] = -derivative
+                jacobian[row, :] = self.controllable_object.calculate_trajectory_gradient_1d(self.dt / 1000., initial_velocity, velocities,
+                                                                                             resistance_coefficient, position_weights=position_weights)
+
+        return jacobian * self.controllable_object.max_acceleration
+
+    def _get_risk_constraint_functions(self, belief_indices):
+        """
+        Returns the risk constraint and its Jacobian as used by the optimizer. The vector valued constraint needs at least one belief point.
+        """
+        if self.use_vector_risk_constraint and (belief_indices is None or len(belief_indices)):
+            return self._plan_constraints, self._plan_constraints_jacobian
+        else:
+            return self._plan_constraint, self._plan_constraint_jacobian
+
     @staticmethod
     def _get_normal_probability(mu, sigma, lower_bound, upper_bound):
         if lower_bound is None:
-            return stats.norm.cdf(upper_bound, mu, sigma)
+            lower_bound = -np.inf
         elif upper_bound is None:
-            return 1 - stats.norm.cdf(lower_bound, mu, sigma)
-        else:
-            return stats.norm.cdf(upper_bound, mu, sigma) - stats.norm.cdf(lower_bound, mu, sigma)
+            upper_bound = np.inf
 
-    def _do_rough_grid_search_for_initial_condition(self):
-        initial_conditions = [np.array([-1.] * len(self.action_plan)),
-                              np.array([0.] * len(self.action_plan)),
-                              np.array([1.] * len(self.action_plan)),
-                              self.action_plan]
+        return normal_interval_probability(mu, sigma, lower_bound, upper_bound)
 
-        last_cost = np.inf
-        last_constraint = -np.inf
-        initial_condition_to_use = None
-        initial_condition_with_highest_constraint = None
+    def evaluate_plans(self, plans, belief_indices=None):
+        """
+        Evaluates the cost function and the risk constraint for a batch of candidate action plans in a single vectorized call. All plans start from the
+        current state of the controlled vehicle.
 
-        for initial_condition in initial_conditions:
-            constraint = self._plan_constraint(initial_condition, self.controllable_object.traveled_distance,
-                                               self.controllable_object.velocity,
-                                               self.controllable_object.resistance_coefficient,
-                                               self.controllable_object.constant_resistance)
+        :param plans: array with shape (K, N), every row is a candidate action plan
+        :param belief_indices: the result of _get_risk_relevant_belief_indices, computed when it is not given
+        :return: costs, constraints; both arrays with shape (K,)
+        """
+        plans = np.atleast_2d(plans)
+        if belief_indices is None:
+            belief_indices = self._get_risk_relevant_belief_indices()
 
-            if constraint > last_constraint:
-                initial_condition_with_highest_constraint = initial_condition
-                last_constraint = constraint
+        position_plans, velocity_plans = self.controllable_object.calculate_trajectory_1d(self.dt / 1000.,
+                                                                                          self.controllable_object.traveled_distance,
+                                                                                          self.controllable_object.velocity,
+                                                                                          plans * self.controllable_object.max_acceleration,
+                                                                                          self.controllable_object.resistance_coefficient,
+                                                                                          self.controllable_object.constant_resistance)
 
-            if constraint >= 0.:
-                cost = self._cost_function(initial_condition,
-                                           self.controllable_object.velocity,
-                                           self.controllable_object.resistance_coefficient,
-                                           self.controllable_object.constant_resistance)
+        costs = np.sum((velocity_plans - self.preferred_velocity) ** 2 + self.theta * plans ** 2, axis=1)
+        collision_probabilities = self._get_collision_probability_for_batch(self.belief, position_plans, belief_indices)
+        constraints = ((self.risk_bounds[0] + self.risk_bounds[1]) / 2) - collision_probabilities
 
-                if cost < last_cost:
-                    initial_condition_to_use = initial_condition
-                    last_cost = cost
+        return costs, constraints
 
-        if initial_condition_to_use is None:
-            return initial_condition_with_highest_constraint
+    @staticmethod
+    def _get_motion_primitive_library(number_of_steps, levels=(-1., -.5, -.25, 0., .25, .5, 1.), switch_fractions=(.25, .5, .75)):
+        """
+        Returns a library of parameterized motion primitives as two arrays with shape (K, number_of_steps): the actions of every primitive and a mask of
+        the steps where the primitive holds its velocity. The actions needed to hold the velocity depend on the state, so these are filled in by
+        _get_motion_primitives. The library contains:
+            - constant actions at every level over the full horizon
+            - a constant action at every level until a switch point, after which the velocity is held (brake-then-hold and accelerate-then-hold)
+            - a linear ramp from 0 to every non-zero level until a switch point (or the end of the plan), after which the level is held
+            - holding the current velocity
+        """
+        steps = np.arange(number_of_steps)
+        plans = []
+        hold_masks = []
+
+        for level in levels:
+            plans += [np.full(number_of_steps, level)]
+            hold_masks += [np.zeros(number_of_steps, dtype=bool)]
+
+            for switch_fraction in switch_fractions:
+                switch_index = int(round(switch_fraction * number_of_steps))
+                plans += [np.where(steps < switch_index, level, 0.)]
+                hold_masks += [steps >= switch_index]
+
+            # a ramp to zero is the constant zero plan
+            if level == 0.:
+                continue
+
+            for ramp_fraction in switch_fractions + (1.,):
+                ramp_length = max(int(round(ramp_fraction * number_of_steps)), 1)
+                plans += [level * np.minimum((steps + 1.) / ramp_length, 1.)]
+                hold_masks += [np.zeros(number_of_steps, dtype=bool)]
+
+        plans += [np.zeros(number_of_steps)]
+        hold_masks += [np.ones(number_of_steps, dtype=bool)]
+
+        return np.asarray(plans), np.asarray(hold_masks)
+
+    def _get_motion_primitives(self):
+        """
+        Returns the motion primitives from the library for the current state of the vehicle. On the steps where a primitive holds its velocity, the action
+        compensates the resistance at the velocity the vehicle has at the start of the hold phase.
+        """
+        plans, hold_masks = self._motion_primitive_library
+        _, velocities = self.controllable_object.calculate_trajectory_1d(self.dt / 1000.,
+                                                                         0.,
+                                                                         self.controllable_object.velocity,
+                                                                         np.where(hold_masks, 0., plans) * self.controllable_object.max_acceleration,
+                                                                         self.controllable_object.resistance_coefficient,
+                                                                         self.controllable_object.constant_resistance)
+
+        # the velocity at the start of the hold phase (the initial velocity if the primitive holds from the first step)
+        number_of_steps_before_hold = np.argmax(np.concatenate([hold_masks, np.ones((len(plans), 1), dtype=bool)], axis=1), axis=1)
+        velocities = np.concatenate([np.full((len(plans), 1), float(self.controllable_object.velocity)), velocities], axis=1)
+        hold_velocities = velocities[np.arange(len(plans)), number_of_steps_before_hold]
+
+        hold_actions = (self.controllable_object.resistance_coefficient * hold_velocities ** 2 + self.controllable_object.constant_resistance) / \
+                       self.controllable_object.max_acceleration
+        hold_actions = np.where(hold_velocities > 0., hold_actions, 0.)
+
+        return np.clip(np.where(hold_masks, hold_actions[:, None], plans), self.action_bounds.lb, self.action_bounds.ub)
+
+    def _get_initial_condition_candidates(self):
+        """
+        Returns the candidates for the initial condition after a failed optimization: all motion primitives if the agent uses them, otherwise constant
+        actions of -1, 0 and 1. The current plan is always the last candidate.
+        """
+        if self.use_motion_primitives:
+            candidates = self._get_motion_primitives()
+        else:
+            candidates = np.outer([-1., 0., 1.], np.ones(len(self.action_plan)))
 
-        return initial_condition_to_use
+        return np.concatenate([candidates, [self.action_plan]])
+
+    def _get_ranked_initial_conditions(self, belief_indices=None):
+        """
+        Scores all candidate initial conditions in a single vectorized evaluation. Returns the unique candidates ordered from best to worst: first the
+        feasible candidates by increasing cost, then the infeasible candidates by decreasing value of the risk constraint.
+        """
+        initial_conditions = self._get_initial_condition_candidates()
+        _, unique_indices = np.unique(initial_conditions, axis=0, return_index=True)
+        initial_conditions = initial_conditions[np.sort(unique_indices)]
+
+        costs, constraints = self.evaluate_plans(initial_conditions, belief_indices)
+        is_feasible = constraints >= 0.
+
+        return initial_conditions[np.lexsort((np.where(is_feasible, costs, -constraints), ~is_feasible))]
+
+    def _do_rough_grid_search_for_initial_condition(self, belief_indices=None):
+        return self._get_ranked_initial_conditions(belief_indices)[0]
+
+    def _get_plan_cache_key(self):
+        """
+        A hash of all inputs that determine the outcome of the optimization in _solve_plan.
+        """
+        if self._track_fingerprint is None:
+            self._track_fingerprint = pickle.dumps(self.track)
+
+        current_time = self.sim_master.t / 1000.
+        belief_times_from_now = np.array(self.belief_time_stamps) - current_time
+
+        return self.plan_cache.get_key(self.action_plan,
+                                       self.controllable_object.traveled_distance,
+                                       self.controllable_object.velocity,
+                                       self.controllable_object.resistance_coefficient,
+                                       self.controllable_object.constant_resistance,
+                                       self.controllable_object.max_acceleration,
+                                       self.dt,
+                                       self.preferred_velocity,
+                                       self.theta,
+                                       tuple(self.risk_bounds),
+                                       np.array(self.belief, dtype=float),
+                                       belief_times_from_now,
+                                       self.action_bounds.lb,
+                                       self.action_bounds.ub,
+                                       self._track_fingerprint,
+                                       self.planner_backend,
+                                       self.number_of_plan_knots,
+                                       self.use_vector_risk_constraint,
+                                       self.use_unconstrained_fast_path,
+                                       self.max_sensitivity_step,
+                                       self.current_time_horizon,
+                                       None if self._get_planning_pool() is None else self.number_of_parallel_starts,
+                                       self._get_planner_warm_start().get_fingerprint() if self.planner_backend.uses_warm_start else None)
 
     def _update_plan(self):
+        start_time = time.perf_counter()
+        cached_result = None
+        result = None
 
-        result = optimize.minimize(self._cost_function,
-                                   self.action_plan,
-                                   args=(self.controllable_object.velocity,
-                                         self.controllable_object.resistance_coefficient,
-                                         self.controllable_object.constant_resistance),
-                                   jac=self.cost_jacobian,
-                                   bounds=self.action_bounds,
-                                   constraints={'type': 'ineq',
-                                                'fun': self._plan_constraint,
-                                                'args': (self.controllable_object.traveled_distance,
-                                                         self.controllable_object.velocity,
-                                                         self.controllable_object.resistance_coefficient,
-                                                         self.controllable_object.constant_resistance)})
-
-        if not result.success:
-            initial_condition = self._do_rough_grid_search_for_initial_condition()
-            result = optimize.minimize(self._cost_function,
-                                       initial_condition,
-                                       args=(self.controllable_object.velocity,
-                                             self.controllable_object.resistance_coefficient,
-                                             self.controllable_object.constant_resistance),
-                                       jac=self.cost_jacobian,
-                                       bounds=self.action_bounds,
-                                       constraints={'type': 'ineq',
-                                                    'fun': self._plan_constraint,
-                                                    'args': (self.controllable_object.traveled_distance,
-                                                             self.controllable_object.velocity,
-                                                             self.controllable_object.resistance_coefficient,
-                                                             self.controllable_object.constant_resistance)})
-            if not result.success:
-                warnings.warn('planning failed')
+        if self.record_planning_problems:
+            self.recorded_planning_problems.append(PlanningProblem(self))
+
+        if self.plan_cache is not None:
+            cache_key = self._get_plan_cache_key()
+            cached_result = self.plan_cache.get(cache_key)
+
+        if cached_result is not None:
+            new_plan, success = cached_result
+        else:
+            result = self._solve_plan()
+            new_plan, success = result.x, result.success
+
+            # results that were cut short by the deadline depend on the speed of the machine, so these are not cached
+            if self.plan_cache is not None and not result.deadline_exceeded:
+                self.plan_cache.put(cache_key, new_plan, success)
+
+        if not success:
+            warnings.warn('planning failed')
 
-        self.action_plan = result.x
+        self.action_plan = new_plan
         self._calculate_position_plan()
 
+        if not self._is_initialized:
+            trigger = 'initial'
+        elif self.did_plan_update_on_last_tick == 1:
+            trigger = 'upper risk bound'
+        else:
+            trigger = 'lower risk bound'
+
+        self.plan_update_telemetry = {'t': self.sim_master.t / 1000.,
+                                      'trigger': trigger,
+                                      'wall_time': time.perf_counter() - start_time,
+                                      'iterations': result.nit if result is not None else 0,
+                                      'function_evaluations': result.nfev if result is not None else 0,
+                                      'jacobian_evaluations': result.njev if result is not None else 0,
+                                      'constraint_evaluations': result.ncev if result is not None else 0,
+                                      'constraint_jacobian_evaluations': result.ncjev if result is not None else 0,
+                                      'success': bool(success),
+                                      'used_fallback': result.used_fallback if result is not None else False,
+                                      'used_fast_path': result.used_fast_path if result is not None else False,
+                                      'used_sensitivity_update': result.used_sensitivity_update if result is not None else False,
+                                      'deadline_exceeded': result.deadline_exceeded if result is not None else False,
+                                      'cache_hit': cached_result is not None}
+
+    def _solve_plan(self):
+        self._rollout_memo.clear()
+        deadline = None if self.planning_deadline is None else time.perf_counter() + self.planning_deadline
+
+        # the belief and the state do not change during a plan update, so the belief points that can contribute risk are only determined once
+        belief_indices = self._get_risk_relevant_belief_indices()
+
+        skipped_results = []
+        if self.use_unconstrained_fast_path and self.did_plan_update_on_last_tick == -1:
+            unconstrained_result = self._solve_unconstrained_plan(belief_indices)
+            if unconstrained_result.success:
+                return unconstrained_result
+            skipped_results.append(unconstrained_result)
+
+        if self.max_sensitivity_step is not None and self._is_initialized:
+            sensitivity_result = self._solve_sensitivity_update(belief_indices)
+            if sensitivity_result.success:
+                return sensitivity_result
+            skipped_results.append(sensitivity_result)
+
+        result = self._minimize(self.planner_backend, self.action_plan, deadline, belief_indices=belief_indices)
+        result.used_fallback = False
+
+        if not result.success and not result.deadline_exceeded:
+            first_result = result
+            planning_pool = self._get_planning_pool()
+
+            if planning_pool is None:
+                initial_condition = self._do_rough_grid_search_for_initial_condition(belief_indices)
+                result = self._minimize(self.planner_backend, initial_condition, deadline, belief_indices=belief_indices)
+            else:
+                result = self._solve_from_parallel_starts(planning_pool, deadline, belief_indices)
+            result.used_fallback = True
+
+            # the evaluation counts cover both optimizations
+            for counter in ['nit', 'nfev', 'njev', 'ncev', 'ncjev']:
+                result[counter] += first_result[counter]
+
+        result.used_fast_path = False
+        result.used_sensitivity_update = False
+        for skipped_result in skipped_results:
+            for counter in ['nit', 'nfev', 'njev', 'ncev', 'ncjev']:
+                result[counter] += skipped_result[counter]
+
+        if result.deadline_exceeded:
+            self.planning_deadline_overruns += 1
+
+            if not result.success:
+                # no feasible plan was found in time, continue with the current (shifted) plan
+                result.x = self.action_plan.copy()
+
+        return result
+
+    def _solve_unconstrained_plan(self, belief_indices=None):
+        """
+        Minimizes the cost within the action bounds, without the risk constraint. The cost is a sum of squares, so this uses a bounded least-squares solver
+        on the cost residuals. The result is only successful when the unconstrained optimum satisfies the risk constraint.
+        """
+        if self.plan_basis is not None:
+            least_squares_result = optimize.least_squares(self._knot_cost_residuals, self._get_knots(self.action_plan),
+                                                          jac=self._knot_cost_residuals_jacobian, bounds=(self.knot_bounds.lb, self.knot_bounds.ub),
+                                                          args=self._get_cost_arguments())
+            plan = self._expand_knots(least_squares_result.x)
+        else:
+            least_squares_result = optimize.least_squares(self._cost_residuals, np.clip(self.action_plan, self.action_bounds.lb, self.action_bounds.ub),
+                                                          jac=self._cost_residuals_jacobian, bounds=(self.action_bounds.lb, self.action_bounds.ub),
+                                                          args=self._get_cost_arguments())
+            plan = least_squares_result.x
+
+        is_feasible = self._plan_constraint(plan, *self._get_constraint_arguments(belief_indices)) >= 0.
+
+        return optimize.OptimizeResult(x=plan, fun=2 * least_squares_result.cost, success=least_squares_result.success and is_feasible,
+                                       message=least_squares_result.message, nit=least_squares_result.njev, nfev=least_squares_result.nfev,
+                                       njev=least_squares_result.njev, ncev=1, ncjev=0, used_fallback=False, used_fast_path=True,
+                                       used_sensitivity_update=False, deadline_exceeded=False)
+
+    def _solve_sensitivity_update(self, belief_indices=None):
+        """
+        Corrects the current plan with a single step of a sequential quadratic programming method. The current (shifted) plan was optimal for the belief
+        and the initial state at the last plan update, so when these changed only slightly, the new optimum is close to it. The quadratic model of the
+        problem at the current plan, with the current belief and initial state, uses the Gauss-Newton Hessian of the cost and the linearized risk
+        constraint. Its solution is the first-order prediction of the new optimum (the change of the optimum predicted by the sensitivity of the KKT
+        conditions). The result is only successful when the linearized constraint can be satisfied, no action changes more than max_sensitivity_step and
+        the new plan satisfies the risk constraint.
+        """
+        optimizer_arguments = self._get_optimizer_arguments(self.action_plan, belief_indices)
+        plan = np.clip(optimizer_arguments['x0'], optimizer_arguments['bounds'].lb, optimizer_arguments['bounds'].ub)
+        cost_arguments = optimizer_arguments['args']
+        constraint = optimizer_arguments['constraints']
+
+        residual_jacobian = self._knot_cost_residuals_jacobian if self.plan_basis is not None else self._cost_residuals_jacobian
+        jacobian = residual_jacobian(plan, *cost_arguments)
+        constraint_values = np.atleast_1d(constraint['fun'](plan, *constraint['args']))
+        constraint_gradients = np.atleast_2d(_get_constraint_jacobian(constraint)(plan, *constraint['args']))
+
+        hessian = 2 * jacobian.T @ jacobian
+        gradient = optimizer_arguments['jac'](plan, *cost_arguments)
+        lower_bounds = optimizer_arguments['bounds'].lb - plan
+        upper_bounds = optimizer_arguments['bounds'].ub - plan
+
+        # the quadratic program is first solved for a guess of the active set: the bounds at which the current plan is and the violated constraints
+        solution = _solve_quadratic_program_on_active_set(hessian, gradient, constraint_gradients, constraint_values, 1e6, lower_bounds, upper_bounds,
+                                                          constraint_values < 0., lower_bounds >= 0., upper_bounds <= 0.)
+        if solution is not None:
+            step, _ = solution
+            is_linearization_feasible = True
+        else:
+            try:
+                step, elastic_variables, _ = _solve_elastic_quadratic_program(hessian, gradient, constraint_gradients, constraint_values, 1e6,
+                                                                              lower_bounds, upper_bounds)
+                is_linearization_feasible = np.max(elastic_variables, initial=0.) <= 1e-6
+            except linalg.LinAlgError:
+                # the sub-problem can not be solved, so the plan is updated by the optimizer instead
+                step = np.zeros(len(plan))
+                is_linearization_feasible = False
+
+        new_plan = np.clip(plan + step, optimizer_arguments['bounds'].lb, optimizer_arguments['bounds'].ub)
+
+        if self.plan_basis is not None:
+            new_plan = self._expand_knots(new_plan)
+
+        success = is_linearization_feasible and np.max(np.abs(new_plan - self.action_plan)) <= self.max_sensitivity_step and \
+            self._plan_constraint(new_plan, *self._get_constraint_arguments(belief_indices)) >= 0.
+
+        return optimize.OptimizeResult(x=new_plan, success=success, nit=1, nfev=0, njev=1, ncev=2, ncjev=1, used_fallback=False, used_fast_path=False,
+                                       used_sensitivity_update=True, deadline_exceeded=False)
+
+    def _get_planning_pool(self):
+        if self.number_of_parallel_starts is None:
+            return None
+
+        return getattr(self.sim_master, 'planning_pool', None)
+
+    def _solve_from_parallel_starts(self, planning_pool, deadline, belief_indices=None):
+        """
+        Solves the planning problem from the best initial conditions at once. The initial conditions are ranked, so the result is the successful result
+        from the best initial condition. If no optimization succeeds, the result that violates the risk constraint the least is used.
+        """
+        initial_conditions = self._get_ranked_initial_conditions(belief_indices)[:self.number_of_parallel_starts]
+        results = planning_pool.solve([PlanningProblem(self, initial_condition) for initial_condition in initial_conditions], self.planner_backend, deadline)
+        results = [result for result in results if result is not None]
+
+        successful_results = [result for result in results if result.success]
+        if successful_results:
+            best_result = successful_results[0]
+        else:
+            _, constraints = self.evaluate_plans(np.array([result.x for result in results]), belief_indices)
+            best_result = results[int(np.argmax(constraints))]
+
+        # the evaluation counts cover all optimizations
+        for counter in ['nit', 'nfev', 'njev', 'ncev', 'ncjev']:
+            best_result[counter] = sum(result[counter] for result in results)
+        best_result.deadline_exceeded = any(result.deadline_exceeded for result in results)
+
+        return best_result
+
+    def _minimize(self, planner_backend, initial_plan, deadline=None, is_cancelled=None, belief_indices=None):
+        """
+        Solves the planning problem from the initial plan
+
+        :param planner_backend: the PlannerBackend to use
+        :param initial_plan: the action plan to start from
+        :param deadline: an optional wall-clock deadline in time.perf_counter() time
+        :param is_cancelled: an optional function without arguments, the optimization stops after the current iteration when it returns True
+        :param belief_indices: the result of _get_risk_relevant_belief_indices, computed when it is not given
+        :return: a scipy OptimizeResult
+        """
+        optimizer_arguments = self._get_optimizer_arguments(initial_plan, belief_indices)
+
+        if deadline is not None:
+            deadline_monitor = _DeadlineMonitor(deadline, optimizer_arguments)
+            optimizer_arguments['callback'] = deadline_monitor
+
+        if is_cancelled is not None:
+            optimizer_arguments['callback'] = self._stop_when_cancelled(is_cancelled, optimizer_arguments.get('callback'))
+
+        if planner_backend.uses_warm_start:
+            optimizer_arguments['warm_start'] = self._get_planner_warm_start()
+
+        if planner_backend.uses_residuals:
+            if self.plan_basis is not None:
+                optimizer_arguments['residuals'] = self._knot_cost_residuals
+                optimizer_arguments['residual_jacobian'] = self._knot_cost_residuals_jacobian
+            else:
+                optimizer_arguments['residuals'] = self._cost_residuals
+                optimizer_arguments['residual_jacobian'] = self._cost_residuals_jacobian
+
+        # scipy does not report the number of constraint evaluations, so these are counted here
+        evaluation_counts = {'fun': 0, 'jac': 0}
+        optimizer_arguments['constraints'] = dict(optimizer_arguments['constraints'])
+        for key in evaluation_counts.keys():
+            # without a constraint Jacobian, the optimizer calls the constraint function for its finite differences
+            if optimizer_arguments['constraints'][key] is not None:
+                optimizer_arguments['constraints'][key] = self._count_evaluations(optimizer_arguments['constraints'][key], evaluation_counts, key)
+
+        result = planner_backend.minimize(**optimizer_arguments)
+        result.ncev = evaluation_counts['fun']
+        result.ncjev = evaluation_counts['jac']
+        result.deadline_exceeded = deadline is not None and deadline_monitor.deadline_exceeded
+
+        if result.deadline_exceeded:
+            result.success = deadline_monitor.best_x is not None
+            if result.success:
+                result.x = deadline_monitor.best_x
+        elif planner_backend.uses_warm_start and result.success and self.plan_basis is None:
+            # the risk constraint is the collision probability of the belief point with the highest risk, so its multiplier belongs to the position in
+            # the plan at that point and is shifted with it
+            plan_index = self._get_plan_index_of_highest_risk(result.x, *optimizer_arguments['constraints']['args'])
+            optimizer_arguments['warm_start'].multiplier_plan_indices = None if plan_index is None else np.array([plan_index])
+
+        if self.plan_basis is not None:
+            result.knots = result.x
+            result.x = self._expand_knots(result.knots)
+
+        return result
+
+    def _get_planner_warm_start(self):
+        """
+        Returns the warm start for the planner backend, shifted along with the action plan since the last solve. The knots of a piecewise-linear plan do
+        not move with the time steps, so after a shift nothing of the state of the knots is kept (apart from the scale of the Hessian approximation).
+        """
+        number_of_steps = int(round((self.sim_master.t - self._time_of_planner_warm_start) / self.dt))
+
+        if self.plan_basis is not None and number_of_steps > 0:
+            number_of_steps = self.number_of_plan_knots
+
+        self._planner_warm_start.shift(number_of_steps)
+        self._time_of_planner_warm_start = self.sim_master.t
+        return self._planner_warm_start
+
+    @staticmethod
+    def _stop_when_cancelled(is_cancelled, callback=None):
+        def cancellation_callback(intermediate_result):
+            if callback is not None:
+                callback(intermediate_result)
+
+            if is_cancelled():
+                raise StopIteration
+
+        return cancellation_callback
+
+    @staticmethod
+    def _count_evaluations(function, evaluation_counts, key):
+        def counted_function(*args):
+            evaluation_counts[key] += 1
+            return function(*args)
+
+        return counted_function
+
+    def _get_cost_arguments(self):
+        return (self.controllable_object.velocity,
+                self.controllable_object.resistance_coefficient,
+                self.controllable_object.constant_resistance)
+
+    def _get_constraint_arguments(self, belief_indices=None):
+        if belief_indices is None:
+            belief_indices = self._get_risk_relevant_belief_indices()
+
+        return (self.controllable_object.traveled_distance,
+                self.controllable_object.velocity,
+                self.controllable_object.resistance_coefficient,
+                self.controllable_object.constant_resistance,
+                belief_indices)
+
+    def _get_optimizer_arguments(self, initial_plan, belief_indices=None):
+        constraint_arguments = self._get_constraint_arguments(belief_indices)
+
+        if self.plan_basis is not None:
+            return {'fun': self._knot_cost_function,
+                    'x0': self._get_knots(initial_plan),
+                    'args': self._get_cost_arguments(),
+                    'jac': self._knot_cost_function_jacobian,
+                    'bounds': self.knot_bounds,
+                    'constraints': {'type': 'ineq',
+                                    'fun': self._knot_plan_constraint,
+                                    'jac': self._knot_plan_constraint_jacobian if self.use_analytic_risk_jacobian else None,
+                                    'args': constraint_arguments}}
+
+        constraint_function, constraint_jacobian = self._get_risk_constraint_functions(constraint_arguments[-1])
+
+        return {'fun': self._cost_function,
+                'x0': initial_plan,
+                'args': self._get_cost_arguments(),
+                'jac': self.cost_jacobian,
+                'bounds': self.action_bounds,
+                'constraints': {'type': 'ineq',
+                                'fun': constraint_function,
+                                'jac': constraint_jacobian if self.use_analytic_risk_jacobian else None,
+                                'args': constraint_arguments}}
+
+    def _get_rollout(self, plan, initial_velocity, resistance_coefficient, constant_resistance, initial_position=None):
+        """
+        Returns the positions and velocities that result from the plan, from the rollout memo if possible.
+
+        :param initial_position: None when only the velocities are needed. The velocities do not depend on the initial position, new rollouts then start
+            at the current position of the vehicle (which is the initial position used by the constraint).
+        """
+        if not isinstance(plan, np.ndarray):
+            # the plan is traced by autograd
+            return self.controllable_object.calculate_trajectory_1d(self.dt / 1000., 0. if initial_position is None else initial_position, initial_velocity,
+                                                                    plan * self.controllable_object.max_acceleration, resistance_coefficient,
+                                                                    constant_resistance)
+
+        key = (plan.tobytes(), plan.shape, initial_velocity, resistance_coefficient, constant_resistance, self.controllable_object.max_acceleration)
+        rollout = self._rollout_memo.get(key, initial_position)
+
+        if rollout is None:
+            if initial_position is None:
+                initial_position = self.controllable_object.traveled_distance
+
+            rollout = self.controllable_object.calculate_trajectory_1d(self.dt / 1000., initial_position, initial_velocity,
+                                                                       plan * self.controllable_object.max_acceleration, resistance_coefficient,
+                                                                       constant_resistance)
+            self._rollout_memo.put(key, initial_position, *rollout)
+
+        return rollout
+
     def _cost_function(self, plan, initial_velocity, resistance_coefficient, constant_resistance):
-        velocities = [0.] * len(plan)
-        previous_position = 0.
-        previous_velocity = initial_velocity
-
-        for index, acceleration_command in enumerate(plan):
-            acceleration = acceleration_command * self.controllable_object.max_acceleration
-            previous_position, previous_velocity = self.controllable_object.calculate_time_step_1d(self.dt / 1000., previous_position, previous_velocity,
-                                                                                                   acceleration,
-                                                                                                   resistance_coefficient, constant_resistance)
-            velocities[index] = previous_velocity
-
-        velocities = np.array(velocities)
+        _, velocities = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance)
+
         cost = sum((velocities - self.preferred_velocity) ** 2 + self.theta * plan ** 2)
         return cost
 
+    def _cost_function_jacobian(self, plan, initial_velocity, resistance_coefficient, constant_resistance):
+        """
+        The gradient of _cost_function, obtained with a reverse sweep through the vehicle dynamics (adjoint method) instead of autograd tracing.
+        """
+        _, velocities = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance)
+
+        velocity_gradient = self.controllable_object.calculate_trajectory_gradient_1d(self.dt / 1000., initial_velocity, velocities, resistance_coefficient,
+                                                                                      velocity_weights=2 * (velocities - self.preferred_velocity))
+        return velocity_gradient * self.controllable_object.max_acceleration + 2 * self.theta * plan
+
+    def _cost_residuals(self, plan, initial_velocity, resistance_coefficient, constant_resistance):
+        """
+        The residuals of the cost function, _cost_function is the sum of the squared residuals
+        """
+        _, velocities = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance)
+
+        return np.concatenate([velocities - self.preferred_velocity, np.sqrt(self.theta) * plan])
+
+    def _cost_residuals_jacobian(self, plan, initial_velocity, resistance_coefficient, constant_resistance):
+        _, velocities = self._get_rollout(plan, initial_velocity, resistance_coefficient, constant_resistance)
+
+        _, velocity_jacobian = self.controllable_object.calculate_trajectory_jacobian_1d(self.dt / 1000., initial_velocity, velocities,
+                                                                                         resistance_coefficient)
+        return np.concatenate([velocity_jacobian * self.controllable_object.max_acceleration, np.sqrt(self.theta) * np.eye(len(plan))])
+
+    @staticmethod
+    def _get_piecewise_linear_basis(number_of_steps, number_of_knots):
+        """
+        Returns a matrix with shape (number_of_steps, number_of_knots) that maps the values at equally spaced knots to a piecewise-linear plan. The first
+        and last knot coincide with the first and last step of the plan.
+        """
+        if not 2 <= number_of_knots <= number_of_steps:
+            raise ValueError('The number of plan knots should be between 2 and the number of steps in the plan (%d)' % number_of_steps)
+
+        knot_spacing = (number_of_steps - 1) / (number_of_knots - 1)
+        step_indices = np.arange(number_of_steps)[:, None]
+        knot_indices = np.arange(number_of_knots)[None, :] * knot_spacing
+
+        return np.maximum(0., 1. - np.abs(step_indices - knot_indices) / knot_spacing)
+
+    def _expand_knots(self, knots):
+        return self.plan_basis @ knots
+
+    def _get_knots(self, plan):
+        # the least squares fit of the knots to the plan, the interpolation between knots within the bounds always stays within the bounds
+        return np.clip(self._plan_basis_pseudo_inverse @ plan, self.knot_bounds.lb, self.knot_bounds.ub)
+
+    def _knot_cost_function(self, knots, *args):
+        return self._cost_function(self._expand_knots(knots), *args)
+
+    def _knot_cost_function_jacobian(self, knots, *args):
+        return self.plan_basis.T @ self.cost_jacobian(self._expand_knots(knots), *args)
+
+    def _knot_cost_residuals(self, knots, *args):
+        return self._cost_residuals(self._expand_knots(knots), *args)
+
+    def _knot_cost_residuals_jacobian(self, knots, *args):
+        return self._cost_residuals_jacobian(self._expand_knots(knots), *args) @ self.plan_basis
+
+    def _knot_plan_constraint(self, knots, initial_position, initial_velocity, resistance_coefficient, constant_resistance, belief_indices=None):
+        constraint_function, _ = self._get_risk_constraint_functions(belief_indices)
+        return constraint_function(self._expand_knots(knots), initial_position, initial_velocity, resistance_coefficient, constant_resistance,
+                                   belief_indices)
+
+    def _knot_plan_constraint_jacobian(self, knots, initial_position, initial_velocity, resistance_coefficient, constant_resistance, belief_indices=None):
+        _, constraint_jacobian = self._get_risk_constraint_functions(belief_indices)
+        return constraint_jacobian(self._expand_knots(knots), initial_position, initial_velocity, resistance_coefficient, constant_resistance,
+                                   belief_indices) @ self.plan_basis
+
     def _calculate_position_plan(self):
-        previous_position = self.controllable_object.traveled_distance
-        previous_velocity = copy.copy(self.controllable_object.velocity)
-
-        for index, acceleration_command in enumerate(self.action_plan):
-            acceleration = acceleration_command * self.controllable_object.max_acceleration
-            previous_position, previous_velocity = self.controllable_object.calculate_time_step_1d(self.dt / 1000., previous_position, previous_velocity,
-                                                                                                   acceleration,
-                                                                                                   self.controllable_object.resistance_coefficient,
-                                                                                                   self.controllable_object.constant_resistance)
-            self.velocity_plan[index] = previous_velocity
-            self.position_plan[index] = previous_position
+        self.position_plan, self.velocity_plan = self.controllable_object.calculate_trajectory_1d(self.dt / 1000.,
+                                                                                                  self.controllable_object.traveled_distance,
+                                                                                                  self.controllable_object.velocity,
+                                                                                                  self.action_plan * self.controllable_object.max_acceleration,
+                                                                                                  self.controllable_object.resistance_coefficient,
+                                                                                                  self.controllable_object.constant_resistance)
 
     def _continue_current_plan(self):
         self.action_plan = np.roll(self.action_plan, -1)
@@ -364,6 +1265,101 @@ class CEIAgent(Agent):
 
         self._calculate_position_plan()
 
+    def _adapt_time_horizon(self):
+        if self._is_conflict_possible():
+            time_horizon = self.time_horizon
+        else:
+            time_horizon = self.minimum_time_horizon
+
+        if time_horizon != self.current_time_horizon:
+            self._set_time_horizon(time_horizon)
+
+    def _is_conflict_possible(self):
+        """
+        Returns True when the ego vehicle can collide with the other vehicle within the full time horizon. The ego vehicle is somewhere between the
+        trajectories with the minimal and maximal actions, the other vehicle is somewhere within the bounds that are used for new belief points (the
+        3-sigma interval of such a point). This also holds after the merge point: a vehicle that follows the other vehicle keeps the full time horizon
+        as long as it can reach the other vehicle within that horizon.
+        """
+        other_position, other_velocity = self.sim_master.get_current_state(self.track_side.other)
+
+        if other_position is None or other_velocity is None:
+            return False
+
+        number_of_steps = int((1000 / self.dt) * self.time_horizon)
+        times = np.arange(1, number_of_steps + 1) * (self.dt / 1000.)
+        lower_other_positions, upper_other_positions = self._get_other_position_bounds(other_position, other_velocity, times)
+
+        extreme_positions = []
+        for extreme_action in [-1., 1.]:
+            positions, _ = self.controllable_object.calculate_trajectory_1d(self.dt / 1000.,
+                                                                            self.controllable_object.traveled_distance,
+                                                                            self.controllable_object.velocity,
+                                                                            np.full(number_of_steps, extreme_action * self.controllable_object.max_acceleration),
+                                                                            self.controllable_object.resistance_coefficient,
+                                                                            self.controllable_object.constant_resistance)
+            extreme_positions.append(positions)
+
+        for step in range(number_of_steps):
+            lower_bound, upper_bound = self.track.get_collision_bounds_approximation_range(extreme_positions[0][step], extreme_positions[1][step])
+
+            if lower_bound is not None and upper_bound is not None and lower_bound <= upper_other_positions[step] and \
+                    upper_bound >= lower_other_positions[step]:
+                return True
+
+        return False
+
+    def _set_time_horizon(self, time_horizon):
+        """
+        Resizes the plans, the action bounds and the belief to a new time horizon. When the horizon grows, the plan is extended with the actions that
+        hold the velocity at the end of the plan and new belief points are added in the same way as on a belief update.
+        """
+        number_of_steps = int((1000 / self.dt) * time_horizon)
+        number_of_belief_points = int(self.belief_frequency * time_horizon) + 1
+
+        if number_of_steps <= len(self.action_plan):
+            self.action_plan = self.action_plan[:number_of_steps].copy()
+        else:
+            target_velocity = self.velocity_plan[-1]
+            required_acceleration = self.controllable_object.resistance_coefficient * target_velocity ** 2 + self.controllable_object.constant_resistance
+            hold_action = np.clip(required_acceleration / self.controllable_object.max_acceleration, -1., 1.)
+
+            self.action_plan = np.concatenate([self.action_plan, np.full(number_of_steps - len(self.action_plan), hold_action)])
+
+        self.action_bounds = optimize.Bounds([-1.] * number_of_steps, [1.] * number_of_steps)
+        self._calculate_position_plan()
+
+        belief_time_stamps = self.belief_time_stamps
+
+        if number_of_belief_points <= len(self.belief):
+            self.belief = self.belief[:number_of_belief_points].copy()
+            self.belief_time_stamps = belief_time_stamps[:number_of_belief_points]
+        else:
+            other_position, other_velocity = self.sim_master.get_current_state(self.track_side.other)
+            new_time_stamps = belief_time_stamps[-1] + (1 / self.belief_frequency) * np.arange(1, number_of_belief_points - len(self.belief) + 1)
+
+            if other_position is None or other_velocity is None:
+                new_belief_points = np.zeros((len(new_time_stamps), 2))
+            else:
+                new_belief_points = np.stack(self._get_new_belief_point(other_position, other_velocity, new_time_stamps - self.sim_master.t / 1000.),
+                                             axis=1)
+
+            self.belief = np.concatenate([self.belief, new_belief_points])
+            self.belief_time_stamps = np.concatenate([belief_time_stamps, new_time_stamps])
+
+        self._resize_plan_structures(number_of_steps)
+        self.current_time_horizon = time_horizon
+
+    def _resize_plan_structures(self, number_of_steps):
+        if self.number_of_plan_knots is not None:
+            self.plan_basis = self._get_piecewise_linear_basis(number_of_steps, self.number_of_plan_knots)
+            self._plan_basis_pseudo_inverse = np.linalg.pinv(self.plan_basis)
+
+        self._motion_primitive_library = self._get_motion_primitive_library(number_of_steps)
+
+        # the state of the planner backend belongs to a problem of a different size
+        self._planner_warm_start = WarmStart()
+
     def _convert_plan_to_communicative_action(self):
         pass
 
@@ -371,6 +1367,8 @@ class CEIAgent(Agent):
         pass
 
     def compute_continuous_input(self, dt):
+        self.plan_update_telemetry = None
+
         if not self._is_initialized:
             self._initialize_belief()
             self._update_plan()
@@ -381,6 +1379,9 @@ class CEIAgent(Agent):
             self._update_belief(generate_new_point=self.sim_master.t % (1000 / self.belief_frequency) == 0.)
 
             self._continue_current_plan()
+            if self.minimum_time_horizon is not None:
+                self._adapt_time_horizon()
+
             self.perceived_risk = self._evaluate_risk()
 
             if not self.controllable_object.cruise_control_active:
@@ -0,0 +1,37 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from scipy import special
+
+_SQUARE_ROOT_OF_TWO_PI = np.sqrt(2. * np.pi)
+
+
+def normal_pdf(x, mu, sigma):
+    """ The probability density of a normal distribution, without the overhead of autograd or scipy.stats. """
+    z = (x - mu) / sigma
+    return np.exp(-z ** 2 / 2.) / _SQUARE_ROOT_OF_TWO_PI / sigma
+
+
+def normal_interval_probability(mu, sigma, lower_bound, upper_bound):
+    """
+    The probability that a normally distributed variable lies between the lower and upper bound. The bounds can be infinite for a one-sided interval.
+    This function can not be differentiated with autograd.
+    """
+    return special.ndtr((upper_bound - mu) / sigma) - special.ndtr((lower_bound - mu) / sigma)
+
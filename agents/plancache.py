@@ -0,0 +1,120 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+class PlanCache:
+    """
+    A persistent on-disk cache of planner results, stored in an sqlite database. Results are stored under a hash of the exact inputs of the optimizer, so
+    runs that start from identical states can reuse each other's plans. When the cache holds more than max_number_of_entries results, the least recently
+    used results are removed.
+
+    The cache can be shared between processes (e.g. multiprocessing workers) that use the same file: every process opens its own connection and sqlite
+    takes care of the locking. A PlanCache object can be pickled, the connection is re-opened in the receiving process.
+    """
+
+    def __init__(self, file_name, max_number_of_entries=100000):
+        self.file_name = file_name
+        self.max_number_of_entries = max_number_of_entries
+
+        self._connection = None
+        self._connection_pid = None
+
+        folder = os.path.dirname(file_name)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._get_connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY, plan BLOB, success INTEGER, last_used REAL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS last_used_index ON plans (last_used)')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_connection_pid'] = None
+        return state
+
+    def __len__(self):
+        return self._get_connection().execute('SELECT COUNT(*) FROM plans').fetchone()[0]
+
+    @staticmethod
+    def get_key(*items):
+        """
+        Returns a hash of the provided items. Arrays are hashed based on their exact contents, all other items based on their representation.
+        """
+        key = hashlib.sha256()
+
+        for item in items:
+            if isinstance(item, np.ndarray):
+                key.update(str(item.shape).encode())
+                key.update(np.ascontiguousarray(item, dtype=float).tobytes())
+            elif isinstance(item, bytes):
+                key.update(item)
+            else:
+                key.update(repr(item).encode())
+            key.update(b'|')
+
+        return key.hexdigest()
+
+    def get(self, key):
+        """
+        :param key: a key obtained with get_key
+        :return: (plan, success) when a result is stored under key, None otherwise
+        """
+        connection = self._get_connection()
+        row = connection.execute('SELECT plan, success FROM plans WHERE key = ?', (key,)).fetchone()
+
+        if row is None:
+            return None
+
+        with connection:
+            connection.execute('UPDATE plans SET last_used = ? WHERE key = ?', (time.time(), key))
+
+        plan, success = row
+        return np.frombuffer(plan, dtype=float).copy(), bool(success)
+
+    def put(self, key, plan, success):
+        connection = self._get_connection()
+
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO plans (key, plan, success, last_used) VALUES (?, ?, ?, ?)',
+                               (key, np.ascontiguousarray(plan, dtype=float).tobytes(), int(success), time.time()))
+
+            number_of_entries = connection.execute('SELECT COUNT(*) FROM plans').fetchone()[0]
+            if number_of_entries > self.max_number_of_entries:
+                connection.execute('DELETE FROM plans WHERE key IN (SELECT key FROM plans ORDER BY last_used ASC LIMIT ?)',
+                                   (number_of_entries - self.max_number_of_entries,))
+
+    def clear(self):
+        with self._get_connection() as connection:
+            connection.execute('DELETE FROM plans')
+
+    def _get_connection(self):
+        # connections can not be shared between processes, so a new connection is opened after a fork
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.file_name, timeout=60.)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection_pid = os.getpid()
+
+        return self._connection
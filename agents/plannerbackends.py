@@ -0,0 +1,850 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+
+import numpy as np
+from scipy import linalg, optimize
+
+
+class PlannerBackend(abc.ABC):
+    """
+    A solver for the planning problem of an agent. The interface follows scipy.optimize.minimize: constraints are given as (a list of) dicts with the keys
+    'type', 'fun', 'jac' and 'args' and bounds as a scipy.optimize.Bounds object. Only inequality constraints are used by the agents. Like in scipy, the
+    Jacobian of a constraint is estimated with finite differences when 'jac' is missing or None.
+
+    The callback is called as callback(intermediate_result) after every iteration, where intermediate_result is an OptimizeResult that contains at least x.
+    The callback can stop the optimization by raising StopIteration.
+
+    Backends that exploit the least-squares structure of the cost set uses_residuals. These are called with the additional keyword arguments residuals
+    and residual_jacobian, where fun(x, *args) == sum(residuals(x, *args) ** 2).
+
+    Backends that can continue from the state of a previous solve set uses_warm_start. These are called with the additional keyword argument warm_start,
+    a WarmStart object that the backend reads at the start and updates after a successful solve. The caller owns the warm start and shifts it along
+    with the decision variables between solves.
+    """
+
+    uses_residuals = False
+    uses_warm_start = False
+
+    @abc.abstractmethod
+    def minimize(self, fun, x0, args=(), jac=None, bounds=None, constraints=(), callback=None) -> optimize.OptimizeResult:
+        """
+        Minimizes fun(x, *args) subject to the constraints and bounds
+
+        :return: a scipy OptimizeResult that contains at least x, fun, success, message, nit, nfev and njev
+        """
+        pass
+
+    @property
+    @abc.abstractmethod
+    def name(self):
+        pass
+
+    def __repr__(self):
+        # the representation is part of the plan cache key, so it should contain all options that influence the result
+        return '%s(%s)' % (type(self).__name__, ', '.join('%s=%r' % (key, value) for key, value in sorted(vars(self).items())))
+
+
+class WarmStart:
+    """
+    The state of a quasi-Newton SQP method at the end of a solve: the approximation of the Hessian of the Lagrangian, the multipliers of the constraints,
+    the bounds that were active at the solution and the penalty of the merit function. The user of the method can set the index in the plan to which
+    every multiplier belongs (multiplier_plan_indices), so the multipliers can be shifted along with the plan.
+    """
+
+    def __init__(self):
+        self.hessian = None
+        self.multipliers = None
+        self.multiplier_plan_indices = None
+        self.active_lower_bounds = None
+        self.active_upper_bounds = None
+        self.penalty = None
+
+    @property
+    def is_empty(self):
+        return self.hessian is None
+
+    def shift(self, number_of_steps):
+        """
+        Shifts the state along with a receding horizon plan that moved number_of_steps steps forward in time, so every part of it stays with the value in
+        the plan it belongs to. The Hessian approximation of the remaining steps moves to the top left and the new steps at the end of the plan start
+        with the mean curvature of the remaining steps (without coupling to the other steps) and with inactive bounds. The multipliers of constraints at
+        steps that have passed are dropped and the new constraints at the end of the plan start with a multiplier of zero. Multipliers without a plan
+        index are kept as they are.
+        """
+        if self.is_empty or number_of_steps <= 0:
+            return
+
+        plan_length = len(self.active_lower_bounds)
+        number_of_steps = min(number_of_steps, plan_length)
+        number_of_remaining_steps = plan_length - number_of_steps
+
+        curvature = np.mean(np.diag(self.hessian)[number_of_steps:] if number_of_remaining_steps else np.diag(self.hessian))
+        hessian = curvature * np.eye(plan_length)
+        hessian[:number_of_remaining_steps, :number_of_remaining_steps] = self.hessian[number_of_steps:, number_of_steps:]
+        self.hessian = hessian
+
+        if self.multiplier_plan_indices is not None:
+            has_passed = self.multiplier_plan_indices < number_of_steps
+            number_of_passed_constraints = np.count_nonzero(has_passed)
+            self.multipliers = np.concatenate([self.multipliers[~has_passed], np.zeros(number_of_passed_constraints)])
+            self.multiplier_plan_indices = np.concatenate([self.multiplier_plan_indices[~has_passed] - number_of_steps,
+                                                           np.full(number_of_passed_constraints, plan_length - 1)])
+
+        self.active_lower_bounds = np.concatenate([self.active_lower_bounds[number_of_steps:], np.zeros(number_of_steps, dtype=bool)])
+        self.active_upper_bounds = np.concatenate([self.active_upper_bounds[number_of_steps:], np.zeros(number_of_steps, dtype=bool)])
+
+    def get_fingerprint(self):
+        """ Returns the state as bytes, e.g. to make it part of the key of a plan cache. """
+        if self.is_empty:
+            return b''
+
+        return b''.join(np.ascontiguousarray(item, dtype=float).tobytes() for item in [self.hessian, self.multipliers, self.active_lower_bounds,
+                                                                                         self.active_upper_bounds, self.penalty])
+
+
+class SLSQPBackend(PlannerBackend):
+    def __init__(self, options=None):
+        self.options = options
+
+    def minimize(self, fun, x0, args=(), jac=None, bounds=None, constraints=(), callback=None):
+        if callback is None:
+            return optimize.minimize(fun, x0, args=args, jac=jac, bounds=bounds, constraints=constraints, method='SLSQP', options=self.options)
+
+        # before scipy 1.15, SLSQP calls the callback with the current iterate only and does not catch StopIteration, so the callback is adapted here
+        state = {'x': np.array(x0, dtype=float), 'nit': 0, 'nfev': 0, 'njev': 0}
+
+        def counted_fun(x, *fun_args):
+            state['nfev'] += 1
+            return fun(x, *fun_args)
+
+        def counted_jac(x, *jac_args):
+            state['njev'] += 1
+            return jac(x, *jac_args)
+
+        def iteration_callback(xk):
+            state['x'] = np.array(xk, dtype=float)
+            state['nit'] += 1
+            callback(optimize.OptimizeResult(x=state['x'].copy(), nit=state['nit']))
+
+        try:
+            return optimize.minimize(counted_fun, x0, args=args, jac=counted_jac if callable(jac) else jac, bounds=bounds, constraints=constraints,
+                                     method='SLSQP', options=self.options, callback=iteration_callback)
+        except StopIteration:
+            x = state['x']
+            value = fun(x, *args)
+            return optimize.OptimizeResult(x=x, fun=value[0] if jac is True else value, success=False, status=99,
+                                           message='`callback` raised `StopIteration`.', nit=state['nit'], nfev=state['nfev'] + 1,
+                                           njev=state['njev'])
+
+    @property
+    def name(self):
+        return 'SLSQP'
+
+
+class TrustConstrBackend(PlannerBackend):
+    def __init__(self, options=None):
+        self.options = options
+
+    def minimize(self, fun, x0, args=(), jac=None, bounds=None, constraints=(), callback=None):
+        result = optimize.minimize(fun, x0, args=args, jac=jac, bounds=bounds, constraints=constraints, method='trust-constr', options=self.options,
+                                   callback=callback)
+        result.njev = result.get('njev', 0)
+        return result
+
+    @property
+    def name(self):
+        return 'trust-constr'
+
+
+class AugmentedLagrangianBackend(PlannerBackend):
+    """
+    An augmented Lagrangian method for inequality constraints (c(x) >= 0). The box bounds are not added to the Lagrangian, instead every sub-problem is
+    solved with a spectral projected gradient method (Barzilai-Borwein steps with a non-monotone Armijo line search) that projects every step on the box.
+    The action plans are always bounded by a box, which makes the projection trivial.
+    """
+
+    def __init__(self, max_outer_iterations=30, max_inner_iterations=500, tolerance=1e-5, stall_tolerance=1e-9, constraint_tolerance=1e-6,
+                 initial_penalty=100., penalty_growth=10., max_penalty=1e6):
+        self.max_outer_iterations = max_outer_iterations
+        self.max_inner_iterations = max_inner_iterations
+        self.tolerance = tolerance
+        self.stall_tolerance = stall_tolerance
+        self.constraint_tolerance = constraint_tolerance
+        self.initial_penalty = initial_penalty
+        self.penalty_growth = penalty_growth
+        self.max_penalty = max_penalty
+
+    @property
+    def name(self):
+        return 'augmented Lagrangian'
+
+    def minimize(self, fun, x0, args=(), jac=None, bounds=None, constraints=(), callback=None):
+        if isinstance(constraints, dict):
+            constraints = [constraints]
+
+        lower_bounds = np.full(len(x0), -np.inf) if bounds is None else np.asarray(bounds.lb, dtype=float)
+        upper_bounds = np.full(len(x0), np.inf) if bounds is None else np.asarray(bounds.ub, dtype=float)
+
+        counters = {'nfev': 0, 'njev': 0, 'nit': 0}
+
+        def constraint_values(x):
+            return np.concatenate([np.atleast_1d(constraint['fun'](x, *constraint.get('args', ()))) for constraint in constraints])
+
+        def constraint_jacobian(x):
+            return np.vstack([np.atleast_2d(_get_constraint_jacobian(constraint)(x, *constraint.get('args', ()))) for constraint in constraints])
+
+        def merit(x, multipliers, penalty):
+            counters['nfev'] += 1
+            shifted_constraints = np.maximum(0., multipliers - penalty * constraint_values(x))
+            return fun(x, *args) + np.sum(shifted_constraints ** 2 - multipliers ** 2) / (2 * penalty)
+
+        def merit_gradient(x, multipliers, penalty):
+            counters['njev'] += 1
+            shifted_constraints = np.maximum(0., multipliers - penalty * constraint_values(x))
+            return jac(x, *args) - constraint_jacobian(x).T @ shifted_constraints
+
+        x = np.clip(np.asarray(x0, dtype=float), lower_bounds, upper_bounds)
+        multipliers = np.zeros(len(constraint_values(x)))
+        penalty = self.initial_penalty
+        last_violation = np.inf
+        success = False
+        message = 'Maximum number of outer iterations reached'
+
+        for _ in range(self.max_outer_iterations):
+            try:
+                x, inner_converged = self._solve_sub_problem(lambda x: merit(x, multipliers, penalty), lambda x: merit_gradient(x, multipliers, penalty),
+                                                             x, lower_bounds, upper_bounds, counters, callback)
+            except StopIteration as stop:
+                x = stop.value
+                message = '`callback` raised `StopIteration`.'
+                break
+
+            values = constraint_values(x)
+            violation = max(0., -np.min(values))
+            multipliers = np.maximum(0., multipliers - penalty * values)
+
+            if inner_converged and violation <= self.constraint_tolerance:
+                success = True
+                message = 'Optimization terminated successfully'
+                break
+
+            if violation > 0.25 * last_violation:
+                penalty = min(penalty * self.penalty_growth, self.max_penalty)
+            last_violation = violation
+
+        return optimize.OptimizeResult(x=x, fun=fun(x, *args), success=success, status=0 if success else 1, message=message,
+                                       maxcv=max(0., -np.min(constraint_values(x))), multipliers=multipliers, **counters)
+
+    def _solve_sub_problem(self, merit, merit_gradient, x, lower_bounds, upper_bounds, counters, callback, memory=5, sufficient_decrease=1e-4,
+                           stall_iterations=10):
+        value = merit(x)
+        gradient = merit_gradient(x)
+        recent_values = [value]
+        value_history = [value]
+
+        projected_gradient = np.clip(x - gradient, lower_bounds, upper_bounds) - x
+        step_length = 1. / max(np.max(np.abs(projected_gradient)), 1e-10)
+
+        for iteration in range(self.max_inner_iterations):
+            if np.max(np.abs(projected_gradient)) < self.tolerance:
+                return x, True
+
+            # the risk constraint is not smooth where the belief point with the highest risk changes, the projected gradient does not vanish at an
+            # optimum on such a kink. So the sub-problem is also considered solved when the merit function stops decreasing.
+            if iteration >= stall_iterations and value_history[-stall_iterations] - value <= self.stall_tolerance * (1. + abs(value)):
+                return x, True
+
+            counters['nit'] += 1
+            direction = np.clip(x - step_length * gradient, lower_bounds, upper_bounds) - x
+            directional_derivative = gradient @ direction
+            reference_value = max(recent_values)
+
+            # non-monotone backtracking line search along the projected direction
+            fraction = 1.
+            new_x = x + direction
+            new_value = merit(new_x)
+            while new_value > reference_value + sufficient_decrease * fraction * directional_derivative and fraction > 1e-10:
+                fraction /= 2.
+                new_x = x + fraction * direction
+                new_value = merit(new_x)
+
+            new_gradient = merit_gradient(new_x)
+
+            # Barzilai-Borwein step length for the next iteration
+            s = new_x - x
+            y = new_gradient - gradient
+            curvature = s @ y
+            step_length = (s @ s) / curvature if curvature > 0. else 1e10
+            step_length = min(max(step_length, 1e-10), 1e10)
+
+            x, value, gradient = new_x, new_value, new_gradient
+            recent_values = (recent_values + [value])[-memory:]
+            value_history += [value]
+            projected_gradient = np.clip(x - gradient, lower_bounds, upper_bounds) - x
+
+            if callback is not None:
+                try:
+                    callback(optimize.OptimizeResult(x=x.copy(), nit=counters['nit']))
+                except StopIteration:
+                    # pass the current iterate on to minimize
+                    raise StopIteration(x)
+
+        return x, False
+
+
+class GaussNewtonBackend(PlannerBackend):
+    """
+    A sequential quadratic programming method for costs that are a sum of squares, cost(x) = sum(r(x) ** 2). Instead of building a quasi-Newton
+    approximation of the Hessian from gradients (as SLSQP does), every quadratic sub-problem uses the Gauss-Newton Hessian 2 J^T J, where J is the Jacobian
+    of the residuals r. The sub-problems are solved in elastic form (the linearized constraints may be violated at a penalty), so they are always
+    feasible, and the step is globalized with a backtracking line search on the l1 merit function cost(x) + penalty * sum(max(0, -c(x))).
+
+    Because the residuals are needed, this backend sets uses_residuals and is called with the additional arguments residuals and residual_jacobian, both
+    with the same signature as fun.
+
+    The sub-problems only contain the linearization of the constraints. A constraint on the maximum of several functions (such as the maximum collision
+    probability over all belief points) can make the iterates alternate between the functions, so this backend works best with one constraint per
+    function (use_vector_risk_constraint for the CEIAgent).
+
+    When the method fails (unless the callback stopped it), the problem is solved again with SLSQP from x0 and that result is returned, with the
+    evaluations and iterations of both methods. Set use_slsqp_fallback to False to get the result of the Gauss-Newton method instead.
+    """
+
+    uses_residuals = True
+
+    def __init__(self, max_iterations=100, tolerance=1e-6, constraint_tolerance=1e-6, initial_penalty=100., penalty_growth=10., max_penalty=1e6,
+                 use_slsqp_fallback=True):
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.constraint_tolerance = constraint_tolerance
+        self.initial_penalty = initial_penalty
+        self.penalty_growth = penalty_growth
+        self.max_penalty = max_penalty
+        self.use_slsqp_fallback = use_slsqp_fallback
+
+    @property
+    def name(self):
+        return 'Gauss-Newton'
+
+    def minimize(self, fun, x0, args=(), jac=None, bounds=None, constraints=(), callback=None, residuals=None, residual_jacobian=None):
+        if residuals is None or residual_jacobian is None:
+            raise ValueError('The Gauss-Newton backend needs the residuals of the cost function and their Jacobian')
+
+        if isinstance(constraints, dict):
+            constraints = [constraints]
+
+        lower_bounds = np.full(len(x0), -np.inf) if bounds is None else np.asarray(bounds.lb, dtype=float)
+        upper_bounds = np.full(len(x0), np.inf) if bounds is None else np.asarray(bounds.ub, dtype=float)
+
+        counters = {'nfev': 0, 'njev': 0, 'nit': 0}
+
+        def constraint_values(x):
+            return np.concatenate([np.atleast_1d(constraint['fun'](x, *constraint.get('args', ()))) for constraint in constraints])
+
+        def constraint_jacobian(x):
+            return np.vstack([np.atleast_2d(_get_constraint_jacobian(constraint)(x, *constraint.get('args', ()))) for constraint in constraints])
+
+        def merit(x, penalty):
+            counters['nfev'] += 1
+            return np.sum(residuals(x, *args) ** 2) + penalty * np.sum(np.maximum(0., -constraint_values(x)))
+
+        x = np.clip(np.asarray(x0, dtype=float), lower_bounds, upper_bounds)
+        penalty = self.initial_penalty
+        multipliers = np.zeros(len(constraint_values(x)))
+        success = False
+        is_stopped = False
+        message = 'Maximum number of iterations reached'
+
+        for _ in range(self.max_iterations):
+            counters['njev'] += 1
+            current_residuals = residuals(x, *args)
+            jacobian = residual_jacobian(x, *args)
+            values = constraint_values(x)
+            gradients = constraint_jacobian(x)
+
+            hessian = 2 * jacobian.T @ jacobian
+            gradient = 2 * jacobian.T @ current_residuals
+
+            try:
+                while True:
+                    step, elastic_variables, multipliers = _solve_elastic_quadratic_program(hessian, gradient, gradients, values, penalty,
+                                                                                            lower_bounds - x, upper_bounds - x)
+                    if np.max(elastic_variables, initial=0.) <= self.constraint_tolerance or penalty >= self.max_penalty:
+                        break
+
+                    # the linearized constraints could not be satisfied at this penalty, so the merit function should weigh the constraints more
+                    penalty = min(penalty * self.penalty_growth, self.max_penalty)
+            except linalg.LinAlgError:
+                message = 'Singular matrix in the quadratic sub-problem'
+                break
+
+            # the decrease of the merit function predicted by the quadratic model
+            violation = np.sum(np.maximum(0., -values))
+            predicted_violation = np.sum(np.maximum(0., -(values + gradients @ step)))
+            predicted_decrease = -(gradient @ step + 0.5 * step @ hessian @ step) + penalty * (violation - predicted_violation)
+            cost = np.sum(current_residuals ** 2)
+            current_merit = cost + penalty * violation
+
+            if predicted_decrease <= self.tolerance * (1. + cost):
+                success = violation <= self.constraint_tolerance
+                message = 'Optimization terminated successfully' if success else 'Inequality constraints incompatible'
+                break
+
+            step_length = 1.
+            if merit(x + step, penalty) > current_merit - 1e-4 * predicted_decrease:
+                # second-order correction: the linearization of the constraints is corrected with their values after the full step, this avoids
+                # rejecting good steps because of the curvature of the constraints (the Maratos effect)
+                corrected_values = constraint_values(x + step) - gradients @ step
+                try:
+                    corrected_step, _, _ = _solve_elastic_quadratic_program(hessian, gradient, gradients, corrected_values, penalty, lower_bounds - x,
+                                                                            upper_bounds - x)
+                except linalg.LinAlgError:
+                    message = 'Singular matrix in the quadratic sub-problem'
+                    break
+
+                if merit(x + corrected_step, penalty) <= current_merit - 1e-4 * predicted_decrease:
+                    step = corrected_step
+                else:
+                    while merit(x + step_length * step, penalty) > current_merit - 1e-4 * step_length * predicted_decrease:
+                        step_length /= 2.
+                        if step_length < 1e-8:
+                            break
+
+            if step_length < 1e-8:
+                message = 'Positive directional derivative for linesearch'
+                break
+
+            x = np.clip(x + step_length * step, lower_bounds, upper_bounds)
+            counters['nit'] += 1
+
+            if callback is not None:
+                try:
+                    callback(optimize.OptimizeResult(x=x.copy(), nit=counters['nit']))
+                except StopIteration:
+                    message = '`callback` raised `StopIteration`.'
+                    is_stopped = True
+                    break
+
+        if not success and self.use_slsqp_fallback and not is_stopped:
+            # the Gauss-Newton Hessian is only a model of the Hessian of the Lagrangian, on a kink of the risk constraint or far from zero residuals the
+            # line search can fail. SLSQP, which learns the curvature from the gradients, is then run from the initial plan.
+            fallback_result = SLSQPBackend().minimize(fun, x0, args, jac, bounds, constraints, callback)
+            fallback_result.message = 'Gauss-Newton: %s, SLSQP: %s' % (message, fallback_result.message)
+            for key, value in counters.items():
+                fallback_result[key] = fallback_result.get(key, 0) + value
+            return fallback_result
+
+        return optimize.OptimizeResult(x=x, fun=fun(x, *args), success=success, status=0 if success else 1, message=message,
+                                       maxcv=max(0., -np.min(constraint_values(x))), multipliers=multipliers, **counters)
+
+
+class QuasiNewtonSQPBackend(PlannerBackend):
+    """
+    A sequential quadratic programming method with a damped BFGS approximation of the Hessian of the Lagrangian (like SLSQP), that can be warm-started
+    from the previous solve. Consecutive plan updates of an agent solve nearly identical problems, so the curvature approximation, the multipliers and
+    the active set at the end of one solve are a good start for the next one.
+
+    Every quadratic sub-problem is first solved on a guess of the active set (the active set of the previous iteration, or of the warm start in the
+    first iteration), which is a single linear solve. Only when the guess turns out to be wrong, the sub-problem is solved in elastic form with an interior
+    point method. Steps are globalized with a backtracking line search on the l1 merit function cost(x) + penalty * sum(max(0, -c(x))).
+
+    For the CEIAgent, the warm start does not pay off. The plan updates that follow the first one in scenarios A-D take 18.6 iterations and 270 ms of CPU
+    time on average with this backend, against 16.4 iterations and 239 ms with SLSQP. The plan moves tens of steps between plan updates, so a large
+    part of the shifted Hessian approximation (see WarmStart.shift) is a scaled identity again.
+    """
+
+    uses_warm_start = True
+
+    def __init__(self, max_iterations=100, tolerance=1e-6, constraint_tolerance=1e-6, initial_penalty=100., penalty_growth=10., max_penalty=1e6,
+                 max_warm_start_condition_number=100.):
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.constraint_tolerance = constraint_tolerance
+        self.initial_penalty = initial_penalty
+        self.penalty_growth = penalty_growth
+        self.max_penalty = max_penalty
+
+        # the collision probability is a much steeper function of the plan than the cost, so the curvature of the Lagrangian along some directions
+        # depends strongly on the multipliers of the last solve. These can be very different in the next problem, so the eigenvalues of the warm-started
+        # Hessian approximation are bounded relative to the smallest one.
+        self.max_warm_start_condition_number = max_warm_start_condition_number
+
+    @property
+    def name(self):
+        return 'warm-started SQP'
+
+    def minimize(self, fun, x0, args=(), jac=None, bounds=None, constraints=(), callback=None, warm_start=None):
+        if isinstance(constraints, dict):
+            constraints = [constraints]
+
+        lower_bounds = np.full(len(x0), -np.inf) if bounds is None else np.asarray(bounds.lb, dtype=float)
+        upper_bounds = np.full(len(x0), np.inf) if bounds is None else np.asarray(bounds.ub, dtype=float)
+
+        counters = {'nfev': 0, 'njev': 0, 'nit': 0}
+
+        def constraint_values(x):
+            return np.concatenate([np.atleast_1d(constraint['fun'](x, *constraint.get('args', ()))) for constraint in constraints])
+
+        def constraint_jacobian(x):
+            return np.vstack([np.atleast_2d(_get_constraint_jacobian(constraint)(x, *constraint.get('args', ()))) for constraint in constraints])
+
+        def merit(x, penalty):
+            counters['nfev'] += 1
+            return fun(x, *args) + penalty * np.sum(np.maximum(0., -constraint_values(x)))
+
+        x = np.clip(np.asarray(x0, dtype=float), lower_bounds, upper_bounds)
+        values = constraint_values(x)
+        penalty = self.initial_penalty
+        success = False
+        message = 'Maximum number of iterations reached'
+
+        if warm_start is not None and not warm_start.is_empty and len(warm_start.hessian) == len(x):
+            hessian = self._bound_condition_number(warm_start.hessian, self.max_warm_start_condition_number)
+            penalty = warm_start.penalty
+            active_lower_bounds = warm_start.active_lower_bounds.copy()
+            active_upper_bounds = warm_start.active_upper_bounds.copy()
+        else:
+            hessian = None
+            active_lower_bounds = np.zeros(len(x), dtype=bool)
+            active_upper_bounds = np.zeros(len(x), dtype=bool)
+
+        if warm_start is not None and warm_start.multipliers is not None and len(warm_start.multipliers) == len(values):
+            multipliers = warm_start.multipliers.copy()
+        else:
+            multipliers = np.zeros(len(values))
+        active_constraints = multipliers > 0.
+
+        previous_x = previous_lagrangian_gradient = None
+        is_initial_hessian = False
+
+        for _ in range(self.max_iterations):
+            counters['njev'] += 1
+            cost = fun(x, *args)
+            gradient = jac(x, *args)
+            values = constraint_values(x)
+            gradients = constraint_jacobian(x)
+
+            if hessian is None:
+                hessian = np.eye(len(x))
+                is_initial_hessian = True
+            elif previous_x is not None:
+                # the change in the gradient of the Lagrangian uses the latest multipliers for both points
+                hessian = self._update_hessian(hessian, x - previous_x, gradient - gradients.T @ multipliers - previous_lagrangian_gradient,
+                                               scale_initial_hessian=is_initial_hessian)
+                is_initial_hessian = False
+
+            solution = _solve_quadratic_program_on_active_set(hessian, gradient, gradients, values, penalty, lower_bounds - x, upper_bounds - x,
+                                                              active_constraints, active_lower_bounds, active_upper_bounds)
+            if solution is not None:
+                step, multipliers = solution
+            else:
+                try:
+                    while True:
+                        step, elastic_variables, multipliers = _solve_elastic_quadratic_program(hessian, gradient, gradients, values, penalty,
+                                                                                                lower_bounds - x, upper_bounds - x)
+                        if np.max(elastic_variables, initial=0.) <= self.constraint_tolerance or penalty >= self.max_penalty:
+                            break
+
+                        # the linearized constraints could not be satisfied at this penalty, so the merit function should weigh the constraints more
+                        penalty = min(penalty * self.penalty_growth, self.max_penalty)
+                except linalg.LinAlgError:
+                    message = 'Singular matrix in the quadratic sub-problem'
+                    break
+
+                active_constraints = multipliers > 1e-6 * (1. + np.max(multipliers, initial=0.))
+                active_lower_bounds = step <= lower_bounds - x + 1e-7
+                active_upper_bounds = step >= upper_bounds - x - 1e-7
+
+            # the decrease of the merit function predicted by the quadratic model
+            violation = np.sum(np.maximum(0., -values))
+            predicted_violation = np.sum(np.maximum(0., -(values + gradients @ step)))
+            predicted_decrease = -(gradient @ step + 0.5 * step @ hessian @ step) + penalty * (violation - predicted_violation)
+            current_merit = cost + penalty * violation
+
+            if predicted_decrease <= self.tolerance * (1. + abs(cost)):
+                success = violation <= self.constraint_tolerance
+                message = 'Optimization terminated successfully' if success else 'Inequality constraints incompatible'
+                break
+
+            step_length = 1.
+            if merit(x + step, penalty) > current_merit - 1e-4 * predicted_decrease:
+                # second-order correction, see GaussNewtonBackend
+                corrected_values = constraint_values(x + step) - gradients @ step
+                corrected_solution = _solve_quadratic_program_on_active_set(hessian, gradient, gradients, corrected_values, penalty, lower_bounds - x,
+                                                                            upper_bounds - x, active_constraints, active_lower_bounds,
+                                                                            active_upper_bounds)
+                if corrected_solution is None:
+                    try:
+                        corrected_step, _, corrected_multipliers = _solve_elastic_quadratic_program(hessian, gradient, gradients, corrected_values,
+                                                                                                    penalty, lower_bounds - x, upper_bounds - x)
+                    except linalg.LinAlgError:
+                        message = 'Singular matrix in the quadratic sub-problem'
+                        break
+                else:
+                    corrected_step, corrected_multipliers = corrected_solution
+
+                if merit(x + corrected_step, penalty) <= current_merit - 1e-4 * predicted_decrease:
+                    step, multipliers = corrected_step, corrected_multipliers
+                else:
+                    while merit(x + step_length * step, penalty) > current_merit - 1e-4 * step_length * predicted_decrease:
+                        step_length /= 2.
+                        if step_length < 1e-8:
+                            break
+
+            if step_length < 1e-8:
+                message = 'Positive directional derivative for linesearch'
+                break
+
+            previous_x = x
+            previous_lagrangian_gradient = gradient - gradients.T @ multipliers
+            x = np.clip(x + step_length * step, lower_bounds, upper_bounds)
+            counters['nit'] += 1
+
+            if callback is not None:
+                try:
+                    callback(optimize.OptimizeResult(x=x.copy(), nit=counters['nit']))
+                except StopIteration:
+                    message = '`callback` raised `StopIteration`.'
+                    break
+
+        if success and warm_start is not None:
+            warm_start.hessian = hessian
+            warm_start.multipliers = multipliers
+            warm_start.multiplier_plan_indices = None
+            warm_start.active_lower_bounds = active_lower_bounds
+            warm_start.active_upper_bounds = active_upper_bounds
+            warm_start.penalty = penalty
+
+        return optimize.OptimizeResult(x=x, fun=fun(x, *args), success=success, status=0 if success else 1, message=message,
+                                       maxcv=max(0., -np.min(constraint_values(x))), multipliers=multipliers, **counters)
+
+    @staticmethod
+    def _bound_condition_number(hessian, max_condition_number):
+        eigenvalues, eigenvectors = np.linalg.eigh(hessian)
+        eigenvalues = np.minimum(eigenvalues, max_condition_number * eigenvalues[0])
+        return (eigenvectors * eigenvalues) @ eigenvectors.T
+
+    @staticmethod
+    def _update_hessian(hessian, step, gradient_change, scale_initial_hessian=False):
+        """
+        Powell's damped BFGS update, which keeps the approximation positive definite when the curvature along the step is negative (Nocedal & Wright,
+        procedure 18.2). Without a warm start, the initial identity matrix is first scaled to the curvature along the first step.
+        """
+        curvature = step @ gradient_change
+        if scale_initial_hessian and curvature > 0.:
+            hessian = np.eye(len(step)) * (gradient_change @ gradient_change) / curvature
+
+        hessian_step = hessian @ step
+        step_curvature = step @ hessian_step
+        if step_curvature <= 0.:
+            return hessian
+
+        if curvature < 0.2 * step_curvature:
+            damping = 0.8 * step_curvature / (step_curvature - curvature)
+            gradient_change = damping * gradient_change + (1. - damping) * hessian_step
+            curvature = step @ gradient_change
+
+        return hessian + np.outer(gradient_change, gradient_change) / curvature - np.outer(hessian_step, hessian_step) / step_curvature
+
+
+def _solve_quadratic_program_on_active_set(hessian, gradient, constraint_gradients, constraint_values, penalty, lower_bounds, upper_bounds,
+                                           active_constraints, active_lower_bounds, active_upper_bounds, tolerance=1e-9):
+    """
+    Solves the quadratic sub-problem of _solve_elastic_quadratic_program for a guess of the active set: the active constraints are treated as
+    equalities, the variables with an active bound are fixed at that bound and all other inequalities are ignored. This takes a single solve of the KKT
+    system. The solution is only returned if the guess was right, i.e. when all inequalities are satisfied and all multipliers have the right sign and
+    do not exceed the penalty (so the elastic variables are zero). It is then also the solution of the elastic sub-problem.
+
+    :return: the step and the multipliers of the linearized constraints, or None when the guess of the active set is wrong
+    """
+    number_of_constraints = len(constraint_values)
+    fixed = active_lower_bounds | active_upper_bounds
+    free = ~fixed
+
+    step = np.zeros(len(gradient))
+    step[active_lower_bounds] = lower_bounds[active_lower_bounds]
+    step[active_upper_bounds] = upper_bounds[active_upper_bounds]
+    if not np.all(np.isfinite(step)):
+        return None
+
+    active_gradients = constraint_gradients[active_constraints]
+    number_of_free_variables = np.count_nonzero(free)
+    number_of_active_constraints = len(active_gradients)
+
+    if number_of_free_variables + number_of_active_constraints > 0:
+        kkt_matrix = np.zeros((number_of_free_variables + number_of_active_constraints,) * 2)
+        kkt_matrix[:number_of_free_variables, :number_of_free_variables] = hessian[np.ix_(free, free)]
+        kkt_matrix[:number_of_free_variables, number_of_free_variables:] = -active_gradients[:, free].T
+        kkt_matrix[number_of_free_variables:, :number_of_free_variables] = active_gradients[:, free]
+        kkt_right_hand_side = np.concatenate([-gradient[free] - hessian[np.ix_(free, fixed)] @ step[fixed],
+                                              -constraint_values[active_constraints] - active_gradients[:, fixed] @ step[fixed]])
+
+        try:
+            kkt_solution = np.linalg.solve(kkt_matrix, kkt_right_hand_side)
+        except np.linalg.LinAlgError:
+            return None
+
+        if not np.all(np.isfinite(kkt_solution)):
+            return None
+
+        step[free] = kkt_solution[:number_of_free_variables]
+        active_multipliers = kkt_solution[number_of_free_variables:]
+    else:
+        active_multipliers = np.zeros(0)
+
+    multipliers = np.zeros(number_of_constraints)
+    multipliers[active_constraints] = active_multipliers
+    bound_multipliers = hessian @ step + gradient - constraint_gradients.T @ multipliers
+
+    dual_tolerance = tolerance * (1. + np.max(np.abs(gradient), initial=0.))
+    primal_tolerance = tolerance * (1. + np.max(np.abs(constraint_values), initial=0.))
+
+    is_optimal = np.all(constraint_values + constraint_gradients @ step >= -primal_tolerance) and \
+        np.all(step >= lower_bounds - primal_tolerance) and np.all(step <= upper_bounds + primal_tolerance) and \
+        np.all(multipliers >= -dual_tolerance) and np.all(multipliers <= penalty) and \
+        np.all(bound_multipliers[active_lower_bounds] >= -dual_tolerance) and np.all(bound_multipliers[active_upper_bounds] <= dual_tolerance)
+
+    if not is_optimal:
+        return None
+
+    return np.clip(step, lower_bounds, upper_bounds), np.maximum(multipliers, 0.)
+
+
+def _solve_elastic_quadratic_program(hessian, gradient, constraint_gradients, constraint_values, penalty, lower_bounds, upper_bounds):
+    """
+    Solves the quadratic sub-problem of an SQP iteration in elastic form:
+
+        minimize    0.5 d^T H d + g^T d + penalty * sum(t)
+        subject to  c + A d + t >= 0,   t >= 0,   lower_bounds <= d <= upper_bounds
+
+    :return: the step d, the elastic variables t and the multipliers of the linearized constraints
+    """
+    number_of_variables = len(gradient)
+    number_of_constraints = len(constraint_values)
+    identity = np.eye(number_of_variables + number_of_constraints)
+
+    extended_hessian = np.zeros((number_of_variables + number_of_constraints,) * 2)
+    extended_hessian[:number_of_variables, :number_of_variables] = hessian
+    extended_gradient = np.concatenate([gradient, np.full(number_of_constraints, penalty)])
+
+    has_lower_bound = np.isfinite(lower_bounds)
+    has_upper_bound = np.isfinite(upper_bounds)
+
+    inequality_matrix = np.vstack([np.hstack([constraint_gradients, np.eye(number_of_constraints)]),
+                                   identity[number_of_variables:],
+                                   identity[:number_of_variables][has_lower_bound],
+                                   -identity[:number_of_variables][has_upper_bound]])
+    inequality_offsets = np.concatenate([-np.asarray(constraint_values, dtype=float), np.zeros(number_of_constraints), lower_bounds[has_lower_bound],
+                                         -upper_bounds[has_upper_bound]])
+
+    solution, multipliers = _solve_quadratic_program(extended_hessian, extended_gradient, inequality_matrix, inequality_offsets)
+    return solution[:number_of_variables], solution[number_of_variables:], multipliers[:number_of_constraints]
+
+
+def _solve_quadratic_program(hessian, gradient, inequality_matrix, inequality_offsets, max_iterations=100, tolerance=1e-9, max_regularizations=10):
+    """
+    Solves the convex quadratic program: minimize 0.5 x^T H x + g^T x subject to G x >= h, with a primal-dual interior point method (Mehrotra's
+    predictor-corrector). The sub-problems of the planner are small and dense, so every iteration solves the normal equations with a Cholesky
+    factorization. A LinAlgError is raised when the normal equations can not be factorized, not even after regularization.
+
+    :return: x and the multipliers of the inequalities
+    """
+    number_of_inequalities = len(inequality_offsets)
+
+    def newton_step(x, slacks, multipliers, complementarity_residual):
+        dual_residual = hessian @ x + gradient - inequality_matrix.T @ multipliers
+        primal_residual = inequality_matrix @ x - slacks - inequality_offsets
+
+        weights = multipliers / slacks
+        normal_matrix = hessian + inequality_matrix.T @ (weights[:, None] * inequality_matrix)
+
+        if not np.all(np.isfinite(normal_matrix)):
+            raise linalg.LinAlgError('The normal matrix of the quadratic program is not finite')
+
+        # close to the solution, the weights of the active inequalities become so large that the normal matrix can be numerically singular. The
+        # regularization is increased at most max_regularizations times.
+        regularization = 0.
+        for _ in range(max_regularizations + 1):
+            try:
+                factorization = linalg.cho_factor(normal_matrix + regularization * np.eye(len(x)))
+                break
+            except linalg.LinAlgError:
+                regularization = max(10. * regularization, 1e-12 * np.max(np.diag(normal_matrix)), 1e-12)
+        else:
+            raise linalg.LinAlgError('The normal matrix of the quadratic program is not positive definite')
+
+        def solve(complementarity_residual):
+            x_step = linalg.cho_solve(factorization,
+                                      -dual_residual - inequality_matrix.T @ ((complementarity_residual + multipliers * primal_residual) / slacks))
+            slack_step = inequality_matrix @ x_step + primal_residual
+            multiplier_step = -(complementarity_residual + multipliers * slack_step) / slacks
+            return x_step, slack_step, multiplier_step
+
+        return solve
+
+    def max_step_length(values, steps):
+        is_decreasing = steps < 0.
+        return min(1., np.min(-values[is_decreasing] / steps[is_decreasing], initial=np.inf))
+
+    # the starting point follows from a full affine scaling step from x = 0, slacks = multipliers = 1 (Nocedal & Wright, section 16.6). This puts the
+    # multipliers on the scale of the gradient, which is large for the elastic variables.
+    x = np.zeros(len(gradient))
+    slacks = np.ones(number_of_inequalities)
+    multipliers = np.ones(number_of_inequalities)
+    x_step, slack_step, multiplier_step = newton_step(x, slacks, multipliers, None)(slacks * multipliers)
+    x = x + x_step
+    slacks = np.maximum(1., np.abs(slacks + slack_step))
+    multipliers = np.maximum(1., np.abs(multipliers + multiplier_step))
+
+    primal_scale = 1. + np.max(np.abs(inequality_offsets), initial=0.)
+    dual_scale = 1. + np.max(np.abs(gradient), initial=0.)
+
+    for _ in range(max_iterations):
+        duality_gap = slacks @ multipliers / number_of_inequalities
+
+        if np.max(np.abs(hessian @ x + gradient - inequality_matrix.T @ multipliers)) <= tolerance * dual_scale and \
+                np.max(np.abs(inequality_matrix @ x - slacks - inequality_offsets)) <= tolerance * primal_scale and duality_gap <= tolerance:
+            break
+
+        solve = newton_step(x, slacks, multipliers, None)
+
+        # predictor (affine scaling) step
+        _, affine_slack_step, affine_multiplier_step = solve(slacks * multipliers)
+        affine_step_length = min(max_step_length(slacks, affine_slack_step), max_step_length(multipliers, affine_multiplier_step))
+        affine_gap = (slacks + affine_step_length * affine_slack_step) @ (multipliers + affine_step_length * affine_multiplier_step) / number_of_inequalities
+        centering = (affine_gap / duality_gap) ** 3
+
+        # corrector step
+        x_step, slack_step, multiplier_step = solve(slacks * multipliers + affine_slack_step * affine_multiplier_step - centering * duality_gap)
+        step_length = 0.99 * min(max_step_length(slacks, slack_step), max_step_length(multipliers, multiplier_step))
+
+        x = x + step_length * x_step
+        slacks = slacks + step_length * slack_step
+        multipliers = multipliers + step_length * multiplier_step
+
+    return x, multipliers
+
+
+def _get_constraint_jacobian(constraint):
+    """ Returns the Jacobian of a constraint dict, or a forward difference approximation (with the step size SLSQP uses) if it has none. """
+    if constraint.get('jac') is not None:
+        return constraint['jac']
+
+    return lambda x, *args: optimize.approx_fprime(x, constraint['fun'], np.sqrt(np.finfo(float).eps), *args)
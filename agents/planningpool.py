@@ -0,0 +1,95 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import concurrent.futures
+import multiprocessing
+import time
+
+# shared with the parent process: the index of the highest priority planning problem that was solved successfully in the current call to solve
+_first_successful_problem = None
+
+
+def _initialize_worker(first_successful_problem):
+    global _first_successful_problem
+    _first_successful_problem = first_successful_problem
+
+
+def _solve_planning_problem(problem_index, planning_problem, planner_backend, time_budget):
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    def is_cancelled():
+        return _first_successful_problem.value < problem_index
+
+    return planning_problem.agent._minimize(planner_backend, planning_problem.initial_plan, deadline, is_cancelled)
+
+
+class PlanningPool:
+    """
+    A pool of worker processes that solves a set of planning problems (e.g. the same problem from different initial conditions) concurrently. The pool is
+    owned by a sim master and shared by its agents, the worker processes are started when the pool is first used and stopped by shutdown.
+
+    The planning problems are ordered by priority. When a problem is solved successfully, the problems with a lower priority are cancelled: problems that
+    did not start yet are not started at all and running optimizations stop after their current iteration. The problems with a higher priority always run
+    to completion, so which problems succeed does not depend on the timing of the worker processes.
+    """
+
+    def __init__(self, number_of_processes):
+        self.number_of_processes = number_of_processes
+        self._first_successful_problem = multiprocessing.RawValue('i', 0)
+        self._executor = None
+
+    def solve(self, planning_problems, planner_backend, deadline=None):
+        """
+        Solves the planning problems concurrently
+
+        :param planning_problems: a list of PlanningProblem objects, ordered by priority
+        :param planner_backend: the PlannerBackend to use for all problems
+        :param deadline: an optional wall-clock deadline (in time.perf_counter() time) for all optimizations
+        :return: a list with a scipy OptimizeResult for every planning problem, or None for problems that were cancelled before they started
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.number_of_processes, initializer=_initialize_worker,
+                                                                    initargs=(self._first_successful_problem,))
+
+        self._first_successful_problem.value = len(planning_problems)
+
+        # the deadline is passed on as a time budget, the clocks of the worker processes do not have to match the clock of this process
+        time_budget = None if deadline is None else deadline - time.perf_counter()
+        futures = [self._executor.submit(_solve_planning_problem, problem_index, planning_problem, planner_backend, time_budget)
+                   for problem_index, planning_problem in enumerate(planning_problems)]
+
+        results = [None] * len(planning_problems)
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
+                continue
+
+            problem_index = futures.index(future)
+            results[problem_index] = future.result()
+
+            if results[problem_index].success and problem_index < self._first_successful_problem.value:
+                self._first_successful_problem.value = problem_index
+                for lower_priority_future in futures[problem_index + 1:]:
+                    lower_priority_future.cancel()
+
+        return results
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
@@ -0,0 +1,78 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import copy
+
+from .rolloutmemo import RolloutMemo
+
+
+class _FrozenSimMaster:
+    """ Stands in for the sim master of a planning problem; the optimization only needs the time at which the problem was recorded. """
+
+    def __init__(self, t):
+        self.t = t
+
+    @staticmethod
+    def get_current_state(side):
+        return None, None
+
+
+class PlanningProblem:
+    """
+    A snapshot of the optimization problem a CEIAgent solves when it updates its plan. The snapshot holds a detached copy of the agent (without the
+    sim master and the plan cache), so it can be pickled and solved again later, e.g. with a different planner backend or in another process.
+    """
+
+    def __init__(self, agent, initial_plan=None):
+        self.agent = copy.copy(agent)
+        self.agent.sim_master = _FrozenSimMaster(agent.sim_master.t)
+        self.agent.controllable_object = copy.copy(agent.controllable_object)
+        self.agent.belief = copy.deepcopy(agent.belief)
+        self.agent.belief_time_stamps = agent.belief_time_stamps
+        self.agent.action_plan = agent.action_plan.copy()
+        self.agent.plan_cache = None
+        self.agent._rollout_memo = RolloutMemo()
+        self.agent.recorded_planning_problems = []
+        self.agent._planner_warm_start = copy.deepcopy(agent._planner_warm_start)
+
+        # the autograd Jacobian can not be pickled, the adjoint Jacobian gives the same result
+        self.agent.cost_jacobian = self.agent._cost_function_jacobian
+
+        self.initial_plan = agent.action_plan.copy() if initial_plan is None else initial_plan.copy()
+
+    @property
+    def t(self):
+        return self.agent.sim_master.t
+
+    def cost(self, plan):
+        return self.agent._cost_function(plan, *self.agent._get_cost_arguments())
+
+    def constraint(self, plan):
+        return self.agent._plan_constraint(plan, *self.agent._get_constraint_arguments())
+
+    def solve(self, planner_backend=None):
+        """
+        Solves the problem once from the initial plan, without the fallback to a grid search that the agent uses when planning fails.
+
+        :param planner_backend: the backend to use, defaults to the backend of the agent
+        :return: a scipy OptimizeResult
+        """
+        if planner_backend is None:
+            planner_backend = self.agent.planner_backend
+
+        return self.agent._minimize(planner_backend, self.initial_plan)
@@ -0,0 +1,70 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import numpy as np
+
+
+class PosteriorSchedule:
+    """
+    The standard deviation of a belief point only depends on its prior standard deviation and on the time until its time stamp, not on the observations.
+    A new belief point always starts with the same standard deviation and is updated on every time step, so its standard deviations and the gains of the
+    posterior mean can be computed in advance for every number of time steps until the time stamp. With these tables, the posterior of a belief point
+    that follows the schedule is an affine function of its prior mean and the observation.
+    """
+
+    def __init__(self, dt, belief_frequency, number_of_belief_points, max_comfortable_acceleration, max_acceleration, posterior_function,
+                 tolerance=1e-9):
+        self.tolerance = tolerance
+        self._dt_in_seconds = dt / 1000.
+
+        number_of_steps = int(round(number_of_belief_points * (1000 / dt) / belief_frequency))
+        times = np.arange(number_of_steps + 1) * (dt / 1000.)
+        time_until_new_point = number_of_belief_points / belief_frequency
+
+        # the standard deviation of a new belief point when the lower bound on the velocity of the other vehicle is not limited by 0.
+        sigma = max_acceleration * time_until_new_point ** 2 / 6
+
+        # the prior standard deviations are nan for the number of steps at which belief points are never updated
+        self.prior_sigmas = np.full(number_of_steps + 1, np.nan)
+        self.posterior_sigmas = np.full(number_of_steps + 1, np.nan)
+
+        for step in range(number_of_steps - 1, 0, -1):
+            self.prior_sigmas[step] = sigma
+            _, sigma = posterior_function(0., sigma, (max_comfortable_acceleration * times[step]) / 6, 0., times[step])
+            self.posterior_sigmas[step] = sigma
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            likelihood_variances = ((max_comfortable_acceleration * times) / 6) ** 2
+            denominators = likelihood_variances + self.prior_sigmas ** 2 / times ** 2
+            self.mean_gains = likelihood_variances / denominators
+            self.observation_gains = (self.prior_sigmas ** 2 / times) / denominators
+
+    def get_posterior(self, prior_mu, prior_sigma, times, observation):
+        """
+        Returns the posterior means and standard deviations for belief points with the given times until their time stamps, and a mask that is True for
+        the belief points that follow the schedule. The posterior of the other belief points has to be calculated separately.
+        """
+        # the times until the time stamps are positive multiples of the time step (up to rounding errors)
+        steps = np.minimum((times / self._dt_in_seconds + .5).astype(int), len(self.prior_sigmas) - 1)
+        scheduled_prior_sigmas = self.prior_sigmas[steps]
+
+        # comparisons with the nan entries of the schedule are always False
+        follows_schedule = np.abs(prior_sigma - scheduled_prior_sigmas) <= self.tolerance * scheduled_prior_sigmas
+
+        posterior_mu = self.mean_gains[steps] * prior_mu + self.observation_gains[steps] * observation
+        return posterior_mu, self.posterior_sigmas[steps], follows_schedule
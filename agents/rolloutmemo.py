@@ -0,0 +1,65 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+
+
+class RolloutMemo:
+    """
+    Remembers the trajectories of the most recently evaluated plans. Within an optimizer iteration, the cost, the constraint and their Jacobians are
+    evaluated for the same plan; with this memo the vehicle dynamics only have to be simulated once for every plan.
+
+    Entries are stored under a key that describes the plan and the initial state except for the initial position. The velocities do not depend on the
+    initial position, so an entry can always provide the velocities, but the positions only for the initial position it was calculated with.
+    """
+
+    def __init__(self, number_of_entries=4):
+        self.number_of_entries = number_of_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, initial_position=None):
+        """
+        :param key: the key of the plan, the initial velocity and the dynamics parameters
+        :param initial_position: the initial position the positions should be calculated with, None if only the velocities are needed
+        :return: (positions, velocities) or None if no matching entry exists
+        """
+        entry = self._entries.get(key)
+
+        if entry is None or (initial_position is not None and entry[0] != initial_position):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def put(self, key, initial_position, positions, velocities):
+        self._entries[key] = (initial_position, positions, velocities)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.number_of_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,205 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import pickle
+import time
+import warnings
+
+import numpy as np
+
+from agents import CEIAgent, SLSQPBackend, TrustConstrBackend, AugmentedLagrangianBackend, GaussNewtonBackend, QuasiNewtonSQPBackend
+from controllableobjects import PointMassObject
+from simulation.offlinesimmaster import OfflineSimMaster
+from simulation.simulationconstants import SimulationConstants
+from trackobjects import SymmetricMergingTrack
+from trackobjects.trackside import TrackSide
+
+# the initial conditions and parameters of scenarios A-D, see the scripts in run_scenarios
+SCENARIOS = {'A': {'right_initial_position': 0.0, 'right_velocity': 9., 'left_risk_bounds': (.2, .5), 'right_risk_bounds': (.2, .5)},
+             'B': {'right_initial_position': 1.2, 'right_velocity': 9., 'left_risk_bounds': (.2, .5), 'right_risk_bounds': (.2, .5)},
+             'C': {'right_initial_position': 0.0, 'right_velocity': 10., 'left_risk_bounds': (.2, .4), 'right_risk_bounds': (.3, .6)},
+             'D': {'right_initial_position': 0.0, 'right_velocity': 10., 'left_risk_bounds': (.3, .4), 'right_risk_bounds': (.3, .6)}}
+
+
+def simulate_scenario(scenario, planner_backend, record_planning_problems=False):
+    simulation_constants = SimulationConstants(dt=50,
+                                               vehicle_width=1.8,
+                                               vehicle_length=4.5,
+                                               track_start_point_distance=25.,
+                                               track_section_length=50.,
+                                               max_time=40e3)
+
+    track = SymmetricMergingTrack(simulation_constants)
+    parameters = SCENARIOS[scenario]
+
+    file_name = 'planner_benchmark_%s_%s' % (scenario, planner_backend.name.replace(' ', '_'))
+    sim_master = OfflineSimMaster(track, simulation_constants, file_name, save_to_mat_and_csv=False, verbose=False)
+
+    left_point_mass_object = PointMassObject(track,
+                                             initial_position=track.traveled_distance_to_coordinates(0.0, track_side=TrackSide.LEFT),
+                                             initial_velocity=10.,
+                                             cruise_control_velocity=10.,
+                                             use_discrete_inputs=False,
+                                             resistance_coefficient=0.0005, constant_resistance=0.1)
+
+    right_point_mass_object = PointMassObject(track,
+                                              initial_position=track.traveled_distance_to_coordinates(parameters['right_initial_position'],
+                                                                                                      track_side=TrackSide.RIGHT),
+                                              initial_velocity=parameters['right_velocity'],
+                                              cruise_control_velocity=parameters['right_velocity'],
+                                              use_discrete_inputs=False,
+                                              resistance_coefficient=0.0005, constant_resistance=0.1)
+
+    agents = {}
+    for side, point_mass_object, risk_bounds, preferred_velocity in [(TrackSide.LEFT, left_point_mass_object, parameters['left_risk_bounds'], 10.),
+                                                                     (TrackSide.RIGHT, right_point_mass_object, parameters['right_risk_bounds'],
+                                                                      parameters['right_velocity'])]:
+        agents[side] = CEIAgent(point_mass_object, side, simulation_constants.dt, sim_master, track,
+                                risk_bounds=risk_bounds,
+                                saturation_time=2.,
+                                time_horizon=4.,
+                                preferred_velocity=preferred_velocity,
+                                vehicle_width=simulation_constants.vehicle_width,
+                                belief_frequency=4,
+                                vehicle_length=simulation_constants.vehicle_length,
+                                theta=1.,
+                                use_analytic_risk_jacobian=True,
+                                planner_backend=planner_backend,
+                                record_planning_problems=record_planning_problems)
+        sim_master.add_vehicle(side, point_mass_object, agents[side])
+
+    start_time = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        sim_master.start()
+
+    return sim_master, agents, time.perf_counter() - start_time
+
+
+def load_or_record_planning_problems(file_name):
+    if os.path.isfile(file_name):
+        with open(file_name, 'rb') as f:
+            return pickle.load(f)
+
+    planning_problems = []
+    for scenario in SCENARIOS.keys():
+        _, agents, _ = simulate_scenario(scenario, SLSQPBackend(), record_planning_problems=True)
+        for side, agent in agents.items():
+            planning_problems += [(scenario, side, problem) for problem in agent.recorded_planning_problems]
+
+    with open(file_name, 'wb') as f:
+        pickle.dump(planning_problems, f)
+
+    return planning_problems
+
+
+def benchmark_planning_problems(planning_problems, planner_backends):
+    print('%-22s %10s %10s %10s %12s %12s %10s' % ('backend', 'time [ms]', 'iter', 'fev', 'cost', 'constraint', 'failures'))
+
+    for planner_backend in planner_backends:
+        solve_times, iterations, function_evaluations, costs, constraints, failures = [], [], [], [], [], 0
+
+        for _, _, problem in planning_problems:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                start_time = time.perf_counter()
+                result = problem.solve(planner_backend)
+                solve_times += [time.perf_counter() - start_time]
+
+            iterations += [result.nit]
+            function_evaluations += [result.nfev]
+            costs += [problem.cost(result.x)]
+            constraints += [problem.constraint(result.x)]
+            failures += 0 if result.success else 1
+
+        print('%-22s %10.1f %10.1f %10.1f %12.3f %12.4f %10d' % (planner_backend.name, np.mean(solve_times) * 1000., np.mean(iterations),
+                                                                np.mean(function_evaluations), np.mean(costs), np.min(constraints), failures))
+
+
+def benchmark_risk_constraint_formulations(planning_problems, planner_backend):
+    """
+    Compares the scalar risk constraint (on the maximum collision probability) with the vector valued constraint (one inequality per belief point). The
+    reported constraint is always the scalar constraint, so the results of both formulations can be compared directly. The formulation is switched on the
+    recorded agents, so this also works for backends that a CEIAgent does not accept with the vector constraint, such as SLSQP.
+    """
+    print('%-22s %10s %10s %10s %12s %12s %10s' % ('risk constraint', 'time [ms]', 'iter', 'fev', 'cost', 'constraint', 'failures'))
+
+    for use_vector_risk_constraint in [False, True]:
+        solve_times, iterations, function_evaluations, costs, constraints, failures = [], [], [], [], [], 0
+
+        for _, _, problem in planning_problems:
+            problem.agent.use_vector_risk_constraint = use_vector_risk_constraint
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                start_time = time.perf_counter()
+                result = problem.solve(planner_backend)
+                solve_times += [time.perf_counter() - start_time]
+
+            iterations += [result.nit]
+            function_evaluations += [result.nfev]
+            costs += [problem.cost(result.x)]
+            constraints += [problem.constraint(result.x)]
+            failures += 0 if result.success else 1
+
+        print('%-22s %10.1f %10.1f %10.1f %12.3f %12.4f %10d' % ('per belief point' if use_vector_risk_constraint else 'maximum', np.mean(solve_times) * 1000.,
+                                                                np.mean(iterations), np.mean(function_evaluations), np.mean(costs), np.min(constraints),
+                                                                failures))
+
+
+def compare_scenario_results(planner_backends):
+    """
+    Runs scenarios A-D with every backend and compares the traveled distances with the results of the first backend.
+    """
+    reference_results = {}
+
+    print('%-22s %10s %18s %12s %24s' % ('backend', 'scenario', 'end state', 'time [s]', 'max deviation [m]'))
+    for planner_backend in planner_backends:
+        for scenario in SCENARIOS.keys():
+            sim_master, _, run_time = simulate_scenario(scenario, planner_backend)
+            traveled_distances = {side: np.array([d for d in sim_master.travelled_distance[side] if d is not None]) for side in TrackSide}
+
+            if scenario not in reference_results:
+                reference_results[scenario] = traveled_distances
+
+            max_deviation = 0.
+            for side in TrackSide:
+                length = min(len(traveled_distances[side]), len(reference_results[scenario][side]))
+                max_deviation = max(max_deviation, np.max(np.abs(traveled_distances[side][:length] - reference_results[scenario][side][:length])))
+
+            print('%-22s %10s %18s %12.2f %24.3f' % (planner_backend.name, scenario, sim_master.end_state, run_time, max_deviation))
+
+
+if __name__ == '__main__':
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    os.makedirs('data', exist_ok=True)
+
+    backends_to_compare = [SLSQPBackend(), TrustConstrBackend(), AugmentedLagrangianBackend(), GaussNewtonBackend(), QuasiNewtonSQPBackend()]
+
+    problems = load_or_record_planning_problems(os.path.join('data', 'planning_problems.pkl'))
+    print('Benchmarking %d recorded planning problems' % len(problems))
+    benchmark_planning_problems(problems, backends_to_compare)
+
+    for backend in [SLSQPBackend(), GaussNewtonBackend()]:
+        print('')
+        print(backend.name)
+        benchmark_risk_constraint_formulations(problems, backend)
+
+    print('')
+    compare_scenario_results(backends_to_compare)
@@ -71,6 +71,56 @@ class ControllableObject(abc.ABC):
         """
         pass
 
+    @staticmethod
+    @abc.abstractmethod
+    def calculate_trajectory_1d(dt, position, velocity, accelerations, resistance_coefficient, constant_resistance):
+        """
+        Calculates and returns the positions and velocities after every time step when applying a sequence of accelerations, but does not apply this to the
+        object. This model is used in MPC
+
+        :param constant_resistance:
+        :param resistance_coefficient:
+        :param dt: duration of a time step in s
+        :param position: initial position
+        :param velocity: initial velocity
+        :param accelerations: array of acceleration commands with shape (N,) or a batch of them with shape (K, N)
+        :return: positions, velocities; both with the same shape as accelerations
+        """
+        pass
+
+    @staticmethod
+    @abc.abstractmethod
+    def calculate_trajectory_gradient_1d(dt, velocity, velocities, resistance_coefficient, position_weights=None, velocity_weights=None):
+        """
+        Calculates the gradient of sum(position_weights * positions + velocity_weights * velocities) with respect to the accelerations of a single
+        trajectory calculated with calculate_trajectory_1d. This is used for the exact gradients of the cost and the constraints in MPC
+
+        :param dt: duration of a time step in s
+        :param velocity: initial velocity
+        :param velocities: the velocities after every time step as returned by calculate_trajectory_1d
+        :param resistance_coefficient:
+        :param position_weights: weights on the positions after every time step, None means all zeros
+        :param velocity_weights: weights on the velocities after every time step, None means all zeros
+        :return: the gradient with respect to the accelerations
+        """
+        pass
+
+    @staticmethod
+    @abc.abstractmethod
+    def calculate_trajectory_jacobian_1d(dt, velocity, velocities, resistance_coefficient):
+        """
+        Calculates the Jacobians of the positions and velocities of a single trajectory calculated with calculate_trajectory_1d with respect to the
+        accelerations.
+
+        :param dt: duration of a time step in s
+        :param velocity: initial velocity
+        :param velocities: the velocities after every time step as returned by calculate_trajectory_1d
+        :param resistance_coefficient:
+        :return: position_jacobian, velocity_jacobian; both with shape (N, N) where element [i, j] is the derivative of the state after time step i with
+                 respect to acceleration j
+        """
+        pass
+
     @abc.abstractmethod
     def reset_to_initial_values(self):
         """
@@ -116,6 +116,131 @@ class PointMassObject(ControllableObject):
 
         return new_position, new_velocity
 
+    @staticmethod
+    def calculate_trajectory_1d(dt, position, velocity, accelerations, resistance_coefficient, constant_resistance):
+        """
+        Applies calculate_time_step_1d for a sequence of accelerations. accelerations can be a single plan with shape (N,) or a batch of plans with shape
+        (K, N). A single plan of floats is integrated with plain python floats, which is the fastest option for short plans. Batches and autograd-traced
+        plans are integrated with array operations: the velocities are integrated step by step (because of the quadratic resistance and the clamp at zero
+        velocity) and the positions follow from a cumulative sum.
+
+        :return: positions, velocities after every time step, both with the same shape as accelerations
+        """
+        if isinstance(accelerations, np.ndarray) and accelerations.ndim == 1:
+            new_position = float(position)
+            new_velocity = float(velocity)
+            positions = []
+            velocities = []
+
+            for acceleration in accelerations.tolist():
+                net_acceleration = acceleration - resistance_coefficient * new_velocity ** 2 - constant_resistance
+                new_position = new_position + (new_velocity * dt + (net_acceleration / 2) * dt ** 2)
+                new_velocity = new_velocity + net_acceleration * dt
+                if new_velocity < 0:
+                    new_velocity = 0.0
+                positions.append(new_position)
+                velocities.append(new_velocity)
+
+            # np.asarray is used because autograd's np.array inspects every list element for traced values, which is slow
+            return np.asarray(positions), np.asarray(velocities)
+
+        velocities = []
+        new_velocity = velocity
+
+        for index in range(accelerations.shape[-1]):
+            new_velocity = new_velocity + (accelerations[..., index] - resistance_coefficient * new_velocity ** 2 - constant_resistance) * dt
+            new_velocity = np.maximum(new_velocity, 0.0)
+            velocities.append(new_velocity)
+
+        velocities = np.stack(velocities, axis=-1)
+
+        # the position update uses the velocity at the start of every time step and the (unclamped) net acceleration
+        first_entry = np.ones(accelerations.shape[:-1] + (1,))
+        velocities_at_start = np.concatenate([first_entry * velocity, velocities[..., :-1]], axis=-1)
+        net_accelerations = accelerations - resistance_coefficient * velocities_at_start ** 2 - constant_resistance
+
+        position_increments = velocities_at_start * dt + (net_accelerations / 2) * dt ** 2
+        positions = np.cumsum(np.concatenate([first_entry * position, position_increments], axis=-1), axis=-1)[..., 1:]
+
+        return positions, velocities
+
+    @staticmethod
+    def calculate_trajectory_gradient_1d(dt, velocity, velocities, resistance_coefficient, position_weights=None, velocity_weights=None):
+        """
+        Calculates the gradient of sum(position_weights * positions + velocity_weights * velocities) with respect to the accelerations of a single
+        trajectory calculated with calculate_trajectory_1d. The gradient is obtained with a single reverse sweep over the trajectory (adjoint method),
+        so its cost is linear in the length of the trajectory.
+
+        :param dt: duration of a time step in s
+        :param velocity: initial velocity
+        :param velocities: the velocities after every time step as returned by calculate_trajectory_1d
+        :param resistance_coefficient:
+        :param position_weights: weights on the positions after every time step, None means all zeros
+        :param velocity_weights: weights on the velocities after every time step, None means all zeros
+        :return: the gradient with respect to the accelerations
+        """
+        number_of_steps = len(velocities)
+        velocities = [float(velocity)] + np.asarray(velocities).tolist()
+        position_weights = [0.] * number_of_steps if position_weights is None else np.asarray(position_weights).tolist()
+        velocity_weights = [0.] * number_of_steps if velocity_weights is None else np.asarray(velocity_weights).tolist()
+
+        gradient = [0.] * number_of_steps
+        position_adjoint = 0.
+        velocity_adjoint = 0.
+
+        for index in range(number_of_steps - 1, -1, -1):
+            position_adjoint += position_weights[index]
+            velocity_adjoint += velocity_weights[index]
+            velocity = velocities[index]
+
+            # the derivatives of the velocity update are zero when the new velocity was clamped at zero
+            if velocities[index + 1] > 0.:
+                gradient[index] = position_adjoint * (dt ** 2) / 2 + velocity_adjoint * dt
+                # the terms are added in the same order as in a reverse pass of autograd, so the gradient is identical to the autograd gradient
+                velocity_adjoint = velocity_adjoint - 2 * resistance_coefficient * (velocity_adjoint * dt) * velocity
+            else:
+                gradient[index] = position_adjoint * (dt ** 2) / 2
+                velocity_adjoint = 0.
+
+            velocity_adjoint += position_adjoint * (dt - resistance_coefficient * velocity * dt ** 2)
+
+        return np.asarray(gradient)
+
+    @staticmethod
+    def calculate_trajectory_jacobian_1d(dt, velocity, velocities, resistance_coefficient):
+        """
+        Calculates the Jacobians of the positions and velocities of a single trajectory calculated with calculate_trajectory_1d with respect to the
+        accelerations. Both Jacobians are lower triangular, because an acceleration only influences the state after the time step it is applied in.
+
+        :param dt: duration of a time step in s
+        :param velocity: initial velocity
+        :param velocities: the velocities after every time step as returned by calculate_trajectory_1d
+        :param resistance_coefficient:
+        :return: position_jacobian, velocity_jacobian; both with shape (N, N) where element [i, j] is the derivative of the state after time step i with
+                 respect to acceleration j
+        """
+        number_of_steps = len(velocities)
+        velocities_at_start = np.concatenate([[float(velocity)], np.asarray(velocities, dtype=float)[:-1]])
+
+        # the derivatives of the velocity update are zero when the new velocity was clamped at zero
+        is_moving = np.asarray(velocities) > 0.
+        velocity_sensitivities = np.where(is_moving, 1 - 2 * resistance_coefficient * velocities_at_start * dt, 0.)
+
+        velocity_jacobian = np.zeros((number_of_steps, number_of_steps))
+        previous_row = np.zeros(number_of_steps)
+        for index in range(number_of_steps):
+            previous_row = previous_row * velocity_sensitivities[index]
+            previous_row[index] = dt if is_moving[index] else 0.
+            velocity_jacobian[index] = previous_row
+
+        # the position update uses the velocity at the start of every time step
+        velocity_at_start_jacobian = np.concatenate([np.zeros((1, number_of_steps)), velocity_jacobian[:-1]])
+        position_increment_jacobian = (dt - resistance_coefficient * velocities_at_start * dt ** 2)[:, None] * velocity_at_start_jacobian + \
+                                      np.eye(number_of_steps) * (dt ** 2) / 2
+        position_jacobian = np.cumsum(position_increment_jacobian, axis=0)
+
+        return position_jacobian, velocity_jacobian
+
     def reset_to_initial_values(self):
         self.position = self.initial_position
         self.velocity = self.initial_velocity
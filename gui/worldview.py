@@ -182,7 +182,7 @@ class WorldView(QtWidgets.QGraphicsView):
 
     def update_plan_and_belief_graphics(self, position_plan, belief):
         number_of_points = len(self.belief_graphics_objects)
-        slices = int(len(position_plan) / number_of_points)
+        slices = max(int(len(position_plan) / number_of_points), 1)
 
         plan = np.array(position_plan)[0::slices]
         belief = np.array(belief)[0::slices]
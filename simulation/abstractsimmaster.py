@@ -25,13 +25,13 @@ import pickle
 import numpy as np
 import scipy.io
 
-from agents import CEIAgent
+from agents import CEIAgent, PlanningPool
 from simulation.simulationconstants import SimulationConstants
 from trackobjects.trackside import TrackSide
 
 
 class AbstractSimMaster(abc.ABC):
-    def __init__(self, track, simulation_constants, file_name=None, sub_folder=None, save_to_mat_and_csv=True):
+    def __init__(self, track, simulation_constants, file_name=None, sub_folder=None, save_to_mat_and_csv=True, number_of_planning_processes=None):
         self.vehicle_width = simulation_constants.vehicle_width
         self.vehicle_length = simulation_constants.vehicle_length
         self.simulation_constants = simulation_constants
@@ -57,6 +57,12 @@ class AbstractSimMaster(abc.ABC):
 
         self._is_recording = False
 
+        # optionally, the agents can solve planning problems from multiple initial conditions in parallel using a pool of worker processes for this run
+        if number_of_planning_processes:
+            self.planning_pool = PlanningPool(number_of_planning_processes)
+        else:
+            self.planning_pool = None
+
         if file_name:
             # dicts for saving to file and a list that contains all attributes of the sim master object that will be saved
             self.beliefs = {}
@@ -73,11 +79,12 @@ class AbstractSimMaster(abc.ABC):
             self.belief_time_stamps = {}
             self.belief_point_contributing_to_risk = {}
             self.risk_bounds = {}
+            self.plan_update_telemetry = {}
 
             self._attributes_to_save = ['dt', 'max_time', 'simulation_constants', 'vehicle_width', 'vehicle_length', 'agent_types', 'end_state',
                                         'beliefs', 'perceived_risks', 'is_replanning', 'position_plans', 'action_plans', 'positions', 'travelled_distance',
                                         'raw_input', 'velocities', 'accelerations', 'net_accelerations', 'belief_time_stamps',
-                                        'belief_point_contributing_to_risk', 'risk_bounds', 'current_condition']
+                                        'belief_point_contributing_to_risk', 'risk_bounds', 'plan_update_telemetry', 'current_condition']
 
             number_of_time_steps = int(simulation_constants.max_time / simulation_constants.dt) + 1
             for side in TrackSide:
@@ -95,6 +102,9 @@ class AbstractSimMaster(abc.ABC):
                 self.belief_time_stamps[side] = [None] * number_of_time_steps
                 self.belief_point_contributing_to_risk[side] = [None] * number_of_time_steps
 
+                # only filled at time steps where the plan was updated, the None entries are removed when saving
+                self.plan_update_telemetry[side] = [None] * number_of_time_steps
+
     def reset(self):
         self._t = 0.  # [ms]
         self.time_index = 0
@@ -116,11 +126,12 @@ class AbstractSimMaster(abc.ABC):
             self.belief_time_stamps = {}
             self.belief_point_contributing_to_risk = {}
             self.risk_bounds = {}
+            self.plan_update_telemetry = {}
 
             self._attributes_to_save = ['dt', 'max_time', 'simulation_constants', 'vehicle_width', 'vehicle_length', 'agent_types', 'end_state',
                                         'beliefs', 'perceived_risks', 'is_replanning', 'position_plans', 'action_plans', 'positions', 'travelled_distance',
                                         'raw_input', 'velocities', 'accelerations', 'net_accelerations', 'belief_time_stamps',
-                                        'belief_point_contributing_to_risk', 'risk_bounds', 'current_condition']
+                                        'belief_point_contributing_to_risk', 'risk_bounds', 'plan_update_telemetry', 'current_condition']
 
             number_of_time_steps = int(self.simulation_constants.max_time / self.simulation_constants.dt)
             for side in TrackSide:
@@ -138,6 +149,9 @@ class AbstractSimMaster(abc.ABC):
                 self.belief_time_stamps[side] = [None] * number_of_time_steps
                 self.belief_point_contributing_to_risk[side] = [None] * number_of_time_steps
 
+                # only filled at time steps where the plan was updated, the None entries are removed when saving
+                self.plan_update_telemetry[side] = [None] * number_of_time_steps
+
     @abc.abstractmethod
     def do_time_step(self, reverse=False):
         pass
@@ -168,13 +182,14 @@ class AbstractSimMaster(abc.ABC):
         if self._file_name is not None:
             for side in self._agents.keys():
                 if self.agent_types[side] == CEIAgent:
-                    self.beliefs[side][self.time_index] = copy.deepcopy(self._agents[side].belief)
+                    self.beliefs[side][self.time_index] = self._agents[side].belief.tolist()
                     self.action_plans[side][self.time_index] = copy.deepcopy(self._agents[side].action_plan)
                     self.position_plans[side][self.time_index] = copy.deepcopy(self._agents[side].position_plan)
                     self.perceived_risks[side][self.time_index] = copy.deepcopy(self._agents[side].perceived_risk)
                     self.is_replanning[side][self.time_index] = copy.deepcopy(self._agents[side].did_plan_update_on_last_tick)
-                    self.belief_time_stamps[side][self.time_index] = copy.deepcopy(self._agents[side].belief_time_stamps)
+                    self.belief_time_stamps[side][self.time_index] = self._agents[side].belief_time_stamps.tolist()
                     self.belief_point_contributing_to_risk[side][self.time_index] = copy.deepcopy(self._agents[side].belief_point_contributing_to_risk)
+                    self.plan_update_telemetry[side][self.time_index] = copy.deepcopy(self._agents[side].plan_update_telemetry)
 
                 self.positions[side][self.time_index] = self._vehicles[side].position
                 self.velocities[side][self.time_index] = self._vehicles[side].velocity
@@ -276,7 +291,14 @@ class AbstractSimMaster(abc.ABC):
         values = []
 
         if isinstance(old_value, list):
-            values += [np.array(old_value)]
+            try:
+                values += [np.array(old_value)]
+            except ValueError:
+                # the elements differ in length (e.g. plans and beliefs of agents with an adaptive time horizon), store them as a cell array
+                value = np.empty(len(old_value), dtype=object)
+                for index, element in enumerate(old_value):
+                    value[index] = element
+                values += [value]
             keys += [old_key]
         elif isinstance(old_value, SimulationConstants):
             for sim_constants_key, sim_constants_value in old_value.__dict__.items():
@@ -24,8 +24,9 @@ from trackobjects.trackside import TrackSide
 
 
 class OfflineSimMaster(AbstractSimMaster):
-    def __init__(self, track, simulation_constants, file_name, save_to_mat_and_csv=True, verbose=True):
-        super().__init__(track, simulation_constants, file_name, save_to_mat_and_csv=save_to_mat_and_csv)
+    def __init__(self, track, simulation_constants, file_name, save_to_mat_and_csv=True, verbose=True, number_of_planning_processes=None):
+        super().__init__(track, simulation_constants, file_name, save_to_mat_and_csv=save_to_mat_and_csv,
+                         number_of_planning_processes=number_of_planning_processes)
         self.verbose = verbose
 
         if verbose:
@@ -58,6 +59,9 @@ class OfflineSimMaster(AbstractSimMaster):
         if not self._stop:
             self.end_state = "Time ran out"
 
+        if self.planning_pool is not None:
+            self.planning_pool.shutdown()
+
         self._save_to_file()
 
     def do_time_step(self, reverse=False):
@@ -26,8 +26,9 @@ from trackobjects.trackside import TrackSide
 
 
 class SimMaster(AbstractSimMaster):
-    def __init__(self, gui, track, simulation_constants, *, file_name=None, sub_folder=None, save_to_mat_and_csv=True):
-        super().__init__(track, simulation_constants, file_name, sub_folder=sub_folder, save_to_mat_and_csv=save_to_mat_and_csv)
+    def __init__(self, gui, track, simulation_constants, *, file_name=None, sub_folder=None, save_to_mat_and_csv=True, number_of_planning_processes=None):
+        super().__init__(track, simulation_constants, file_name, sub_folder=sub_folder, save_to_mat_and_csv=save_to_mat_and_csv,
+                         number_of_planning_processes=number_of_planning_processes)
 
         self.main_timer = QtCore.QTimer()
         self.main_timer.setInterval(self.dt)
@@ -86,6 +87,9 @@ class SimMaster(AbstractSimMaster):
         self.gui.show_overlay(self.end_state)
         self._save_to_file()
 
+        if self.planning_pool is not None:
+            self.planning_pool.shutdown()
+
         if self._is_recording:
             self.gui.record_frame()
             self.gui.stop_recording()
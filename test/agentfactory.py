@@ -0,0 +1,81 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+from agents import CEIAgent
+from controllableobjects import PointMassObject
+from simulation.simulationconstants import SimulationConstants
+from trackobjects import SymmetricMergingTrack
+from trackobjects.trackside import TrackSide
+from .fakesimmaster import FakeSimMaster
+
+VELOCITY = 10.
+
+
+def get_agent(time_to_merge_point=3., ego_position=None, other_position=None, dt=50, sim_master=None, initialize_belief=True, **agent_kwargs):
+    """
+    Returns a CEIAgent for the vehicle on the left side of a symmetric merging track. The other vehicle is simulated by a FakeSimMaster and both vehicles
+    drive at 10 m/s. By default, the vehicles are placed such that they would arrive at the merge point simultaneously after time_to_merge_point seconds.
+
+    :param ego_position: the initial traveled distance of the ego vehicle, overrides the default placement
+    :param other_position: the initial traveled distance of the other vehicle, overrides the default placement
+    :param dt: the time step in ms
+    :param sim_master: an existing FakeSimMaster to use instead of a new one, other_position is ignored when it is given
+    :param initialize_belief: initialize the belief of the agent, otherwise this happens when the agent computes its first input
+    :param agent_kwargs: options of the agent, these are added to (or replace) the default parameters
+    """
+    simulation_constants = SimulationConstants(dt=dt,
+                                               vehicle_width=1.8,
+                                               vehicle_length=4.5,
+                                               track_start_point_distance=25.,
+                                               track_section_length=50.,
+                                               max_time=30e3)
+
+    track = SymmetricMergingTrack(simulation_constants)
+
+    merge_position = track._lower_bound_threshold - VELOCITY * time_to_merge_point
+    ego_position = merge_position if ego_position is None else ego_position
+
+    if sim_master is None:
+        sim_master = FakeSimMaster(x0=merge_position if other_position is None else other_position, v0=VELOCITY)
+
+    controllable_object = PointMassObject(track, initial_position=track.traveled_distance_to_coordinates(ego_position, track_side=TrackSide.LEFT),
+                                          initial_velocity=VELOCITY, use_discrete_inputs=False)
+
+    parameters = dict(risk_bounds=(0.15, 0.3), saturation_time=1., time_horizon=4., preferred_velocity=10., vehicle_width=simulation_constants.vehicle_width,
+                      vehicle_length=simulation_constants.vehicle_length, theta=1., belief_frequency=4)
+    parameters.update(agent_kwargs)
+
+    agent = CEIAgent(controllable_object, TrackSide.LEFT, simulation_constants.dt, sim_master, track, **parameters)
+
+    if initialize_belief:
+        agent._initialize_belief()
+
+    return agent
+
+
+def do_time_step(agent):
+    """
+    Moves both vehicles one time step forward and lets the agent compute its next input.
+    """
+    controllable_object = agent.controllable_object
+    sim_master = agent.sim_master
+
+    controllable_object.update_model(agent.dt / 1000.0)
+    sim_master.t += agent.dt
+    sim_master._other_position += sim_master._other_velocity * agent.dt / 1000.
+    controllable_object.set_continuous_acceleration(agent.compute_continuous_input(agent.dt / 1000.0))
@@ -0,0 +1,133 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import tempfile
+import unittest
+import warnings
+
+from agents import CEIAgent
+from controllableobjects import PointMassObject
+from simulation.offlinesimmaster import OfflineSimMaster
+from simulation.simulationconstants import SimulationConstants
+from trackobjects import StraightTrack
+from trackobjects.trackside import TrackSide
+from .agentfactory import get_agent, do_time_step
+from .fakesimmaster import FakeSimMaster
+
+
+class TestAdaptiveHorizon(unittest.TestCase):
+    @staticmethod
+    def _get_agent(ego_position, other_position, number_of_plan_knots=None):
+        agent = get_agent(ego_position=ego_position, other_position=other_position, initialize_belief=False, number_of_plan_knots=number_of_plan_knots,
+                          minimum_time_horizon=2.)
+
+        # the horizon is adapted from the second tick on, after the belief is initialized
+        agent.controllable_object.set_continuous_acceleration(agent.compute_continuous_input(agent.dt / 1000.0))
+        do_time_step(agent)
+
+        return agent
+
+    def _assert_consistent_sizes(self, agent, time_horizon):
+        number_of_steps = int((1000 / agent.dt) * time_horizon)
+
+        self.assertEqual(agent.current_time_horizon, time_horizon)
+        self.assertEqual(len(agent.action_plan), number_of_steps)
+        self.assertEqual(len(agent.velocity_plan), number_of_steps)
+        self.assertEqual(len(agent.position_plan), number_of_steps)
+        self.assertEqual(len(agent.action_bounds.lb), number_of_steps)
+        self.assertEqual(len(agent.belief), int(agent.belief_frequency * time_horizon) + 1)
+        self.assertEqual(len(agent.belief_time_stamps), len(agent.belief))
+
+    def test_full_horizon_before_merge(self):
+        agent = self._get_agent(ego_position=20., other_position=20.)
+        self._assert_consistent_sizes(agent, 4.)
+
+    def test_full_horizon_when_following(self):
+        # both vehicles are on the merged section and the ego vehicle can reach the other vehicle within the full horizon
+        agent = self._get_agent(ego_position=60., other_position=75.)
+        self._assert_consistent_sizes(agent, 4.)
+
+    def test_shrink_after_merge(self):
+        # both vehicles are on the merged section with the other vehicle so far ahead that the ego vehicle can not reach it within the full horizon
+        agent = self._get_agent(ego_position=60., other_position=110.)
+        self._assert_consistent_sizes(agent, 2.)
+
+        result = agent._solve_plan()
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.x), len(agent.action_plan))
+
+    def test_grow_back(self):
+        agent = self._get_agent(ego_position=60., other_position=110., number_of_plan_knots=8)
+        self._assert_consistent_sizes(agent, 2.)
+        self.assertEqual(agent.plan_basis.shape, (len(agent.action_plan), 8))
+
+        last_time_stamp = agent.belief_time_stamps[-1]
+        agent._set_time_horizon(4.)
+
+        self._assert_consistent_sizes(agent, 4.)
+        self.assertEqual(agent.plan_basis.shape, (len(agent.action_plan), 8))
+        self.assertAlmostEqual(agent.belief_time_stamps[int(agent.belief_frequency * 2.)], last_time_stamp)
+
+        # the plan is extended with the actions that hold the velocity at the end of the plan
+        self.assertAlmostEqual(agent.velocity_plan[-1], agent.velocity_plan[int((1000 / agent.dt) * 2.) - 1], places=6)
+
+    def test_reset(self):
+        agent = self._get_agent(ego_position=60., other_position=110., number_of_plan_knots=8)
+        agent.reset()
+
+        self.assertEqual(agent.current_time_horizon, 4.)
+        self.assertEqual(len(agent.action_plan), 80)
+        self.assertEqual(len(agent.belief), 17)
+        self.assertEqual(agent.plan_basis.shape, (80, 8))
+
+    def test_follow_slower_vehicle_on_straight_track(self):
+        # the follower drives at 8 m/s, 12.5 m behind a vehicle that drives at 7.2 m/s. The follower can reach the leader within the full horizon, so it
+        # keeps planning over the full horizon. Over the minimum horizon of 2 s, it would only notice the risk of a collision when it is too late to brake.
+        simulation_constants = SimulationConstants(dt=50, vehicle_width=1.8, vehicle_length=4.5, track_start_point_distance=25., track_section_length=50.,
+                                                   max_time=20e3)
+        track = StraightTrack(simulation_constants)
+
+        working_directory = os.getcwd()
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            # the sim master saves the results to the data folder in the working directory
+            os.chdir(temporary_directory)
+            try:
+                sim_master = OfflineSimMaster(track, simulation_constants, 'following', save_to_mat_and_csv=False, verbose=False)
+
+                for side, initial_position, velocity in [(TrackSide.LEFT, 0., 8.), (TrackSide.RIGHT, 12.5, 7.2)]:
+                    point_mass_object = PointMassObject(track, initial_position=track.traveled_distance_to_coordinates(initial_position),
+                                                        initial_velocity=velocity, cruise_control_velocity=velocity, use_discrete_inputs=False,
+                                                        resistance_coefficient=0.0005, constant_resistance=0.1)
+                    agent = CEIAgent(point_mass_object, side, simulation_constants.dt, sim_master, track, risk_bounds=(.2, .5), saturation_time=2.,
+                                     time_horizon=4., preferred_velocity=velocity, vehicle_width=simulation_constants.vehicle_width, belief_frequency=4,
+                                     vehicle_length=simulation_constants.vehicle_length, theta=1., minimum_time_horizon=2.)
+                    sim_master.add_vehicle(side, point_mass_object, agent)
+
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    sim_master.start()
+            finally:
+                os.chdir(working_directory)
+
+        self.assertEqual(sim_master.end_state, 'Finished')
+
+    def test_invalid_minimum_time_horizon(self):
+        with self.assertRaises(ValueError):
+            CEIAgent(None, TrackSide.LEFT, 50, FakeSimMaster(), None, risk_bounds=(0.15, 0.3), saturation_time=1., time_horizon=4., preferred_velocity=10.,
+                     vehicle_width=1.8, vehicle_length=4.5, theta=1., belief_frequency=4, minimum_time_horizon=5.)
@@ -0,0 +1,88 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from simulation.simulationconstants import SimulationConstants
+from trackobjects import SymmetricMergingTrack
+from .agentfactory import get_agent
+
+
+class TestBeliefPruning(unittest.TestCase):
+    def setUp(self):
+        self.simulation_constants = SimulationConstants(dt=50,
+                                                        vehicle_width=1.8,
+                                                        vehicle_length=4.5,
+                                                        track_start_point_distance=25.,
+                                                        track_section_length=50.,
+                                                        max_time=30e3)
+
+        self.track = SymmetricMergingTrack(self.simulation_constants)
+
+    def test_bounds_approximation_range(self):
+        for _ in range(100):
+            min_distance = random.uniform(0., 2 * self.simulation_constants.track_section_length)
+            max_distance = min_distance + random.uniform(0., 40.)
+
+            lower_bound, upper_bound = self.track.get_collision_bounds_approximation_range(min_distance, max_distance)
+
+            for traveled_distance in np.linspace(min_distance, max_distance, 50):
+                lb, ub = self.track.get_collision_bounds_approximation(traveled_distance)
+
+                if lb is None:
+                    continue
+
+                self.assertLessEqual(lower_bound, lb)
+                self.assertGreaterEqual(upper_bound, ub)
+
+    def test_pruned_constraint(self):
+        for initial_position in [0., 10., self.track._lower_bound_threshold - 30., self.track._lower_bound_threshold - 10.]:
+            agent = get_agent(ego_position=initial_position, other_position=self.track._lower_bound_threshold - 30.)
+
+            arguments = agent._get_constraint_arguments()
+            self.assertLess(len(arguments[-1]), len(agent.belief) - 1)
+
+            for _ in range(20):
+                plan = np.array([random.uniform(-1., 1.) for _ in range(len(agent.action_plan))])
+
+                self.assertAlmostEqual(agent._plan_constraint(plan, *arguments), agent._plan_constraint(plan, *arguments[:-1]), places=10)
+                self.assertTrue(np.allclose(agent._plan_constraint_jacobian(plan, *arguments), agent._plan_constraint_jacobian(plan, *arguments[:-1]),
+                                            atol=1e-10))
+
+    def test_relevant_belief_points_determined_once(self):
+        agent = get_agent(use_unconstrained_fast_path=True, max_sensitivity_step=.1)
+        agent._is_initialized = True
+        agent.did_plan_update_on_last_tick = -1
+
+        number_of_calls = []
+        get_risk_relevant_belief_indices = agent._get_risk_relevant_belief_indices
+
+        def counted_get_risk_relevant_belief_indices():
+            number_of_calls.append(1)
+            return get_risk_relevant_belief_indices()
+
+        agent._get_risk_relevant_belief_indices = counted_get_risk_relevant_belief_indices
+
+        # the fast path, the sensitivity update and the optimization all use the belief points that were determined at the start of the plan update
+        result = agent._solve_plan()
+
+        self.assertFalse(result.used_fast_path or result.used_sensitivity_update)
+        self.assertEqual(len(number_of_calls), 1)
@@ -0,0 +1,109 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+import numpy as np
+
+from .agentfactory import get_agent
+from .fakesimmaster import FakeSimMaster
+
+
+class TestBeliefUpdate(unittest.TestCase):
+    def setUp(self):
+        self.sim_master = FakeSimMaster(x0=10., v0=10.)
+        self.agent = self._create_agent()
+
+    def _create_agent(self, use_posterior_schedule=False):
+        return get_agent(ego_position=10., sim_master=self.sim_master, use_posterior_schedule=use_posterior_schedule)
+
+    def _advance(self, velocity):
+        self.sim_master.t += 250.
+        self.sim_master._other_velocity = velocity
+        self.sim_master._other_position += velocity * .25
+        self.agent._observe_communication()
+
+    def test_posterior_per_point(self):
+        self._advance(11.)
+        prior = self.agent.belief.copy()
+        time_stamps = self.agent.belief_time_stamps
+        other_position = self.sim_master._other_position
+
+        self.agent._update_belief(generate_new_point=True)
+
+        self.assertEqual(self.agent.belief.shape, prior.shape)
+        for belief_index in range(1, len(prior)):
+            time = time_stamps[belief_index] - self.sim_master.t / 1000.
+            posterior_mu, posterior_sigma = self.agent._calculate_posterior(prior[belief_index, 0] - other_position, prior[belief_index, 1],
+                                                                            time / 6, 11., time)
+
+            self.assertEqual(self.agent.belief[belief_index - 1, 0], posterior_mu + other_position)
+            self.assertEqual(self.agent.belief[belief_index - 1, 1], posterior_sigma)
+
+    def test_circular_time_stamps(self):
+        initial_time_stamps = self.agent.belief_time_stamps
+
+        for number_of_updates in range(1, 2 * len(initial_time_stamps)):
+            self._advance(10.)
+            self.agent._update_belief(generate_new_point=True)
+
+            expected_time_stamps = initial_time_stamps + number_of_updates * .25
+            self.assertTrue(np.allclose(self.agent.belief_time_stamps, expected_time_stamps))
+            self.assertEqual(self.agent._get_plan_index(0, self.sim_master.t / 1000.), 4)
+
+    def _get_expected_plan_indices(self):
+        current_time = self.sim_master.t / 1000.
+        return [int((time_stamp - current_time) / .05) - 1 for time_stamp in self.agent.belief_time_stamps]
+
+    def test_plan_index_map(self):
+        self.sim_master.t += 50.
+        current_time = self.sim_master.t / 1000.
+        plan_index_map = self.agent._get_plan_index_map(current_time)
+
+        self.assertIs(self.agent._get_plan_index_map(current_time), plan_index_map)
+        self.assertListEqual(plan_index_map.tolist(), self._get_expected_plan_indices())
+
+        # the map is computed again when the belief is shifted
+        self.sim_master.t += 200.
+        self.agent._observe_communication()
+        self.agent._update_belief(generate_new_point=True)
+
+        self.assertListEqual(self.agent._get_plan_index_map(self.sim_master.t / 1000.).tolist(), self._get_expected_plan_indices())
+
+    def test_posterior_schedule(self):
+        scheduled_agent = self._create_agent(use_posterior_schedule=True)
+        random_state = np.random.RandomState(0)
+
+        # after the lifetime of the initial belief points, all belief points follow the schedule
+        for _ in range(120):
+            self.sim_master.t += 50.
+            self.sim_master._other_velocity = 10. + random_state.uniform(-1., 1.)
+            self.sim_master._other_position += self.sim_master._other_velocity * .05
+
+            for agent in [self.agent, scheduled_agent]:
+                agent._observe_communication()
+                agent._update_belief(generate_new_point=self.sim_master.t % 250. == 0.)
+
+            self.assertTrue(np.allclose(scheduled_agent.belief, self.agent.belief, rtol=1e-8, atol=0.))
+
+        # the times until the time stamps on the next time step
+        times = scheduled_agent.belief_time_stamps - self.sim_master.t / 1000. - .05
+        _, _, follows_schedule = scheduled_agent._get_posterior_schedule().get_posterior(scheduled_agent.belief[:, 0], scheduled_agent.belief[:, 1],
+                                                                                         times, 10.)
+        self.assertTrue(follows_schedule.all())
+        self.assertIs(scheduled_agent._get_posterior_schedule(), self._create_agent(use_posterior_schedule=True)._get_posterior_schedule())
@@ -23,7 +23,7 @@ import numpy as np
 import tqdm
 
 from simulation.simulationconstants import SimulationConstants
-from trackobjects import SymmetricMergingTrack
+from trackobjects import SymmetricMergingTrack, StraightTrack
 
 
 class TestCollisionBoundaries(unittest.TestCase):
@@ -75,3 +75,26 @@ class TestCollisionBoundaries(unittest.TestCase):
 
         self.assertTrue(np.nanmax(errors[:, 0]) <= 0.50, 'maximum error on the lower collision bound should be smaller than 50 cm')
         self.assertTrue(np.nanmax(errors[:, 1]) <= 0.50, 'maximum error on the upper collision bound should be smaller than 50 cm')
+
+    def test_batch_bounds_approximation(self):
+        simulation_constants = SimulationConstants(dt=50,
+                                                   vehicle_width=1.8,
+                                                   vehicle_length=4.5,
+                                                   track_start_point_distance=25.,
+                                                   track_section_length=50.,
+                                                   max_time=30e3)
+
+        traveled_distances = np.linspace(0., 2 * simulation_constants.track_section_length, 1001)
+
+        for track in [SymmetricMergingTrack(simulation_constants), StraightTrack(simulation_constants)]:
+            lower_bounds, upper_bounds, collision_possible = track.get_collision_bounds_approximation_batch(traveled_distances)
+
+            for index, traveled_distance in enumerate(traveled_distances):
+                lower_bound, upper_bound = track.get_collision_bounds_approximation(traveled_distance)
+
+                self.assertEqual(collision_possible[index], lower_bound is not None)
+                if collision_possible[index]:
+                    self.assertEqual(lower_bounds[index], lower_bound)
+                    self.assertEqual(upper_bounds[index], upper_bound)
+                else:
+                    self.assertTrue(np.isnan(lower_bounds[index]) and np.isnan(upper_bounds[index]))
@@ -19,9 +19,10 @@ along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>
 import random
 import unittest
 
+import numpy as np
 from scipy import optimize
 
-from agents import CEIAgent
+from agents import CEIAgent, GaussNewtonBackend
 from controllableobjects import PointMassObject
 from simulation.simulationconstants import SimulationConstants
 from trackobjects import SymmetricMergingTrack
@@ -67,3 +68,154 @@ class test_CEI_jacobian(unittest.TestCase):
                                                     controllable_object.constant_resistance)
             self.assertTrue(abs(grad_check_result) < 10e-05, 'difference between the Jacobian and the estimated gradient should be smaller then 10e-5, it is '
                                                              'currently %f' % abs(grad_check_result))
+
+    def test_constraint_jacobian(self):
+        section_length = random.uniform(10.0, 100.)
+        start_point_distance = random.uniform(0.3 * section_length, 0.8 * section_length)
+
+        vehicle_length = random.uniform(3., 8.)
+        vehicle_width = random.uniform(vehicle_length / 2., vehicle_length)
+
+        simulation_constants = SimulationConstants(dt=50,
+                                                   vehicle_width=vehicle_width,
+                                                   vehicle_length=vehicle_length,
+                                                   track_start_point_distance=start_point_distance,
+                                                   track_section_length=section_length,
+                                                   max_time=30e3)
+
+        track = SymmetricMergingTrack(simulation_constants)
+
+        # place the ego vehicle and the other vehicle such that they would arrive at the merge point simultaneously
+        velocity = 10.
+        initial_position = track._lower_bound_threshold - velocity * 3.0
+        sim_master = FakeSimMaster(x0=initial_position, v0=velocity)
+
+        controllable_object = PointMassObject(track, use_discrete_inputs=False)
+
+        agent = CEIAgent(controllable_object, TrackSide.LEFT, simulation_constants.dt, sim_master, track, risk_bounds=(0.15, 0.3), saturation_time=1.,
+                         time_horizon=4.,
+                         preferred_velocity=10.,
+                         vehicle_width=vehicle_width, vehicle_length=vehicle_length,
+                         theta=1., belief_frequency=4)
+        agent._initialize_belief()
+
+        for _ in range(20):
+            plan = np.array([random.uniform(-.5, .5) for _ in range(len(agent.action_plan))])
+
+            grad_check_result = optimize.check_grad(agent._plan_constraint, agent._plan_constraint_jacobian,
+                                                    plan,
+                                                    initial_position,
+                                                    velocity,
+                                                    controllable_object.resistance_coefficient,
+                                                    controllable_object.constant_resistance)
+            self.assertTrue(abs(grad_check_result) < 10e-05, 'difference between the Jacobian and the estimated gradient should be smaller then 10e-5, it is '
+                                                             'currently %f' % abs(grad_check_result))
+
+    def test_adjoint_cost_jacobian(self):
+        section_length = random.uniform(10.0, 100.)
+        start_point_distance = random.uniform(0.3 * section_length, 0.8 * section_length)
+
+        vehicle_length = random.uniform(3., 8.)
+        vehicle_width = random.uniform(vehicle_length / 2., vehicle_length)
+
+        simulation_constants = SimulationConstants(dt=50,
+                                                   vehicle_width=vehicle_width,
+                                                   vehicle_length=vehicle_length,
+                                                   track_start_point_distance=start_point_distance,
+                                                   track_section_length=section_length,
+                                                   max_time=30e3)
+
+        track = SymmetricMergingTrack(simulation_constants)
+        controllable_object = PointMassObject(track, use_discrete_inputs=False)
+
+        agent = CEIAgent(controllable_object, TrackSide.LEFT, simulation_constants.dt, FakeSimMaster(), track, risk_bounds=(0.15, 0.3), saturation_time=1.,
+                         time_horizon=4.,
+                         preferred_velocity=10.,
+                         vehicle_width=vehicle_width, vehicle_length=vehicle_length,
+                         theta=1., belief_frequency=4)
+        reference_agent = CEIAgent(controllable_object, TrackSide.LEFT, simulation_constants.dt, FakeSimMaster(), track, risk_bounds=(0.15, 0.3),
+                                   saturation_time=1.,
+                                   time_horizon=4.,
+                                   preferred_velocity=10.,
+                                   vehicle_width=vehicle_width, vehicle_length=vehicle_length,
+                                   theta=1., belief_frequency=4, use_autograd_cost_jacobian=True)
+
+        for _ in range(20):
+            # low initial velocities in combination with braking make sure the zero velocity clamp is also tested
+            initial_velocity = random.uniform(0., 15.)
+            plan = np.array([random.uniform(-1., 1.) for _ in range(len(agent.action_plan))])
+
+            jacobian = agent.cost_jacobian(plan, initial_velocity, controllable_object.resistance_coefficient, controllable_object.constant_resistance)
+            reference_jacobian = reference_agent.cost_jacobian(plan, initial_velocity, controllable_object.resistance_coefficient,
+                                                               controllable_object.constant_resistance)
+
+            # the adjoint sweep rounds like the reverse pass of autograd, so the optimizer behaves the same with both Jacobians
+            self.assertTrue(np.array_equal(jacobian, reference_jacobian), 'the adjoint Jacobian should be identical to the autograd Jacobian')
+
+    def test_vector_constraint_jacobian(self):
+        simulation_constants = SimulationConstants(dt=50,
+                                                   vehicle_width=1.8,
+                                                   vehicle_length=4.5,
+                                                   track_start_point_distance=25.,
+                                                   track_section_length=50.,
+                                                   max_time=30e3)
+
+        track = SymmetricMergingTrack(simulation_constants)
+
+        # place the ego vehicle and the other vehicle such that they would arrive at the merge point simultaneously
+        velocity = 10.
+        initial_position = track._lower_bound_threshold - velocity * 3.0
+        sim_master = FakeSimMaster(x0=initial_position, v0=velocity)
+
+        controllable_object = PointMassObject(track, use_discrete_inputs=False)
+
+        agent = CEIAgent(controllable_object, TrackSide.LEFT, simulation_constants.dt, sim_master, track, risk_bounds=(0.15, 0.3), saturation_time=1.,
+                         time_horizon=4.,
+                         preferred_velocity=10.,
+                         vehicle_width=simulation_constants.vehicle_width, vehicle_length=simulation_constants.vehicle_length,
+                         theta=1., belief_frequency=4, planner_backend=GaussNewtonBackend(), use_vector_risk_constraint=True)
+        agent._initialize_belief()
+
+        arguments = (initial_position, velocity, controllable_object.resistance_coefficient, controllable_object.constant_resistance)
+
+        for _ in range(20):
+            plan = np.array([random.uniform(-.5, .5) for _ in range(len(agent.action_plan))])
+
+            constraints = agent._plan_constraints(plan, *arguments)
+            self.assertAlmostEqual(np.min(constraints), agent._plan_constraint(plan, *arguments), places=12)
+
+            jacobian = agent._plan_constraints_jacobian(plan, *arguments)
+            estimated_jacobian = optimize.approx_fprime(plan, agent._plan_constraints, 1.4901161193847656e-08, *arguments)
+            self.assertTrue(np.max(np.abs(jacobian - estimated_jacobian)) < 10e-05, 'difference between the Jacobian and the estimated Jacobian should be '
+                                                                                     'smaller then 10e-5')
+
+    def test_cost_residuals_jacobian(self):
+        simulation_constants = SimulationConstants(dt=50,
+                                                   vehicle_width=1.8,
+                                                   vehicle_length=4.5,
+                                                   track_start_point_distance=25.,
+                                                   track_section_length=50.,
+                                                   max_time=30e3)
+
+        track = SymmetricMergingTrack(simulation_constants)
+        sim_master = FakeSimMaster()
+        controllable_object = PointMassObject(track, use_discrete_inputs=False)
+
+        agent = CEIAgent(controllable_object, TrackSide.LEFT, simulation_constants.dt, sim_master, track, risk_bounds=(0.15, 0.3), saturation_time=1.,
+                         time_horizon=4.,
+                         preferred_velocity=10.,
+                         vehicle_width=simulation_constants.vehicle_width, vehicle_length=simulation_constants.vehicle_length,
+                         theta=2., belief_frequency=4)
+
+        arguments = (8., controllable_object.resistance_coefficient, controllable_object.constant_resistance)
+
+        for _ in range(20):
+            plan = np.array([random.uniform(-1., 1.) for _ in range(len(agent.action_plan))])
+
+            # the cost is the sum of the squared residuals
+            self.assertAlmostEqual(np.sum(agent._cost_residuals(plan, *arguments) ** 2), agent._cost_function(plan, *arguments), places=8)
+
+            jacobian = agent._cost_residuals_jacobian(plan, *arguments)
+            estimated_jacobian = optimize.approx_fprime(plan, agent._cost_residuals, 1.4901161193847656e-08, *arguments)
+            self.assertTrue(np.max(np.abs(jacobian - estimated_jacobian)) < 10e-05, 'difference between the Jacobian and the estimated Jacobian should be '
+                                                                                     'smaller then 10e-5')
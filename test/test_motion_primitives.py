@@ -0,0 +1,70 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+import numpy as np
+
+from .agentfactory import get_agent
+
+
+class TestMotionPrimitives(unittest.TestCase):
+    def test_hold_velocity(self):
+        agent = get_agent()
+        plans, hold_masks = agent._motion_primitive_library
+        primitives = agent._get_motion_primitives()
+
+        self.assertEqual(primitives.shape, plans.shape)
+        self.assertTrue(np.all(primitives >= agent.action_bounds.lb) and np.all(primitives <= agent.action_bounds.ub))
+
+        # the velocity is constant during the hold phase of every primitive
+        controllable_object = agent.controllable_object
+        _, velocities = controllable_object.calculate_trajectory_1d(agent.dt / 1000., 0., controllable_object.velocity,
+                                                                     primitives * controllable_object.max_acceleration,
+                                                                     controllable_object.resistance_coefficient, controllable_object.constant_resistance)
+        for primitive_velocities, hold_mask in zip(velocities, hold_masks):
+            held_velocities = primitive_velocities[hold_mask]
+            if len(held_velocities) and held_velocities[0] > 0.:
+                self.assertTrue(np.allclose(held_velocities, held_velocities[0]))
+
+    def test_zero_plan(self):
+        agent = get_agent()
+        plans, hold_masks = agent._motion_primitive_library
+
+        # the all-zero action plan is one of the constant levels
+        is_zero_plan = np.all(plans == 0., axis=1) & ~np.any(hold_masks, axis=1)
+        self.assertEqual(np.sum(is_zero_plan), 1)
+        self.assertTrue(np.array_equal(agent._get_motion_primitives()[is_zero_plan][0], np.zeros(len(agent.action_plan))))
+
+    def test_initial_condition(self):
+        agent = get_agent(use_motion_primitives=True)
+        initial_condition = agent._do_rough_grid_search_for_initial_condition()
+
+        costs, constraints = agent.evaluate_plans(np.concatenate([agent._get_motion_primitives(), [agent.action_plan]]))
+        self.assertTrue(np.any(constraints >= 0.))
+        self.assertGreaterEqual(agent._plan_constraint(initial_condition, *agent._get_constraint_arguments()), 0.)
+        self.assertAlmostEqual(agent._cost_function(initial_condition, *agent._get_cost_arguments()), np.min(costs[constraints >= 0.]))
+
+    def test_default_candidates(self):
+        # without the motion primitives, the candidates are constant actions of -1, 0 and 1 and the current plan
+        agent = get_agent()
+        agent.action_plan = np.linspace(-.5, .5, len(agent.action_plan))
+        candidates = agent._get_initial_condition_candidates()
+
+        self.assertTrue(np.array_equal(candidates, [[-1.] * len(agent.action_plan), [0.] * len(agent.action_plan), [1.] * len(agent.action_plan),
+                                                    agent.action_plan]))
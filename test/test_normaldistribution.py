@@ -0,0 +1,45 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+import autograd.numpy as np
+from autograd.scipy import stats
+
+from agents.normaldistribution import normal_interval_probability, normal_pdf
+
+
+class TestNormalDistribution(unittest.TestCase):
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.mu = random_state.uniform(-5., 5., 20)
+        self.sigma = random_state.uniform(.1, 3., 20)
+        self.lower_bounds = self.mu + random_state.uniform(-6., 1., 20)
+        self.upper_bounds = self.lower_bounds + random_state.uniform(0., 5., 20)
+
+    def test_values(self):
+        reference = stats.norm.cdf(self.upper_bounds, self.mu, self.sigma) - stats.norm.cdf(self.lower_bounds, self.mu, self.sigma)
+        self.assertTrue(np.array_equal(normal_interval_probability(self.mu, self.sigma, self.lower_bounds, self.upper_bounds), reference))
+        self.assertTrue(np.array_equal(normal_pdf(self.upper_bounds, self.mu, self.sigma), stats.norm.pdf(self.upper_bounds, self.mu, self.sigma)))
+
+        # one-sided intervals
+        self.assertTrue(np.array_equal(normal_interval_probability(self.mu, self.sigma, -np.inf, self.upper_bounds),
+                                       stats.norm.cdf(self.upper_bounds, self.mu, self.sigma)))
+        self.assertTrue(np.array_equal(normal_interval_probability(self.mu, self.sigma, self.lower_bounds, np.inf),
+                                       1 - stats.norm.cdf(self.lower_bounds, self.mu, self.sigma)))
+
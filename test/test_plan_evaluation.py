@@ -0,0 +1,42 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from .agentfactory import get_agent
+
+
+class TestPlanEvaluation(unittest.TestCase):
+    def test_batch_evaluation(self):
+        agent = get_agent()
+        controllable_object = agent.controllable_object
+
+        plans = np.array([[random.uniform(-1., 1.) for _ in range(len(agent.action_plan))] for _ in range(50)])
+        costs, constraints = agent.evaluate_plans(plans)
+
+        for plan, cost, constraint in zip(plans, costs, constraints):
+            expected_cost = agent._cost_function(plan, controllable_object.velocity, controllable_object.resistance_coefficient,
+                                                 controllable_object.constant_resistance)
+            expected_constraint = agent._plan_constraint(plan, controllable_object.traveled_distance, controllable_object.velocity,
+                                                         controllable_object.resistance_coefficient, controllable_object.constant_resistance)
+
+            self.assertAlmostEqual(cost, expected_cost, places=8)
+            self.assertAlmostEqual(constraint, expected_constraint, places=8)
@@ -0,0 +1,63 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+import unittest
+
+import numpy as np
+from scipy import optimize
+
+from agents import CEIAgent
+from .agentfactory import get_agent
+
+
+class TestPlanKnots(unittest.TestCase):
+    def test_basis(self):
+        basis = CEIAgent._get_piecewise_linear_basis(80, 9)
+        knots = np.array([random.uniform(-1., 1.) for _ in range(9)])
+        plan = basis @ knots
+
+        self.assertEqual(basis.shape, (80, 9))
+        self.assertTrue(np.allclose(np.sum(basis, axis=1), 1.))
+        self.assertAlmostEqual(plan[0], knots[0])
+        self.assertAlmostEqual(plan[-1], knots[-1])
+        self.assertTrue(np.all(plan >= np.min(knots) - 1e-12) and np.all(plan <= np.max(knots) + 1e-12))
+
+    def test_knot_jacobians(self):
+        agent = get_agent(number_of_plan_knots=9)
+
+        for _ in range(20):
+            knots = np.array([random.uniform(-.5, .5) for _ in range(9)])
+
+            cost_check_result = optimize.check_grad(agent._knot_cost_function, agent._knot_cost_function_jacobian, knots, *agent._get_cost_arguments())
+            constraint_check_result = optimize.check_grad(agent._knot_plan_constraint, agent._knot_plan_constraint_jacobian, knots,
+                                                          *agent._get_constraint_arguments())
+
+            # the cost is large compared to the constraint, so its finite difference error is compared to the size of the gradient
+            cost_gradient_norm = np.linalg.norm(agent._knot_cost_function_jacobian(knots, *agent._get_cost_arguments()))
+            self.assertLess(abs(cost_check_result) / cost_gradient_norm, 10e-07)
+            self.assertLess(abs(constraint_check_result), 10e-05)
+
+    def test_knot_plan_is_feasible(self):
+        agent = get_agent(dt=10, number_of_plan_knots=9)
+        agent._update_plan()
+
+        self.assertEqual(len(agent.action_plan), 400)
+        self.assertTrue(np.allclose(agent.action_plan, agent.plan_basis @ agent._get_knots(agent.action_plan)))
+        self.assertGreaterEqual(agent._plan_constraint(agent.action_plan, *agent._get_constraint_arguments()), -1e-6)
+        self.assertEqual(len(agent.position_plan), 400)
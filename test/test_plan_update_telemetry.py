@@ -0,0 +1,51 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+from .agentfactory import get_agent, do_time_step
+
+
+class TestPlanUpdateTelemetry(unittest.TestCase):
+    def test_telemetry(self):
+        agent = get_agent(initialize_belief=False, use_analytic_risk_jacobian=True)
+        agent.controllable_object.set_continuous_acceleration(agent.compute_continuous_input(agent.dt / 1000.0))
+        telemetry = agent.plan_update_telemetry
+
+        self.assertEqual(telemetry['trigger'], 'initial')
+        self.assertEqual(telemetry['t'], 0.)
+        self.assertGreater(telemetry['wall_time'], 0.)
+        self.assertGreater(telemetry['iterations'], 0)
+        self.assertGreaterEqual(telemetry['function_evaluations'], telemetry['iterations'])
+        self.assertGreater(telemetry['constraint_evaluations'], 0)
+        self.assertGreater(telemetry['constraint_jacobian_evaluations'], 0)
+        self.assertFalse(telemetry['cache_hit'])
+
+        number_of_plan_updates = 0
+        for _ in range(100):
+            do_time_step(agent)
+
+            if agent.did_plan_update_on_last_tick:
+                number_of_plan_updates += 1
+                expected_trigger = 'upper risk bound' if agent.did_plan_update_on_last_tick == 1 else 'lower risk bound'
+                self.assertEqual(agent.plan_update_telemetry['trigger'], expected_trigger)
+                self.assertEqual(agent.plan_update_telemetry['t'], agent.sim_master.t / 1000.)
+            else:
+                self.assertIsNone(agent.plan_update_telemetry)
+
+        self.assertGreater(number_of_plan_updates, 0)
@@ -0,0 +1,76 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from agents import PlanCache
+
+
+def _fill_cache(cache, worker_index):
+    for index in range(20):
+        key = cache.get_key(worker_index, index)
+        cache.put(key, np.array([float(worker_index), float(index)]), True)
+
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self._folder.name, 'plan_cache.sqlite')
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_store_and_retrieve(self):
+        cache = PlanCache(self.file_name)
+        plan = np.linspace(-1., 1., 80)
+        key = cache.get_key(plan, 10., (0.2, 0.5))
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, plan, False)
+
+        # the cache is persistent, so a new object using the same file should find the plan
+        stored_plan, success = PlanCache(self.file_name).get(key)
+        self.assertTrue(np.array_equal(stored_plan, plan))
+        self.assertFalse(success)
+
+        self.assertNotEqual(key, cache.get_key(plan, 10.000001, (0.2, 0.5)))
+
+    def test_eviction(self):
+        cache = PlanCache(self.file_name, max_number_of_entries=5)
+
+        for index in range(10):
+            cache.put(cache.get_key(index), np.array([float(index)]), True)
+
+        self.assertEqual(len(cache), 5)
+        self.assertIsNone(cache.get(cache.get_key(0)))
+        self.assertIsNotNone(cache.get(cache.get_key(9)))
+
+    def test_multiprocessing(self):
+        cache = PlanCache(self.file_name)
+
+        with multiprocessing.Pool(4) as pool:
+            pool.starmap(_fill_cache, [(cache, worker_index) for worker_index in range(4)])
+
+        self.assertEqual(len(cache), 80)
+        stored_plan, _ = cache.get(cache.get_key(3, 7))
+        self.assertTrue(np.array_equal(stored_plan, np.array([3., 7.])))
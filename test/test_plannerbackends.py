@@ -0,0 +1,183 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+import numpy as np
+from scipy import linalg
+
+from agents import SLSQPBackend, TrustConstrBackend, AugmentedLagrangianBackend, GaussNewtonBackend, QuasiNewtonSQPBackend, WarmStart, PlanningProblem
+from agents.plannerbackends import _get_constraint_jacobian, _solve_quadratic_program
+from .agentfactory import get_agent
+from .fakesimmaster import FakeSimMaster
+
+
+class TestPlannerBackends(unittest.TestCase):
+    @staticmethod
+    def _get_planning_problem(use_vector_risk_constraint=False):
+        # the vector risk constraint is only supported by the Gauss-Newton backend
+        planner_backend = GaussNewtonBackend() if use_vector_risk_constraint else None
+        return PlanningProblem(get_agent(use_analytic_risk_jacobian=True, planner_backend=planner_backend,
+                                         use_vector_risk_constraint=use_vector_risk_constraint))
+
+    def test_backends_find_feasible_plan(self):
+        problem = self._get_planning_problem()
+        agent = problem.agent
+        self.assertLess(problem.constraint(problem.initial_plan), 0.)
+
+        for planner_backend in [SLSQPBackend(), TrustConstrBackend(), AugmentedLagrangianBackend(), QuasiNewtonSQPBackend()]:
+            result = problem.solve(planner_backend)
+
+            self.assertTrue(result.success, msg=planner_backend.name)
+            self.assertGreaterEqual(problem.constraint(result.x), -1e-6, msg=planner_backend.name)
+            self.assertTrue(all(agent.action_bounds.lb - 1e-8 <= result.x) and all(result.x <= agent.action_bounds.ub + 1e-8), msg=planner_backend.name)
+
+    def test_finite_difference_constraint_jacobian(self):
+        agent = get_agent()
+        problem = PlanningProblem(agent)
+        constraint_arguments = agent._get_constraint_arguments()
+
+        analytic_jacobian = agent._plan_constraint_jacobian(problem.initial_plan, *constraint_arguments)
+        estimated_jacobian = _get_constraint_jacobian({'type': 'ineq', 'fun': agent._plan_constraint})(problem.initial_plan, *constraint_arguments)
+
+        self.assertTrue(np.allclose(estimated_jacobian, analytic_jacobian, atol=1e-5))
+
+    def test_gauss_newton_backend(self):
+        # the Gauss-Newton sub-problems only see the linearized constraints, so it is used with one risk constraint per belief point
+        problem = self._get_planning_problem(use_vector_risk_constraint=True)
+        agent = problem.agent
+
+        result = problem.solve()
+
+        # SLSQP is compared on the same problem with the scalar risk constraint
+        reference_problem = self._get_planning_problem()
+        reference_result = reference_problem.solve(SLSQPBackend())
+
+        self.assertTrue(result.success)
+        self.assertGreaterEqual(problem.constraint(result.x), -1e-6)
+        self.assertTrue(all(agent.action_bounds.lb - 1e-8 <= result.x) and all(result.x <= agent.action_bounds.ub + 1e-8))
+        self.assertLess(result.nit, reference_result.nit)
+        self.assertAlmostEqual(problem.cost(result.x), problem.cost(reference_result.x), delta=1e-3 * problem.cost(reference_result.x))
+
+    def test_gauss_newton_falls_back_to_slsqp(self):
+        # a plan update recorded in scenario D (the left vehicle, 1.5 s into the scenario, rounded), on which the line search of the Gauss-Newton method
+        # fails close to the optimum
+        sim_master = FakeSimMaster()
+        sim_master.t = 1500.
+        agent = get_agent(sim_master=sim_master, risk_bounds=(.3, .4), saturation_time=2., use_analytic_risk_jacobian=True)
+        agent.controllable_object.resistance_coefficient = .0005
+        agent.controllable_object.constant_resistance = .1
+        agent.controllable_object.traveled_distance = 14.585
+        agent.controllable_object.velocity = 8.842
+
+        means = np.concatenate([17.5 + 2.5 * np.arange(10), [42.39, 43.529, 45.332, 47.536, 49.806, 52.098, 54.331]])
+        standard_deviations = np.concatenate([np.full(11, 1e-3), [.349, 1.732, 2.994, 4.405, 6.07, 7.526]])
+        agent.belief = np.stack([means, standard_deviations], axis=1)
+        agent.belief_time_stamps = 1.75 + .25 * np.arange(17)
+
+        problem = PlanningProblem(agent, np.zeros(len(agent.action_plan)))
+
+        gauss_newton_result = problem.solve(GaussNewtonBackend(use_slsqp_fallback=False))
+        result = problem.solve(GaussNewtonBackend())
+        reference_result = problem.solve(SLSQPBackend())
+
+        self.assertFalse(gauss_newton_result.success)
+        self.assertTrue(result.success)
+        self.assertGreaterEqual(problem.constraint(result.x), -1e-6)
+        self.assertTrue(np.array_equal(result.x, reference_result.x))
+        self.assertEqual(result.nit, gauss_newton_result.nit + reference_result.nit)
+
+    def test_quadratic_program_with_indefinite_hessian(self):
+        # no regularization makes the normal matrix of a concave problem positive definite, this used to loop forever
+        with self.assertRaises(linalg.LinAlgError):
+            _solve_quadratic_program(-10. * np.eye(2), np.ones(2), np.eye(2), np.zeros(2))
+
+    def test_vector_risk_constraint_needs_gauss_newton(self):
+        for planner_backend in [None, SLSQPBackend(), TrustConstrBackend(), AugmentedLagrangianBackend(), QuasiNewtonSQPBackend()]:
+            with self.assertRaises(ValueError):
+                get_agent(planner_backend=planner_backend, use_vector_risk_constraint=True)
+
+    def test_warm_started_sqp_backend(self):
+        problem = self._get_planning_problem()
+        warm_start = problem.agent._planner_warm_start
+        self.assertTrue(warm_start.is_empty)
+
+        result = problem.solve(QuasiNewtonSQPBackend())
+        reference_result = problem.solve(SLSQPBackend())
+
+        self.assertTrue(result.success)
+        self.assertFalse(warm_start.is_empty)
+
+        # the multiplier of the risk constraint belongs to the belief point with the highest collision probability
+        self.assertEqual(len(warm_start.multiplier_plan_indices), 1)
+        self.assertTrue(0 <= warm_start.multiplier_plan_indices[0] < len(result.x))
+        self.assertAlmostEqual(problem.cost(result.x), problem.cost(reference_result.x), delta=1e-3 * problem.cost(reference_result.x))
+
+        # the warm start holds the curvature, the multipliers and the active set at the solution, so solving again from there takes at most one iteration
+        problem.initial_plan = result.x
+        warm_started_result = problem.solve(QuasiNewtonSQPBackend())
+
+        self.assertTrue(warm_started_result.success)
+        self.assertLessEqual(warm_started_result.nit, 1)
+
+    def test_shift_warm_start(self):
+        warm_start = WarmStart()
+        warm_start.hessian = np.diag(np.arange(1., 6.))
+        warm_start.hessian[2, 3] = warm_start.hessian[3, 2] = .5
+        warm_start.multipliers = np.array([2., 3.])
+        warm_start.multiplier_plan_indices = np.array([1, 3])
+        warm_start.active_lower_bounds = np.array([True, False, True, False, False])
+        warm_start.active_upper_bounds = np.array([False, True, False, False, True])
+
+        warm_start.shift(2)
+
+        # the remaining steps keep their curvature, the new steps get the mean curvature of the remaining steps
+        expected_hessian = np.diag([3., 4., 5., 4., 4.])
+        expected_hessian[0, 1] = expected_hessian[1, 0] = .5
+
+        self.assertTrue(np.array_equal(warm_start.hessian, expected_hessian))
+        self.assertTrue(np.array_equal(warm_start.multipliers, [3., 0.]))
+        self.assertTrue(np.array_equal(warm_start.multiplier_plan_indices, [1, 4]))
+        self.assertTrue(np.array_equal(warm_start.active_lower_bounds, [True, False, False, False, False]))
+        self.assertTrue(np.array_equal(warm_start.active_upper_bounds, [False, False, True, False, False]))
+
+        # multipliers without a plan index are kept
+        warm_start.multiplier_plan_indices = None
+        warm_start.shift(1)
+
+        self.assertTrue(np.array_equal(warm_start.multipliers, [3., 0.]))
+
+    def test_stop_slsqp_from_callback(self):
+        def rosenbrock(x):
+            return 100. * (x[1] - x[0] ** 2) ** 2 + (1. - x[0]) ** 2
+
+        iterates = []
+
+        def callback(intermediate_result):
+            iterates.append(intermediate_result.x.copy())
+            if len(iterates) == 3:
+                raise StopIteration
+
+        constraint = {'type': 'ineq', 'fun': lambda x: 2. - x[0] - x[1]}
+        result = SLSQPBackend().minimize(rosenbrock, np.array([-1.2, 1.]), constraints=constraint, callback=callback)
+
+        # the optimization stops after the third iteration and returns the last iterate
+        self.assertEqual(len(iterates), 3)
+        self.assertFalse(result.success)
+        self.assertTrue(np.array_equal(result.x, iterates[-1]))
+        self.assertAlmostEqual(result.fun, rosenbrock(iterates[-1]))
@@ -0,0 +1,62 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+import numpy as np
+
+from .agentfactory import get_agent
+
+
+class TestPlanningDeadline(unittest.TestCase):
+    def test_fallback_to_current_plan(self):
+        # the current plan (constant velocity) is not feasible, so when the budget runs out before a feasible plan is found, the current plan is kept
+        agent = get_agent(planning_deadline=0.)
+        initial_plan = agent.action_plan.copy()
+
+        result = agent._solve_plan()
+
+        self.assertTrue(result.deadline_exceeded)
+        self.assertEqual(agent.planning_deadline_overruns, 1)
+        if result.success:
+            self.assertGreaterEqual(agent._plan_constraint(result.x, *agent._get_constraint_arguments()), 0.)
+        else:
+            self.assertTrue(np.array_equal(result.x, initial_plan))
+
+    def test_best_feasible_plan(self):
+        # start from a feasible plan, the best feasible plan found so far is used when the budget runs out
+        agent = get_agent(planning_deadline=0.)
+        agent.action_plan = agent._do_rough_grid_search_for_initial_condition()
+        self.assertGreaterEqual(agent._plan_constraint(agent.action_plan, *agent._get_constraint_arguments()), 0.)
+
+        result = agent._solve_plan()
+
+        self.assertTrue(result.deadline_exceeded)
+        self.assertTrue(result.success)
+        self.assertEqual(agent.planning_deadline_overruns, 1)
+        self.assertGreaterEqual(agent._plan_constraint(result.x, *agent._get_constraint_arguments()), 0.)
+        self.assertLessEqual(agent._cost_function(result.x, *agent._get_cost_arguments()),
+                             agent._cost_function(agent.action_plan, *agent._get_cost_arguments()))
+
+    def test_generous_deadline(self):
+        agent = get_agent(planning_deadline=60.)
+        result = agent._solve_plan()
+
+        self.assertFalse(result.deadline_exceeded)
+        self.assertTrue(result.success)
+        self.assertEqual(agent.planning_deadline_overruns, 0)
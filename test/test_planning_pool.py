@@ -0,0 +1,65 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+import numpy as np
+
+from agents import PlanningPool, PlanningProblem
+from .agentfactory import get_agent
+
+
+class TestPlanningPool(unittest.TestCase):
+    def setUp(self):
+        self.agent = get_agent(number_of_parallel_starts=4)
+        self.agent.sim_master.planning_pool = PlanningPool(2)
+
+    def tearDown(self):
+        self.agent.sim_master.planning_pool.shutdown()
+
+    def test_cancel_lower_priority_problems(self):
+        initial_conditions = self.agent._get_ranked_initial_conditions()[:4]
+        planning_problems = [PlanningProblem(self.agent, initial_condition) for initial_condition in initial_conditions]
+
+        results = self.agent.sim_master.planning_pool.solve(planning_problems, self.agent.planner_backend)
+        first_successful_problem = [result is not None and result.success for result in results].index(True)
+
+        # the problems with a higher priority are always solved, the result of the first successful problem does not depend on the other problems
+        for result, initial_condition in zip(results[:first_successful_problem + 1], initial_conditions):
+            self.assertIsNotNone(result)
+            self.assertTrue(np.allclose(result.x, self.agent._minimize(self.agent.planner_backend, initial_condition).x))
+
+    def test_solve_from_parallel_starts(self):
+        result = self.agent._solve_from_parallel_starts(self.agent.sim_master.planning_pool, None)
+        sequential_result = self.agent._minimize(self.agent.planner_backend, self.agent._do_rough_grid_search_for_initial_condition())
+
+        self.assertTrue(result.success)
+        self.assertGreaterEqual(result.nit, sequential_result.nit)
+        if sequential_result.success:
+            self.assertTrue(np.allclose(result.x, sequential_result.x))
+        self.assertGreaterEqual(self.agent._plan_constraint(result.x, *self.agent._get_constraint_arguments()), -1e-6)
+
+    def test_cancelled_optimization_stops(self):
+        initial_condition = self.agent._get_ranked_initial_conditions()[0]
+
+        # a cancelled optimization stops after its first iteration and returns that iterate instead of raising StopIteration
+        result = self.agent._minimize(self.agent.planner_backend, initial_condition, is_cancelled=lambda: True)
+
+        self.assertFalse(result.success)
+        self.assertLessEqual(result.nit, 1)
+        self.assertEqual(len(result.x), len(initial_condition))
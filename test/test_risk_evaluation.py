@@ -0,0 +1,55 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+from .agentfactory import get_agent
+
+
+class TestRiskEvaluation(unittest.TestCase):
+    @staticmethod
+    def _get_agent(initial_position, other_initial_position):
+        agent = get_agent(ego_position=initial_position, other_position=other_initial_position)
+        agent._continue_current_plan()
+        return agent
+
+    def _assert_equal_to_full_evaluation(self, agent):
+        max_risk, risk_per_point = agent._get_collision_probability(agent.belief, agent.position_plan)
+
+        self.assertEqual(agent._evaluate_risk(), max_risk)
+        self.assertListEqual(agent.belief_point_contributing_to_risk, [bool(p) for p in risk_per_point])
+
+    def test_collision_area_out_of_reach(self):
+        # at the start of the approach section, the plan does not reach the collision area
+        agent = self._get_agent(initial_position=0., other_initial_position=0.)
+
+        self.assertTrue(agent._is_collision_probability_zero(agent.belief, agent.position_plan))
+        self._assert_equal_to_full_evaluation(agent)
+
+    def test_other_vehicle_out_of_reach(self):
+        # the other vehicle is so far behind that the normal CDF of every belief point is exactly 1.0 at the collision bounds
+        agent = self._get_agent(initial_position=40., other_initial_position=-80.)
+
+        self.assertTrue(agent._is_collision_probability_zero(agent.belief, agent.position_plan))
+        self._assert_equal_to_full_evaluation(agent)
+
+    def test_collision_possible(self):
+        agent = self._get_agent(initial_position=40., other_initial_position=40.)
+
+        self.assertFalse(agent._is_collision_probability_zero(agent.belief, agent.position_plan))
+        self._assert_equal_to_full_evaluation(agent)
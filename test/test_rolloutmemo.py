@@ -0,0 +1,65 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from agents.rolloutmemo import RolloutMemo
+from .agentfactory import get_agent
+
+
+class TestRolloutMemo(unittest.TestCase):
+    def test_memo(self):
+        memo = RolloutMemo(number_of_entries=2)
+        memo.put('a', 1., np.array([1.]), np.array([2.]))
+        memo.put('b', 1., np.array([3.]), np.array([4.]))
+
+        # the velocities are available for any initial position, the positions only for the initial position they were calculated with
+        self.assertIsNotNone(memo.get('a'))
+        self.assertIsNotNone(memo.get('a', 1.))
+        self.assertIsNone(memo.get('a', 2.))
+
+        # 'a' was used most recently, so 'b' is removed
+        memo.put('c', 1., np.array([5.]), np.array([6.]))
+        self.assertIsNone(memo.get('b'))
+        self.assertEqual(len(memo), 2)
+
+    def test_agent_evaluations(self):
+        agent = get_agent()
+
+        cost_arguments = agent._get_cost_arguments()
+        constraint_arguments = agent._get_constraint_arguments()
+
+        for _ in range(10):
+            plan = np.array([random.uniform(-1., 1.) for _ in range(len(agent.action_plan))])
+
+            agent._rollout_memo.clear()
+            expected = [agent._plan_constraint(plan, *constraint_arguments), agent._plan_constraint_jacobian(plan, *constraint_arguments),
+                        agent._cost_function(plan, *cost_arguments), agent._cost_function_jacobian(plan, *cost_arguments)]
+
+            # evaluate in the opposite order, so the constraint uses the rollout of the cost function
+            agent._rollout_memo.clear()
+            misses = agent._rollout_memo.misses
+            results = [agent._cost_function_jacobian(plan, *cost_arguments), agent._cost_function(plan, *cost_arguments),
+                       agent._plan_constraint_jacobian(plan, *constraint_arguments), agent._plan_constraint(plan, *constraint_arguments)][::-1]
+
+            self.assertEqual(agent._rollout_memo.misses - misses, 1)
+            for result, expected_result in zip(results, expected):
+                self.assertTrue(np.array_equal(result, expected_result))
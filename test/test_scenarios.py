@@ -0,0 +1,119 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import tempfile
+import unittest
+import warnings
+
+from agents import CEIAgent
+from controllableobjects import PointMassObject
+from simulation.offlinesimmaster import OfflineSimMaster
+from simulation.simulationconstants import SimulationConstants
+from trackobjects import SymmetricMergingTrack
+from trackobjects.trackside import TrackSide
+
+SCENARIOS = {'A': {'right_initial_position': 0.0, 'right_velocity': 9., 'left_risk_bounds': (.2, .5), 'right_risk_bounds': (.2, .5)},
+             'B': {'right_initial_position': 1.2, 'right_velocity': 9., 'left_risk_bounds': (.2, .5), 'right_risk_bounds': (.2, .5)},
+             'C': {'right_initial_position': 0.0, 'right_velocity': 10., 'left_risk_bounds': (.2, .4), 'right_risk_bounds': (.3, .6)},
+             'D': {'right_initial_position': 0.0, 'right_velocity': 10., 'left_risk_bounds': (.3, .4), 'right_risk_bounds': (.3, .6)}}
+
+
+class TestScenarios(unittest.TestCase):
+    """
+    Regression tests for the outcomes of the reference scenarios A-D (see run_scenarios) with the default options of the agent. The outcomes are sensitive
+    to small numerical differences in the plan updates, so changes to the default planning path should keep these as they are.
+    """
+
+    def setUp(self):
+        # the sim master saves the results to the data folder in the working directory
+        self._working_directory = os.getcwd()
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        os.chdir(self._temporary_directory.name)
+
+    def tearDown(self):
+        os.chdir(self._working_directory)
+        self._temporary_directory.cleanup()
+
+    @staticmethod
+    def _simulate_scenario(scenario):
+        simulation_constants = SimulationConstants(dt=50,
+                                                   vehicle_width=1.8,
+                                                   vehicle_length=4.5,
+                                                   track_start_point_distance=25.,
+                                                   track_section_length=50.,
+                                                   max_time=40e3)
+
+        track = SymmetricMergingTrack(simulation_constants)
+        parameters = SCENARIOS[scenario]
+
+        sim_master = OfflineSimMaster(track, simulation_constants, 'scenario_%s' % scenario, save_to_mat_and_csv=False, verbose=False)
+
+        point_mass_objects = {TrackSide.LEFT: PointMassObject(track,
+                                                              initial_position=track.traveled_distance_to_coordinates(0.0, track_side=TrackSide.LEFT),
+                                                              initial_velocity=10.,
+                                                              cruise_control_velocity=10.,
+                                                              use_discrete_inputs=False,
+                                                              resistance_coefficient=0.0005, constant_resistance=0.1),
+                              TrackSide.RIGHT: PointMassObject(track,
+                                                               initial_position=track.traveled_distance_to_coordinates(parameters['right_initial_position'],
+                                                                                                                       track_side=TrackSide.RIGHT),
+                                                               initial_velocity=parameters['right_velocity'],
+                                                               cruise_control_velocity=parameters['right_velocity'],
+                                                               use_discrete_inputs=False,
+                                                               resistance_coefficient=0.0005, constant_resistance=0.1)}
+
+        for side, risk_bounds, preferred_velocity in [(TrackSide.LEFT, parameters['left_risk_bounds'], 10.),
+                                                      (TrackSide.RIGHT, parameters['right_risk_bounds'], parameters['right_velocity'])]:
+            agent = CEIAgent(point_mass_objects[side], side, simulation_constants.dt, sim_master, track,
+                             risk_bounds=risk_bounds,
+                             saturation_time=2.,
+                             time_horizon=4.,
+                             preferred_velocity=preferred_velocity,
+                             vehicle_width=simulation_constants.vehicle_width,
+                             belief_frequency=4,
+                             vehicle_length=simulation_constants.vehicle_length,
+                             theta=1.)
+            sim_master.add_vehicle(side, point_mass_objects[side], agent)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            sim_master.start()
+
+        return sim_master, point_mass_objects
+
+    def _assert_outcome(self, scenario, end_state, first_vehicle=None):
+        sim_master, point_mass_objects = self._simulate_scenario(scenario)
+        traveled_distances = {side: point_mass_object.traveled_distance for side, point_mass_object in point_mass_objects.items()}
+
+        self.assertEqual(sim_master.end_state, end_state)
+        if first_vehicle is not None:
+            self.assertEqual(max(traveled_distances, key=traveled_distances.get), first_vehicle)
+
+    def test_scenario_a(self):
+        self._assert_outcome('A', 'Finished', TrackSide.LEFT)
+
+    def test_scenario_b(self):
+        self._assert_outcome('B', 'Finished', TrackSide.LEFT)
+
+    def test_scenario_c(self):
+        # in scenario C, neither vehicle yields in time
+        self._assert_outcome('C', 'Collided')
+
+    def test_scenario_d(self):
+        self._assert_outcome('D', 'Finished', TrackSide.RIGHT)
@@ -0,0 +1,56 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+from .agentfactory import get_agent, do_time_step
+
+
+class TestSensitivityUpdate(unittest.TestCase):
+    @staticmethod
+    def _get_agent(max_sensitivity_step):
+        # the merge point is so far away that the plan changes only slightly in the first ticks
+        agent = get_agent(time_to_merge_point=6., initialize_belief=False, max_sensitivity_step=max_sensitivity_step)
+
+        agent.controllable_object.set_continuous_acceleration(agent.compute_continuous_input(agent.dt / 1000.0))
+        for _ in range(5):
+            do_time_step(agent)
+
+        return agent
+
+    def test_small_change(self):
+        agent = self._get_agent(max_sensitivity_step=0.1)
+        result = agent._solve_plan()
+
+        self.assertTrue(result.success)
+        self.assertTrue(result.used_sensitivity_update)
+        self.assertGreaterEqual(agent._plan_constraint(result.x, *agent._get_constraint_arguments()), 0.)
+
+        reference_result = agent._minimize(agent.planner_backend, agent.action_plan)
+        self.assertAlmostEqual(agent._cost_function(result.x, *agent._get_cost_arguments()),
+                               agent._cost_function(reference_result.x, *agent._get_cost_arguments()), delta=1e-6)
+
+    def test_large_change(self):
+        # the correction step changes the plan more than allowed, so the problem is solved completely
+        agent = self._get_agent(max_sensitivity_step=0.)
+        self.assertFalse(agent._solve_sensitivity_update().success)
+
+        result = agent._solve_plan()
+
+        self.assertTrue(result.success)
+        self.assertFalse(result.used_sensitivity_update)
@@ -0,0 +1,67 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from controllableobjects import PointMassObject
+
+
+class TestTrajectory(unittest.TestCase):
+    @staticmethod
+    def _calculate_trajectory_step_by_step(dt, position, velocity, accelerations, resistance_coefficient, constant_resistance):
+        positions = []
+        velocities = []
+
+        for acceleration in accelerations:
+            position, velocity = PointMassObject.calculate_time_step_1d(dt, position, velocity, acceleration, resistance_coefficient, constant_resistance)
+            positions += [position]
+            velocities += [velocity]
+
+        return np.array(positions), np.array(velocities)
+
+    def test_trajectory(self):
+        for _ in range(50):
+            # low initial velocities and strong braking make sure the zero velocity clamp is also tested
+            initial_position = random.uniform(0., 100.)
+            initial_velocity = random.uniform(0., 15.)
+            accelerations = np.array([random.uniform(-2.5, 2.5) for _ in range(80)])
+            accelerations[0:random.randint(0, 80)] = -2.5
+
+            expected_positions, expected_velocities = self._calculate_trajectory_step_by_step(0.05, initial_position, initial_velocity, accelerations, 0.0005,
+                                                                                              0.1)
+            positions, velocities = PointMassObject.calculate_trajectory_1d(0.05, initial_position, initial_velocity, accelerations, 0.0005, 0.1)
+
+            self.assertTrue(np.allclose(positions, expected_positions, rtol=0., atol=1e-10), 'positions differ from the step by step calculation')
+            self.assertTrue(np.allclose(velocities, expected_velocities, rtol=0., atol=1e-10), 'velocities differ from the step by step calculation')
+
+    def test_batched_trajectory(self):
+        initial_position = random.uniform(0., 100.)
+        initial_velocity = random.uniform(0., 15.)
+        accelerations = np.array([[random.uniform(-2.5, 2.5) for _ in range(80)] for _ in range(10)])
+
+        positions, velocities = PointMassObject.calculate_trajectory_1d(0.05, initial_position, initial_velocity, accelerations, 0.0005, 0.1)
+
+        self.assertEqual(positions.shape, accelerations.shape)
+        for plan_index in range(accelerations.shape[0]):
+            expected_positions, expected_velocities = self._calculate_trajectory_step_by_step(0.05, initial_position, initial_velocity,
+                                                                                              accelerations[plan_index], 0.0005, 0.1)
+            self.assertTrue(np.allclose(positions[plan_index], expected_positions, rtol=0., atol=1e-10))
+            self.assertTrue(np.allclose(velocities[plan_index], expected_velocities, rtol=0., atol=1e-10))
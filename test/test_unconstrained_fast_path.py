@@ -0,0 +1,51 @@
+"""
+Copyright 2022, Olger Siebinga (o.siebinga@tudelft.nl)
+
+This file is part of the CEI-model repository.
+
+The CEI-model repository is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+The CEI-model repository is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with the CEI-model repository. If not, see <https://www.gnu.org/licenses/>.
+"""
+import unittest
+
+from .agentfactory import get_agent
+
+
+class TestUnconstrainedFastPath(unittest.TestCase):
+    @staticmethod
+    def _get_agent(time_to_merge_point):
+        agent = get_agent(time_to_merge_point=time_to_merge_point, use_unconstrained_fast_path=True)
+        agent.did_plan_update_on_last_tick = -1
+        return agent
+
+    def test_risk_constraint_inactive(self):
+        # the merge point is far away, so the unconstrained optimum has no collision risk
+        agent = self._get_agent(time_to_merge_point=6.)
+        result = agent._solve_plan()
+
+        self.assertTrue(result.success)
+        self.assertTrue(result.used_fast_path)
+
+        reference_result = agent._minimize(agent.planner_backend, agent.action_plan)
+        self.assertLessEqual(agent._cost_function(result.x, *agent._get_cost_arguments()),
+                             agent._cost_function(reference_result.x, *agent._get_cost_arguments()) + 1e-6)
+
+    def test_risk_constraint_active(self):
+        agent = self._get_agent(time_to_merge_point=3.)
+        self.assertFalse(agent._solve_unconstrained_plan().success)
+
+        result = agent._solve_plan()
+
+        self.assertTrue(result.success)
+        self.assertFalse(result.used_fast_path)
+        self.assertGreaterEqual(agent._plan_constraint(result.x, *agent._get_constraint_arguments()), -1e-6)
@@ -67,6 +67,20 @@ class StraightTrack(Track):
     def get_collision_bounds_approximation(self, traveled_distance_vehicle_1):
         return self.get_collision_bounds(traveled_distance_vehicle_1, self._vehicle_width, self._vehicle_length, )
 
+    def get_collision_bounds_approximation_batch(self, traveled_distances_vehicle_1):
+        traveled_distances_vehicle_1 = np.asarray(traveled_distances_vehicle_1, dtype=float)
+        lower_bounds, upper_bounds = self.get_collision_bounds(traveled_distances_vehicle_1, self._vehicle_width, self._vehicle_length)
+        return lower_bounds, upper_bounds, np.ones(traveled_distances_vehicle_1.shape, dtype=bool)
+
+    @staticmethod
+    def get_collision_bounds_approximation_derivative(traveled_distance_vehicle_1):
+        return 1., 1.
+
+    def get_collision_bounds_approximation_range(self, min_traveled_distance_vehicle_1, max_traveled_distance_vehicle_1):
+        lb, _ = self.get_collision_bounds_approximation(min_traveled_distance_vehicle_1)
+        _, ub = self.get_collision_bounds_approximation(max_traveled_distance_vehicle_1)
+        return lb, ub
+
     @staticmethod
     def get_collision_bounds(traveled_distance_vehicle_1, vehicle_width, vehicle_length, **kwargs):
         return traveled_distance_vehicle_1 - vehicle_length, traveled_distance_vehicle_1 + vehicle_length
@@ -208,6 +208,56 @@ class SymmetricMergingTrack(Track):
 
             return lb, ub
 
+    def get_collision_bounds_approximation_batch(self, traveled_distances_vehicle_1):
+        traveled_distances_vehicle_1 = np.asarray(traveled_distances_vehicle_1, dtype=float)
+        collision_possible = traveled_distances_vehicle_1 >= self._upper_bound_threshold
+
+        upper_bounds = np.where(collision_possible, self._upper_bound_approximation_slope * traveled_distances_vehicle_1 +
+                                self._upper_bound_approximation_intersect, np.nan)
+        lower_bounds = np.where(traveled_distances_vehicle_1 > self._lower_bound_threshold,
+                                self._lower_bound_approximation_slope * traveled_distances_vehicle_1 + self._lower_bound_approximation_intersect,
+                                self._lower_bound_constant_value)
+        lower_bounds = np.where(collision_possible, lower_bounds, np.nan)
+
+        return lower_bounds, upper_bounds, collision_possible
+
+    def get_collision_bounds_approximation_derivative(self, traveled_distance_vehicle_1):
+        """
+        Returns the derivatives of the approximated lower and upper collision bounds with respect to the traveled distance of vehicle 1.
+        returns (None, None) when no collisions are possible
+
+        :param traveled_distance_vehicle_1:
+        :return:
+        """
+        if traveled_distance_vehicle_1 < self._upper_bound_threshold:
+            return None, None
+
+        else:
+            if traveled_distance_vehicle_1 > self._lower_bound_threshold:
+                d_lb = self._lower_bound_approximation_slope
+            else:
+                d_lb = 0.
+
+            return d_lb, self._upper_bound_approximation_slope
+
+    def get_collision_bounds_approximation_range(self, min_traveled_distance_vehicle_1, max_traveled_distance_vehicle_1):
+        """
+        Both approximated bounds increase with the traveled distance of vehicle 1, except for the step from the constant lower bound to the linear
+        approximation at the lower bound threshold (the start of the linear approximation can be slightly below the constant value).
+        """
+        if max_traveled_distance_vehicle_1 < self._upper_bound_threshold:
+            return None, None
+
+        min_traveled_distance_vehicle_1 = max(min_traveled_distance_vehicle_1, self._upper_bound_threshold)
+        lb, _ = self.get_collision_bounds_approximation(min_traveled_distance_vehicle_1)
+        _, ub = self.get_collision_bounds_approximation(max_traveled_distance_vehicle_1)
+
+        if max_traveled_distance_vehicle_1 > self._lower_bound_threshold:
+            start_of_linear_approximation = max(min_traveled_distance_vehicle_1, self._lower_bound_threshold)
+            lb = min(lb, self._lower_bound_approximation_slope * start_of_linear_approximation + self._lower_bound_approximation_intersect)
+
+        return lb, ub
+
     def get_collision_bounds(self, traveled_distance_vehicle_1, vehicle_width, vehicle_length):
         """
         Returns the bounds on the position of the other vehicle that spans the set of all collision positions. Assumes both vehicles have the same dimensions.
@@ -51,6 +51,26 @@ class Track(abc.ABC):
     def get_collision_bounds_approximation(self, traveled_distance_vehicle_1: float) -> (float, float):
         pass
 
+    @abc.abstractmethod
+    def get_collision_bounds_approximation_batch(self, traveled_distances_vehicle_1: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        Vectorized version of get_collision_bounds_approximation for an array of traveled distances of vehicle 1. Returns arrays with the lower bounds, the
+        upper bounds and a mask that is False where no collisions are possible. The bounds are nan where the mask is False.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_collision_bounds_approximation_derivative(self, traveled_distance_vehicle_1: float) -> (float, float):
+        pass
+
+    @abc.abstractmethod
+    def get_collision_bounds_approximation_range(self, min_traveled_distance_vehicle_1: float, max_traveled_distance_vehicle_1: float) -> (float, float):
+        """
+        Returns the lowest lower bound and the highest upper bound that get_collision_bounds_approximation returns for any traveled distance of vehicle 1
+        within the provided interval. returns (None, None) when no collisions are possible within the interval.
+        """
+        pass
+
     @abc.abstractmethod
     def get_collision_bounds(self, traveled_distance_vehicle_1: float, vehicle_width: float, vehicle_length: float) -> (float, float):
         pass